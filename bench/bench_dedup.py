@@ -0,0 +1,89 @@
+# bench/bench_dedup.py
+"""
+跨站点去重的查找成本：历史规模从小到大，每次再写一批 LinkedIn 新职位（一半是 SEEK 已有职位的转贴），
+看每条新职位的 upsert（含指纹 + 候选查找）耗时是否保持平稳，以及识别出的重复数。
+
+用法：
+    python bench/bench_dedup.py [--history 1000,10000,100000] [--batch 200]
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main
+from db import get_db
+
+ROLES = ["Software Developer", "QA Analyst", "Test Engineer", "Data Analyst", "Support Engineer",
+         "Automation Tester", "Web Developer", "Cloud Engineer", "Graduate Developer", "BI Developer"]
+LEVELS = ["Junior", "Graduate", "", "Associate", "Entry Level"]
+CITIES = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Dunedin"]
+
+
+def seek_job(i: int, rng: random.Random) -> dict:
+    return {
+        "job_id": str(10_000_000 + i),
+        "title": f"{rng.choice(LEVELS)} {rng.choice(ROLES)} {rng.choice(['', 'Remote', 'Contract', 'Platform'])}".strip(),
+        "company": f"Company {rng.randrange(2000)} Ltd",
+        "location": f"{rng.choice(CITIES)} CBD, {rng.choice(CITIES)}",
+        "link": f"https://www.seek.co.nz/job/{10_000_000 + i}",
+    }
+
+
+def cross_post(j: dict, i: int) -> dict:
+    return {
+        "job_id": str(90_000_000 + i),
+        "title": j["title"] + " (Hybrid)",
+        "company": j["company"].replace(" Ltd", " Limited"),
+        "location": j["location"].split(" CBD")[0] + ", New Zealand",
+        "link": f"https://www.linkedin.com/jobs/view/{90_000_000 + i}/",
+    }
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--history", default="1000,10000,100000")
+    ap.add_argument("--batch", type=int, default=200)
+    args = ap.parse_args()
+    rng = random.Random(5)
+
+    print(f"{'history':>9} {'us/job':>9} {'dups':>6}/{args.batch // 2}")
+    with tempfile.TemporaryDirectory() as d:
+        main.DB_PATH = str(Path(d) / "dedup.sqlite3")
+        main.init_db()
+        db = get_db(main.DB_PATH)
+        have = 0
+        for target in [int(x) for x in args.history.split(",") if x]:
+            hist = [seek_job(i, rng) for i in range(have, target)]
+            with db.write() as conn:
+                for k in range(0, len(hist), 5000):
+                    main.upsert_and_get_new(conn, hist[k:k + 5000], "seek", notify=False)
+            have = target
+
+            # 直接复用历史里的真实行做转贴，保证有正本可找
+            with db.read() as conn:
+                rows = conn.execute(
+                    "SELECT job_id, title, company, location, link FROM jobs WHERE source='seek' "
+                    "ORDER BY RANDOM() LIMIT ?", (args.batch // 2,)
+                ).fetchall()
+            reposts = [cross_post(dict(zip(("job_id", "title", "company", "location", "link"), r)), have + k)
+                       for k, r in enumerate(rows)]
+            # 另一半是新公司的新职位，不该被判重复
+            fresh = [dict(seek_job(k, rng), job_id=str(have + 70_000_000 + k), company=f"Newco {have + k}")
+                     for k in range(args.batch - len(reposts))]
+            batch = reposts + fresh
+
+            t0 = time.perf_counter()
+            with db.write() as conn:
+                new = main.upsert_and_get_new(conn, batch, "linkedin", notify=False)
+            dt = time.perf_counter() - t0
+            dups = sum(1 for j in new if j.get("canonical_rowid"))
+            print(f"{target:>9} {dt / len(batch) * 1e6:>9.1f} {dups:>6}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,102 @@
+# bench/bench_report.py
+"""
+latest.html 搜索/渲染的合成数据基准页。
+
+用法：
+    python bench/bench_report.py [--rows 50000] [--out DIR] [--measure]
+
+在 --out 目录（默认新建一个临时目录，不落在仓库里）下生成与正式报表相同的外壳 + 数据块（合成职位），浏览器直接打开
+<out>/latest.html，右上角显示每次筛选耗时。
+--measure 用 Playwright 打开页面，依次输入一组查询并打印建索引/筛选耗时。
+"""
+import sys
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import outputs
+
+WORDS = {
+    "title": ["Junior", "Graduate", "Senior", "Lead", "Software", "QA", "Test", "Automation", "Data",
+              "Developer", "Engineer", "Analyst", "Tester", "Frontend", "Backend", "Full Stack", "Cloud",
+              "Support", "Intern", "Platform", "Mobile", "C++", "Node.js", "Python", "Manager"],
+    "company": ["Halter", "Xero", "Fisher & Paykel", "One New Zealand", "Spark", "Trade Me", "Datacom",
+                "RWA People", "Kiwibank", "ANZ", "Rocket Lab", "Vista", "Pushpay", "Serko", "Ltd"],
+    "location": ["Auckland CBD, Auckland", "Wellington Central, Wellington", "Christchurch, Canterbury",
+                 "Hamilton, Waikato", "Dunedin, Otago", "Remote", "Unknown"],
+}
+QUERIES = ["dev", "junior OR graduate", "tester -senior -lead", "c++ OR node.js", "auckland qa", "zzz"]
+
+
+def make_rows(n: int, seed: int = 7) -> list[list]:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        title = " ".join(rnd.sample(WORDS["title"], rnd.randint(2, 4)))
+        rows.append([
+            i + 1, str(90_000_000 + i), title, rnd.choice(WORDS["company"]), rnd.choice(WORDS["location"]),
+            rnd.choice(["seek", "linkedin"]), f"https://example.invalid/job/{i}",
+            f"2026-{1 + i * 12 // n:02d}-{1 + i % 28:02d} 09:00:00",
+        ])
+    return rows
+
+
+def generate(out: Path, n: int) -> Path:
+    out.mkdir(parents=True, exist_ok=True)
+    outputs.OUTPUT_DIR = out
+    outputs.HTML_PATH = out / "latest.html"
+    outputs.DATA_DIR = out / "data"
+    outputs.MANIFEST_JSON = outputs.DATA_DIR / "manifest.json"
+    outputs.MANIFEST_JS = outputs.DATA_DIR / "manifest.js"
+    outputs.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    for f in outputs.DATA_DIR.glob("jobs_*.js"):
+        f.unlink()
+
+    manifest = outputs._empty_manifest()
+    outputs.append_report_rows(make_rows(n), manifest)
+    manifest["last_rowid"] = manifest["total"] = n
+    outputs._save_manifest(manifest)
+    outputs._write_shell()
+    return outputs.HTML_PATH
+
+
+async def measure(html: Path):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto(html.resolve().as_uri())
+        await page.wait_for_function("() => window.__lastFilterMs !== undefined", timeout=60000)
+        print(f"index build: {await page.evaluate('window.__indexMs'):.1f} ms")
+        for q in QUERIES:
+            await page.evaluate("() => { window.__lastFilterMs = undefined; }")
+            await page.fill("#q", q)
+            await page.wait_for_function("() => window.__lastFilterMs !== undefined")
+            ms = await page.evaluate("window.__lastFilterMs")
+            shown = await page.text_content("#count")
+            rendered = await page.evaluate("document.querySelectorAll('#tbody tr:not(.pad)').length")
+            print(f"{q!r:28} {ms:7.1f} ms  matched {shown:>6}  rendered rows {rendered}")
+        await browser.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--out", default=None, help="输出目录（默认临时目录）")
+    ap.add_argument("--measure", action="store_true")
+    args = ap.parse_args()
+
+    out = Path(args.out) if args.out else Path(tempfile.mkdtemp(prefix="bench_report-"))
+    html = generate(out, args.rows)
+    print(f"wrote {args.rows} synthetic rows -> {html}")
+    if args.measure:
+        asyncio.run(measure(html))
+
+
+if __name__ == "__main__":
+    main()
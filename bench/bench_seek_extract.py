@@ -0,0 +1,80 @@
+# bench/bench_seek_extract.py
+"""
+对比 SEEK 卡片抽取两种模式的 IPC 次数与耗时（离线，基于保存下来的结果页）。
+
+用法：
+    python bench/bench_seek_extract.py [saved.html] [--repeat 5]
+
+saved.html 默认是仓库里的合成结果页 bench/fixtures/seek_search.html；
+也可以在浏览器里“另存为”一个真实的 SEEK 搜索结果页传进来。
+"""
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "seek_search.html"
+
+from playwright.async_api import async_playwright
+from sites.seek_adapter import extract_seek_cards_batch, extract_seek_cards_per_card
+
+
+class _Counter:
+    """包一层 Page/ElementHandle，统计每次 await 到浏览器的调用"""
+    def __init__(self, target, stats: dict):
+        self._t = target
+        self._stats = stats
+
+    def __getattr__(self, name):
+        attr = getattr(self._t, name)
+        if name in ("query_selector_all", "get_attribute", "inner_text", "evaluate", "evaluate_handle"):
+            async def wrapped(*a, **kw):
+                self._stats[name] = self._stats.get(name, 0) + 1
+                res = await attr(*a, **kw)
+                if name == "query_selector_all":
+                    return [_Counter(h, self._stats) for h in res]
+                return res
+            return wrapped
+        return attr
+
+
+async def _run(fn, page, repeat: int):
+    stats: dict = {}
+    best = float("inf")
+    jobs = []
+    for _ in range(repeat):
+        stats.clear()
+        t0 = time.perf_counter()
+        jobs = await fn(_Counter(page, stats))
+        best = min(best, time.perf_counter() - t0)
+    return jobs, dict(stats), best
+
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("html", nargs="?", default=str(FIXTURE))
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    html = Path(args.html).read_text(encoding="utf-8")
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(html, wait_until="domcontentloaded")
+
+        old_jobs, old_stats, old_t = await _run(extract_seek_cards_per_card, page, args.repeat)
+        new_jobs, new_stats, new_t = await _run(extract_seek_cards_batch, page, args.repeat)
+        await browser.close()
+
+    assert old_jobs == new_jobs, "batch 输出与 per-card 不一致"
+    print(f"cards: {len(new_jobs)}")
+    print(f"per-card: {sum(old_stats.values()):5d} round trips {old_t * 1000:8.1f} ms  {old_stats}")
+    print(f"batch   : {sum(new_stats.values()):5d} round trips {new_t * 1000:8.1f} ms  {new_stats}")
+    if new_t > 0:
+        print(f"speedup : x{old_t / new_t:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
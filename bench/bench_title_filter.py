@@ -0,0 +1,106 @@
+# bench/bench_title_filter.py
+"""
+标题过滤微基准：旧版（逐条短语子串 + 单词集合）vs 编译后的 TitleFilter。
+
+用法：
+    python bench/bench_title_filter.py [--titles 100000] [--rules 300] [--repeat 0.5]
+
+规则 = 内置默认规则 + 随机生成的单词/短语凑到 --rules 条；
+标题按 --repeat 比例重复出现（模拟跨轮重复看到同一职位），先校验两边结论一致再计时。
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import title_filter
+from title_filter import TitleFilter, DEFAULT_EXCLUDE_WORDS, DEFAULT_EXCLUDE_PHRASES
+
+VOCAB = (
+    "software developer engineer tester qa automation analyst graduate junior test data cloud "
+    "devops support frontend backend full stack web mobile platform security network systems "
+    "senior lead manager principal head of team tech product project program staff intern "
+    "python java javascript react node dotnet c# sql aws azure - / ( ) & ,"
+).split()
+
+
+def legacy_keep(title: str, words: set, phrases: set) -> bool:
+    """基线：改造前的 should_keep（每次都归一化）"""
+    t = title_filter.normalize_title.__wrapped__(title)
+    if not t:
+        return True
+    for phrase in phrases:
+        if phrase in t:
+            return False
+    return not (set(t.split()) & words)
+
+
+def make_rules(n: int, rng: random.Random) -> list[str]:
+    rules = set(DEFAULT_EXCLUDE_WORDS | DEFAULT_EXCLUDE_PHRASES)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while len(rules) < n:
+        w = "".join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+        rules.add(w if rng.random() < 0.5 else f"{w} {rng.choice(VOCAB[:20])}")
+    return sorted(rules)
+
+
+def make_titles(n: int, repeat: float, rng: random.Random) -> list[str]:
+    uniq = max(1, int(n * (1 - repeat)))
+    base = [" ".join(rng.choice(VOCAB) for _ in range(rng.randint(2, 7))).title() for _ in range(uniq)]
+    return [base[i] if i < uniq else rng.choice(base) for i in range(n)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--titles", type=int, default=100_000)
+    ap.add_argument("--rules", type=int, default=300)
+    ap.add_argument("--repeat", type=float, default=0.5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, rng)
+    titles = make_titles(args.titles, args.repeat, rng)
+    words, phrases = title_filter.split_terms(rules)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rules_file = Path(tmp) / "filters.json"
+        rules_file.write_text(json.dumps({"exclude": rules}), encoding="utf-8")
+        engine = TitleFilter(rules_file)
+        jobs = [{"title": t} for t in titles]
+
+        # 一致性
+        mismatch = sum(
+            legacy_keep(t, words, phrases) != (engine.drop_reason(t) is None) for t in titles[:20_000]
+        )
+        print(f"{len(rules)} rules ({len(words)} words, {len(phrases)} phrases), "
+              f"{len(titles)} titles, parity mismatches: {mismatch}")
+
+        t0 = time.perf_counter()
+        kept_legacy = sum(legacy_keep(t, words, phrases) for t in titles)
+        t_legacy = time.perf_counter() - t0
+
+        engine.reload(force=True)          # 清空判定缓存
+        title_filter.normalize_title.cache_clear()
+        t0 = time.perf_counter()
+        kept = len(engine.filter(jobs))
+        t_cold = time.perf_counter() - t0
+        engine.take_hits()                 # 命中统计只算下面一遍，否则冷/热两遍叠加
+
+        t0 = time.perf_counter()
+        engine.filter(jobs)
+        t_warm = time.perf_counter() - t0
+
+        print(f"legacy : {t_legacy * 1000:8.1f} ms  kept {kept_legacy}")
+        print(f"engine : {t_cold * 1000:8.1f} ms  kept {kept}  (cold caches, x{t_legacy / t_cold:.1f})")
+        print(f"engine : {t_warm * 1000:8.1f} ms  (warm caches, x{t_legacy / t_warm:.1f})")
+        print("top rules:", TitleFilter.format_hits(engine.take_hits(), top=5))
+
+
+if __name__ == "__main__":
+    main()
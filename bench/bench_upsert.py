@@ -0,0 +1,102 @@
+# bench/bench_upsert.py
+"""
+upsert_and_get_new 微基准：旧版逐行 SELECT+INSERT vs 新版整批集合写入。
+
+用法：
+    python bench/bench_upsert.py [--sizes 100,10000,100000]
+
+每个规模：先往空库写一批（全新增），再写同一批 + 一半新 id（半新增），各计时一次。
+差距主要在全新增的大批次；半新增批次（稳定状态更接近这种）两边都被同样的索引查找主导，
+提升有限，机器不同差别也大（约 1.1x–2x），别拿它当普遍加速的依据。
+"""
+import sys
+import time
+import sqlite3
+import argparse
+import functools
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main
+import dedup
+
+dedup.ENABLED = False  # 只比较 jobs 写入本身（跨站点去重另见 bench_dedup.py）
+
+
+def legacy_upsert(conn: sqlite3.Connection, jobs: list[dict], source: str) -> list[dict]:
+    """基线：改造前的逐行实现"""
+    new_jobs = []
+    cur = conn.cursor()
+    for j in jobs:
+        job_id = j.get("job_id")
+        if not job_id:
+            continue
+        cur.execute("SELECT 1 FROM jobs WHERE source=? AND job_id=?", (source, job_id))
+        if cur.fetchone():
+            continue
+        cur.execute(
+            "INSERT INTO jobs(job_id, title, link, company, location, source) VALUES(?,?,?,?,?,?)",
+            (job_id, j.get("title",""), j.get("link",""), j.get("company",""), j.get("location",""), source)
+        )
+        new_jobs.append(j)
+    conn.commit()
+    return new_jobs
+
+
+def make_jobs(start: int, n: int) -> list[dict]:
+    return [{
+        "job_id": str(80_000_000 + i),
+        "title": f"Junior Developer {i}",
+        "company": f"Company {i % 500}",
+        "location": "Auckland",
+        "link": f"https://www.seek.co.nz/job/{80_000_000 + i}",
+    } for i in range(start, start + n)]
+
+
+def run(fn, n: int, tmp: Path) -> tuple[float, float, int]:
+    db = tmp / f"bench_{fn.__name__}_{n}.sqlite3"
+    main.DB_PATH = str(db)
+    main.init_db()
+    conn = sqlite3.connect(db)
+
+    first = make_jobs(0, n)
+    t0 = time.perf_counter()
+    fn(conn, first, "seek")
+    t_fresh = time.perf_counter() - t0
+
+    second = make_jobs(n // 2, n)  # 一半已存在
+    t0 = time.perf_counter()
+    new = fn(conn, second, "seek")
+    t_mixed = time.perf_counter() - t0
+
+    conn.close()
+    return t_fresh, t_mixed, len(new)
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100,10000,100000")
+    args = ap.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",") if x]
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        print(f"{'rows':>8} {'impl':>8} {'fresh ms':>10} {'mixed ms':>10} {'new':>8}")
+        for n in sizes:
+            res = {}
+            # 不写发件箱，只比较 jobs 写入本身
+            bulk = functools.partial(main.upsert_and_get_new, notify=False)
+            bulk.__name__ = "bulk"
+            for name, fn in (("legacy", legacy_upsert), ("bulk", bulk)):
+                t_fresh, t_mixed, new = run(fn, n, tmp)
+                res[name] = (t_fresh, t_mixed)
+                print(f"{n:>8} {name:>8} {t_fresh * 1000:>10.1f} {t_mixed * 1000:>10.1f} {new:>8}")
+            lf, lm = res["legacy"]
+            bf, bm = res["bulk"]
+            print(f"{'':>8} {'speedup':>8} {lf / bf:>9.1f}x {lm / bm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_()
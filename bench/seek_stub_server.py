@@ -0,0 +1,114 @@
+# bench/seek_stub_server.py
+"""
+离线验证 SEEK 网络拦截模式：本地起一个假的结果页 + 搜索 API，返回录制好的 payload。
+
+用法：
+    python bench/seek_stub_server.py [payload.json ...] [--serve]
+
+默认用 bench/fixtures/seek_search.json；多个 payload 会按 page=1,2,... 依次返回。
+--serve 只起服务不跑抓取，方便手动在浏览器里看。
+"""
+import sys
+import json
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "seek_search.json"
+
+# 结果页：和真站一样由前端去请求搜索 API，再渲染卡片（这里只渲染标题）
+PAGE = """<!doctype html>
+<meta charset="utf-8"><title>stub seek</title>
+<div id="results"></div>
+<script>
+fetch('/api/jobsearch/v5/search' + location.search)
+  .then(r => r.json())
+  .then(d => {
+    document.getElementById('results').innerHTML = (d.data || []).map(j =>
+      `<article data-testid="job-card"><h3><a href="/job/${j.id}">${j.title}</a></h3></article>`
+    ).join('');
+  });
+</script>
+"""
+
+
+def make_handler(payloads: list[bytes]):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def _send(self, body: bytes, ctype: str):
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            u = urlparse(self.path)
+            if u.path.startswith("/api/jobsearch/"):
+                page_no = int((parse_qs(u.query).get("page") or ["1"])[0])
+                body = payloads[page_no - 1] if 0 < page_no <= len(payloads) else b'{"data": []}'
+                return self._send(body, "application/json; charset=utf-8")
+            if u.path.startswith("/jobs"):
+                return self._send(PAGE.encode("utf-8"), "text/html; charset=utf-8")
+            self.send_error(404)
+
+    return Handler
+
+
+def start_server(payloads: list[bytes], port: int = 0) -> ThreadingHTTPServer:
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(payloads))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+async def run_check(base: str):
+    from playwright.async_api import async_playwright
+    from sites.seek_adapter import SeekSearchCollector, extract_seek_jobs
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page()
+        collector = SeekSearchCollector(page)
+        await page.goto(f"{base}/jobs?keywords=graduate", wait_until="domcontentloaded")
+        got = await collector.wait(timeout_ms=5000)
+        jobs = await extract_seek_jobs(page, collector=collector)
+        collector.detach()
+        await browser.close()
+
+    print(f"payloads seen: {len(collector.payloads)} (network path: {got})")
+    for j in jobs:
+        print(json.dumps(j, ensure_ascii=False))
+    return jobs
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("payloads", nargs="*", default=[str(FIXTURE)])
+    ap.add_argument("--serve", action="store_true")
+    ap.add_argument("--port", type=int, default=0)
+    args = ap.parse_args()
+
+    payloads = [Path(p).read_bytes() for p in args.payloads]
+    srv = start_server(payloads, args.port)
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    print(f"stub SEEK at {base}/jobs")
+    try:
+        if args.serve:
+            threading.Event().wait()
+        else:
+            asyncio.run(run_check(base))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
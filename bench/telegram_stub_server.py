@@ -0,0 +1,117 @@
+# bench/telegram_stub_server.py
+"""
+本地 Telegram Bot API 桩服务器，用来离线验证 notifier：
+  - 每 --every-429 个请求回一次 429（retry_after=--retry-after 秒）
+  - 每个请求人为延迟 --latency-ms，模拟握手/网络耗时
+
+用法：
+    python bench/telegram_stub_server.py [--messages 20] [--serve]
+
+默认起服务后用 TelegramNotifier 发 --messages 条消息，打印耗时与收到的消息数；
+--serve 只起服务（配合 TELEGRAM_API_BASE=http://127.0.0.1:PORT 跑 main.py）。
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_handler(state: dict, every_429: int, retry_after: int, latency_ms: int):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *a):
+            pass
+
+        def _json(self, code: int, obj: dict):
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            time.sleep(latency_ms / 1000)
+            with state["lock"]:
+                state["requests"] += 1
+                state["times"].append(time.monotonic())
+                state["peers"].add(self.client_address)  # 每个 TCP 连接一个 (host, port)
+                n = state["requests"]
+                if every_429 and n % every_429 == 0:
+                    state["throttled"] += 1
+                    throttle = True
+                else:
+                    state["messages"].append((form.get("text") or [""])[0])
+                    throttle = False
+            if throttle:
+                return self._json(429, {
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                })
+            self._json(200, {"ok": True, "result": {"message_id": n}})
+
+    return Handler
+
+
+def start_server(every_429: int = 5, retry_after: int = 1, latency_ms: int = 50, port: int = 0):
+    state = {"lock": threading.Lock(), "requests": 0, "throttled": 0, "messages": [], "times": [],
+             "peers": set()}
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state, every_429, retry_after, latency_ms))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, state
+
+
+async def run_check(base: str, n: int):
+    from notifier import TelegramNotifier
+
+    notifier = TelegramNotifier(token="TEST", chat_id="1", api_base=base).start()
+    t0 = time.perf_counter()
+    for i in range(n):
+        notifier.submit(f"job {i}")
+    t_submit = time.perf_counter() - t0
+    await notifier.drain()
+    t_total = time.perf_counter() - t0
+    await notifier.close()
+    print(f"submit {n} msgs: {t_submit * 1000:.2f} ms (caller never waits)")
+    print(f"delivered {notifier.sent}, failed {notifier.failed} in {t_total:.2f} s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=20)
+    ap.add_argument("--every-429", type=int, default=5)
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--latency-ms", type=int, default=50)
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--serve", action="store_true")
+    args = ap.parse_args()
+
+    srv, state = start_server(args.every_429, args.retry_after, args.latency_ms, args.port)
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    print(f"stub Telegram API at {base}")
+    try:
+        if args.serve:
+            threading.Event().wait()
+        else:
+            asyncio.run(run_check(base, args.messages))
+            print(f"server saw {state['requests']} requests, {state['throttled']} throttled, "
+                  f"{len(state['messages'])} messages stored")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
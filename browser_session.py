@@ -0,0 +1,170 @@
+# browser_session.py
+"""
+常驻浏览器：跨轮次复用同一个 Playwright/BrowserContext 和每个站点的“热”标签页，
+按策略回收（跑满 N 轮 / 渲染进程崩溃 / JS 堆超阈值 / 上下文已失效）。
+"""
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import async_playwright, BrowserContext, Page, Playwright
+
+RECYCLE_CYCLES = int(os.getenv("BROWSER_RECYCLE_CYCLES", "36"))     # 0 = 不按轮次回收
+MAX_HEAP_MB = float(os.getenv("BROWSER_MAX_HEAP_MB", "512"))        # 所有热页 JS 堆之和，0 = 不检查
+
+
+class BrowserSession:
+    def __init__(
+        self,
+        launch: Callable[[Playwright], Awaitable[BrowserContext]],
+        recycle_cycles: int = RECYCLE_CYCLES,
+        max_heap_mb: float = MAX_HEAP_MB,
+    ):
+        self._launch = launch
+        self.recycle_cycles = recycle_cycles
+        self.max_heap_mb = max_heap_mb
+        self.pw: Optional[Playwright] = None
+        self.context: Optional[BrowserContext] = None
+        self.pages: dict[str, Page] = {}
+        self.cycles = 0
+        self.launched_at = 0.0
+        self._closed = False
+        self._crashed: Optional[str] = None
+
+    # ---------- 生命周期 ----------
+    async def ensure(self) -> BrowserContext:
+        """每轮开始前调用：健康检查，必要时回收重启，返回可用的 context"""
+        if self.context is not None:
+            reason = await self._recycle_reason()
+            if reason:
+                print(f"♻️ 回收浏览器：{reason}（已跑 {self.cycles} 轮）")
+                await self.close()
+
+        if self.context is None:
+            self.pw = await async_playwright().start()
+            self.context = await self._launch(self.pw)
+            self.context.on("close", lambda _: self._mark_closed())
+            self.cycles = 0
+            self.launched_at = time.monotonic()
+            self._closed = False
+            self._crashed = None
+
+        self.cycles += 1
+        return self.context
+
+    async def close(self):
+        ctx, pw = self.context, self.pw
+        self.context, self.pw, self.pages = None, None, {}
+        if ctx is not None:
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+        if pw is not None:
+            try:
+                await pw.stop()
+            except Exception:
+                pass
+
+    def _mark_closed(self):
+        self._closed = True
+
+    # ---------- 热页 ----------
+    async def page(self, site: str) -> Page:
+        """每个 key（站点 / 页面池槽位）一个常驻标签页；关掉/崩溃了就新开"""
+        p = self.pages.get(site)
+        if p is not None and not p.is_closed():
+            return p
+        ctx = self.context
+        # 第一个站点直接复用持久化上下文自带的空白页
+        used = set(self.pages.values())
+        spare = [x for x in ctx.pages if x not in used and not x.is_closed()]
+        p = spare[0] if spare else await ctx.new_page()
+        p.on("crash", lambda _p, s=site: self._mark_crashed(s))
+        self.pages[site] = p
+        return p
+
+    def _mark_crashed(self, site: str):
+        self._crashed = site
+
+    # ---------- 健康检查 / 回收策略 ----------
+    async def heap_mb(self) -> float:
+        total = 0
+        for p in list(self.pages.values()):
+            if p.is_closed():
+                continue
+            try:
+                total += await p.evaluate(
+                    "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+                )
+            except Exception:
+                pass
+        return total / (1024 * 1024)
+
+    async def _alive(self) -> bool:
+        if self._closed or self.context is None:
+            return False
+        try:
+            browser = self.context.browser
+            if browser is not None and not browser.is_connected():
+                return False
+            # 随便找个页面做一次往返，确认渲染/驱动都还活着
+            probe = next((p for p in self.context.pages if not p.is_closed()), None)
+            if probe is not None:
+                await probe.evaluate("() => 1")
+            return True
+        except Exception:
+            return False
+
+    async def _recycle_reason(self) -> Optional[str]:
+        if self._crashed:
+            return f"{self._crashed} 渲染进程崩溃"
+        if not await self._alive():
+            return "上下文失效"
+        if self.recycle_cycles and self.cycles >= self.recycle_cycles:
+            return f"达到 {self.recycle_cycles} 轮"
+        if self.max_heap_mb:
+            heap = await self.heap_mb()
+            if heap >= self.max_heap_mb:
+                return f"JS 堆 {heap:.0f} MB ≥ {self.max_heap_mb:.0f} MB"
+        return None
+
+
+class PagePool:
+    """
+    有界标签页池：最多 size 个页面同时工作，多组搜索排队复用。
+    页面按槽位懒创建（factory(i)）；close_pages=False 时页面归调用方（如 BrowserSession）管理。
+    """
+
+    def __init__(self, size: int, factory: Callable[[int], Awaitable[Page]], close_pages: bool = True):
+        self.size = max(1, size)
+        self._factory = factory
+        self._close_pages = close_pages
+        self._pages: dict[int, Page] = {}
+        self._free: asyncio.Queue = asyncio.Queue()
+        for i in range(self.size):
+            self._free.put_nowait(i)
+
+    @asynccontextmanager
+    async def page(self):
+        slot = await self._free.get()
+        try:
+            p = self._pages.get(slot)
+            if p is None or p.is_closed():
+                p = await self._factory(slot)
+                self._pages[slot] = p
+            yield p
+        finally:
+            self._free.put_nowait(slot)
+
+    async def close(self):
+        pages, self._pages = self._pages, {}
+        if not self._close_pages:
+            return
+        for p in pages.values():
+            try:
+                await p.close()
+            except Exception:
+                pass
@@ -0,0 +1,292 @@
+# db.py
+"""
+统一的 SQLite 访问层：
+  - 每个库一个长连接写者 + 一个长连接读者（WAL 下读写互不阻塞）
+  - WAL / synchronous=NORMAL / 内存临时表 / 较大页缓存 / busy_timeout
+  - 长连接 + cached_statements，同一条 SQL 复用已编译语句
+写者带锁，可以在 asyncio.to_thread 的工作线程里用。
+"""
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",     # WAL 下足够安全，少一次 fsync
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",      # 约 16 MB 页缓存
+    "PRAGMA busy_timeout=30000",
+]
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, cached_statements=256)
+    for p in PRAGMAS:
+        conn.execute(p)
+    return conn
+
+
+class Database:
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: sqlite3.Connection | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._write_lock = threading.RLock()
+        self._read_lock = threading.RLock()
+
+    @contextmanager
+    def write(self):
+        """串行写：同一时刻只有一个线程拿到写连接"""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = _open(self.path)
+            yield self._writer
+
+    @contextmanager
+    def read(self):
+        """独立的读连接：报表等读操作不被写事务挡住"""
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = _open(self.path)
+            yield self._reader
+
+    def close(self):
+        with self._write_lock, self._read_lock:
+            for conn in (self._writer, self._reader):
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._writer = self._reader = None
+
+
+_databases: dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_db(path: str) -> Database:
+    """按路径复用 Database（进程内单例）"""
+    with _databases_lock:
+        db = _databases.get(path)
+        if db is None:
+            db = _databases[path] = Database(path)
+        return db
+
+
+@atexit.register
+def close_all():
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
+
+
+def init_schema(conn: sqlite3.Connection):
+    """
+    初始化或迁移 SQLite：
+      - 增加 company/location/source 列
+      - 建唯一索引 (source, job_id) 避免平台间冲突
+      - 增加整型时间列 seen_ts（unix 秒）并建索引，按时间倒序查询不再全表扫描
+      - 跨站点去重：canonical_rowid 列 + 指纹表（见 dedup.py）
+      - 详情页补全缓存 job_details（见 enrich.py）
+      - report_dirty：报表已经输出过、之后又被 UPDATE 的行（见 outputs.py 的补丁行）
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id   TEXT,
+            title    TEXT,
+            link     TEXT,
+            company  TEXT,
+            location TEXT,
+            source   TEXT DEFAULT 'seek',
+            seen_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # 迁移：补列
+    cur.execute("PRAGMA table_info(jobs)")
+    cols = {row[1] for row in cur.fetchall()}
+    if "company" not in cols:
+        cur.execute("ALTER TABLE jobs ADD COLUMN company TEXT")
+    if "location" not in cols:
+        cur.execute("ALTER TABLE jobs ADD COLUMN location TEXT")
+    if "source" not in cols:
+        cur.execute("ALTER TABLE jobs ADD COLUMN source TEXT DEFAULT 'seek'")
+        cur.execute("UPDATE jobs SET source='seek' WHERE source IS NULL OR source=''")
+    if "seen_ts" not in cols:
+        cur.execute("ALTER TABLE jobs ADD COLUMN seen_ts INTEGER")
+    if "canonical_rowid" not in cols:
+        cur.execute("ALTER TABLE jobs ADD COLUMN canonical_rowid INTEGER")  # NULL = 自己就是正本
+    # 回填：旧行从 seen_at 换算（缺失的按当前时间）
+    cur.execute("""
+        UPDATE jobs
+        SET seen_ts = COALESCE(CAST(strftime('%s', seen_at) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+        WHERE seen_ts IS NULL
+    """)
+    # ALTER TABLE 不能加表达式默认值，用触发器兜住没带 seen_ts 的插入
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_seen_ts
+        AFTER INSERT ON jobs
+        WHEN NEW.seen_ts IS NULL
+        BEGIN
+            UPDATE jobs SET seen_ts = CAST(strftime('%s', COALESCE(NEW.seen_at, 'now')) AS INTEGER)
+            WHERE rowid = NEW.rowid;
+        END
+    """)
+    # 唯一索引（若不存在）
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_source_jobid
+        ON jobs(source, job_id)
+    """)
+    # 时间倒序 + 按来源/地点过滤的 keyset 分页索引（rowid 隐含在索引里做并列排序）
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_seen_ts ON jobs(seen_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source_seen_ts ON jobs(source, seen_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_location_seen_ts ON jobs(location, seen_ts)")
+    # 通知发件箱：与 jobs 同事务写入，送达后删除（见 outbox.py）
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS notify_outbox (
+            id         INTEGER PRIMARY KEY,
+            source     TEXT,
+            job_id     TEXT,
+            text       TEXT,
+            created_ts INTEGER
+        )
+    """)
+    # 近重复指纹：每行一条校验数据 + BANDS 条 LSH 桶键（按 (band, key) 等值查候选）
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_fingerprints (
+            job_rowid    INTEGER PRIMARY KEY,
+            company_key  TEXT,
+            title_key    TEXT,
+            location_key TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_fp_bands (
+            band      INTEGER,
+            key       INTEGER,
+            job_rowid INTEGER
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_fp_bands ON job_fp_bands(band, key)")
+    # 详情页补全缓存（见 enrich.py）：status = ok / miss（页面上没有可用数据，也不再重抓）
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_details (
+            source      TEXT,
+            job_id      TEXT,
+            company     TEXT,
+            location    TEXT,
+            description TEXT,
+            date_posted TEXT,
+            status      TEXT,
+            fetched_ts  INTEGER,
+            PRIMARY KEY (source, job_id)
+        )
+    """)
+    cur.execute("CREATE TABLE IF NOT EXISTS report_dirty (job_rowid INTEGER PRIMARY KEY)")
+    conn.commit()
+
+
+JOB_COLUMNS = ("job_id", "title", "company", "location", "source", "link", "seen_at", "seen_ts",
+               "canonical_rowid")
+
+
+def recent_jobs(
+    conn: sqlite3.Connection,
+    limit: int = 100,
+    source: str | None = None,
+    location: str | None = None,
+    before: tuple[int, int] | None = None,
+) -> tuple[list[dict], tuple[int, int] | None]:
+    """
+    最近入库的职位（seen_ts 倒序），keyset 分页（recent.py 命令行用它翻历史）：
+      - source / location：精确过滤（各有 (col, seen_ts) 索引）
+      - before：上一页返回的游标 (seen_ts, rowid)，取更早的一页
+    返回 (rows, next_cursor)；没有更多时 next_cursor 为 None。
+    查询只走索引范围扫描，耗时与表大小无关。
+    """
+    where, args = [], []
+    if source:
+        where.append("source = ?")
+        args.append(source)
+    if location:
+        where.append("location = ?")
+        args.append(location)
+    if before:
+        where.append("(seen_ts, rowid) < (?, ?)")
+        args.extend(before)
+    sql = (
+        f"SELECT rowid, {', '.join(JOB_COLUMNS)} FROM jobs"
+        + (f" WHERE {' AND '.join(where)}" if where else "")
+        + " ORDER BY seen_ts DESC, rowid DESC LIMIT ?"
+    )
+    args.append(limit)
+    rows = conn.execute(sql, args).fetchall()
+    out = [dict(zip(JOB_COLUMNS, r[1:])) for r in rows]
+    cursor = (rows[-1][8], rows[-1][0]) if len(rows) == limit else None
+    return out, cursor
+
+
+class SeenIndex:
+    """
+    内存里的已入库 job_id 集合（按 source 分组），启动时从 jobs 表载入一次，
+    新增入库时同步 add。适配器拿它在读到 id 后就跳过已知卡片。
+    """
+
+    def __init__(self):
+        self._ids: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, conn: sqlite3.Connection):
+        ids: dict[str, set[str]] = {}
+        for source, job_id in conn.execute("SELECT source, job_id FROM jobs"):
+            if job_id:
+                ids.setdefault(source or "seek", set()).add(job_id)
+        with self._lock:
+            self._ids = ids
+
+    def view(self, source: str) -> set[str]:
+        """该 source 的实时集合（只读使用；GIL 下成员判断是线程安全的）"""
+        with self._lock:
+            return self._ids.setdefault(source, set())
+
+    def add_many(self, source: str, job_ids):
+        s = self.view(source)
+        s.update(j for j in job_ids if j)
+
+    def __len__(self):
+        return sum(len(s) for s in self._ids.values())
+
+
+def jobs_after(conn: sqlite3.Connection, after_rowid: int = 0, limit: int = 5000) -> list[tuple]:
+    """按 rowid 正序取 after_rowid 之后新写入的行：(rowid, *JOB_COLUMNS)；走主键范围扫描"""
+    return conn.execute(
+        f"SELECT rowid, {', '.join(JOB_COLUMNS)} FROM jobs WHERE rowid > ? ORDER BY rowid LIMIT ?",
+        (after_rowid, limit),
+    ).fetchall()
+
+
+def mark_report_dirty(cur: sqlite3.Cursor, rowids):
+    """在调用方的事务里标记“改过的行”，下次生成报表时补发（不 commit）"""
+    cur.executemany("INSERT OR IGNORE INTO report_dirty(job_rowid) VALUES(?)", [(r,) for r in rowids])
+
+
+def dirty_jobs(conn: sqlite3.Connection, upto_rowid: int) -> tuple[list[int], list[tuple]]:
+    """
+    待补发的行：(全部脏 rowid, rowid ≤ upto_rowid 的那些行的 (rowid, *JOB_COLUMNS))。
+    水位之后的行还没输出过，会按新值正常追加，不用补丁。
+    """
+    ids = [r[0] for r in conn.execute("SELECT job_rowid FROM report_dirty ORDER BY job_rowid")]
+    rows = conn.execute(
+        f"SELECT j.rowid, {', '.join('j.' + c for c in JOB_COLUMNS)} FROM report_dirty d "
+        f"JOIN jobs j ON j.rowid = d.job_rowid WHERE d.job_rowid <= ? ORDER BY d.job_rowid",
+        (upto_rowid,),
+    ).fetchall()
+    return ids, rows
+
+
+def clear_report_dirty(conn: sqlite3.Connection, rowids: list[int]):
+    conn.executemany("DELETE FROM report_dirty WHERE job_rowid=?", [(r,) for r in rowids])
+    conn.commit()
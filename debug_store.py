@@ -0,0 +1,231 @@
+# debug_store.py
+"""
+调试产物存储（原来每轮在事件循环上同步写 debug_cards/*.html、debug_*.html/png，从不清理）：
+  - 卡片类产物（缺字段的卡片、LinkedIn 前几张卡片）按 DEBUG_SAMPLE_RATE 采样，每轮最多 DEBUG_MAX_PER_CYCLE 个
+  - save() 只进队列、立即返回；后台线程 gzip 压缩落盘（PNG 本身已压缩，原样写）
+  - 环形缓冲：文件数超过 DEBUG_MAX_FILES 或总大小超过 DEBUG_MAX_MB 时从最旧的删起；启动时按 mtime 接上旧文件
+  - 每轮一个索引 index/<cycle>.json（产物类型、站点、原因、URL、文件名、大小），只留最近 DEBUG_MAX_INDEXES 个
+  - 整页截图看错误策略 DEBUG_SCREENSHOTS：off 不截；first 每轮每站点只截第一次出错（默认）；all 每次出错都截
+队列满时直接丢弃新产物（调试数据不值得让抓取等）。
+"""
+import os
+import gzip
+import json
+import time
+import queue
+import random
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Optional, Union
+
+DEBUG_DIR = Path(os.getenv("DEBUG_DIR", "debug_artifacts"))
+SAMPLE_RATE = float(os.getenv("DEBUG_SAMPLE_RATE", "0.1"))
+MAX_PER_CYCLE = int(os.getenv("DEBUG_MAX_PER_CYCLE", "30"))
+MAX_FILES = int(os.getenv("DEBUG_MAX_FILES", "300"))
+MAX_BYTES = int(float(os.getenv("DEBUG_MAX_MB", "50")) * 1024 * 1024)
+MAX_INDEXES = int(os.getenv("DEBUG_MAX_INDEXES", "200"))
+SCREENSHOT_POLICY = os.getenv("DEBUG_SCREENSHOTS", "first").lower()  # off | first | all
+QUEUE_SIZE = 256
+
+_STOP = object()
+
+
+class DebugStore:
+    def __init__(self, root: Path = DEBUG_DIR, sample_rate: float = SAMPLE_RATE,
+                 max_per_cycle: int = MAX_PER_CYCLE, max_files: int = MAX_FILES,
+                 max_bytes: int = MAX_BYTES, max_indexes: int = MAX_INDEXES,
+                 screenshot_policy: str = SCREENSHOT_POLICY):
+        self.root = Path(root)
+        self.index_dir = self.root / "index"
+        self.sample_rate = sample_rate
+        self.max_per_cycle = max_per_cycle
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_indexes = max_indexes
+        self.screenshot_policy = screenshot_policy
+        self.cycle = time.strftime("%Y%m%d-%H%M%S")
+        self._seq = 0
+        self._sampled = 0                     # 本轮已收的采样类产物
+        self._shot_sources: set[str] = set()  # 本轮已截过图的站点（first 策略）
+        self._entries: list[dict] = []        # 本轮索引（写线程追加）
+        self._ring: deque = deque()           # [(path, bytes)] 最旧在左
+        self._ring_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"saved": 0, "bytes": 0, "evicted": 0, "dropped": 0, "screenshots": 0}
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 生命周期 ----------
+    def start(self):
+        if self._thread is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.index_dir.mkdir(exist_ok=True)
+            self._load_ring()
+            self._thread = threading.Thread(target=self._worker, name="debug-store", daemon=True)
+            self._thread.start()
+        return self
+
+    def _load_ring(self):
+        files = [p for p in self.root.iterdir() if p.is_file()]
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for p in files:
+            size = p.stat().st_size
+            self._ring.append((p, size))
+            self._ring_bytes += size
+        self._evict()
+
+    def close(self):
+        """等写线程把队列写完再停"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    # ---------- 轮次 ----------
+    def new_cycle(self):
+        """采样额度/截图策略立即重置；轮次号在写线程里切换（排在上一轮产物之后）"""
+        self._sampled, self._shot_sources = 0, set()
+        self._queue.put(("cycle", time.strftime("%Y%m%d-%H%M%S")))
+
+    def end_cycle(self):
+        """把本轮索引写出去（在写线程里，排在本轮所有产物之后）"""
+        self._queue.put(("index", None))
+
+    # ---------- 采样 / 策略 ----------
+    def sampled(self) -> bool:
+        """卡片类产物：按采样率 + 每轮上限决定要不要收"""
+        if self._thread is None or self.sample_rate <= 0 or self._sampled >= self.max_per_cycle:
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        self._sampled += 1
+        return True
+
+    def wants_screenshot(self, source: str) -> bool:
+        if self._thread is None or self.screenshot_policy == "off":
+            return False
+        if self.screenshot_policy == "all":
+            return True
+        if source in self._shot_sources:
+            return False
+        self._shot_sources.add(source)
+        return True
+
+    # ---------- 写入 ----------
+    def save(self, kind: str, source: str, data: Union[str, bytes], ext: str = "html", **meta) -> bool:
+        """非阻塞：进队列就返回；未启动或队列满时丢弃"""
+        if self._thread is None:
+            return False
+        try:
+            self._queue.put_nowait(("save", (kind, source, data, ext, meta)))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return False
+
+    async def capture_page(self, page, source: str, reason: str):
+        """出错现场：HTML 总是留；整页截图按 DEBUG_SCREENSHOTS 策略"""
+        # 尝试等待一个稳定状态；如果在导航，会抛异常，忽略即可
+        for state in ("networkidle", "domcontentloaded", "load"):
+            try:
+                await page.wait_for_load_state(state, timeout=3000)
+                break
+            except Exception:
+                pass
+        url = getattr(page, "url", "") or ""
+        # 尝试用 evaluate 拿整页 HTML（比 page.content() 更不容易撞导航错误）
+        try:
+            html = await page.evaluate("() => document.documentElement.outerHTML")
+            self.save("error_page", source, html or "", reason=reason, url=url)
+        except Exception:
+            pass
+        if not self.wants_screenshot(source):
+            return
+        try:
+            png = await page.screenshot(full_page=True)
+            with self._lock:
+                self.stats["screenshots"] += 1
+            self.save("error_shot", source, png, ext="png", reason=reason, url=url)
+        except Exception:
+            pass
+
+    # ---------- 写线程 ----------
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            op, arg = item
+            try:
+                if op == "save":
+                    self._write(*arg)
+                elif op == "index":
+                    self._write_index()
+                elif op == "cycle":
+                    self._write_index()
+                    if arg != self.cycle:  # 同一秒内的两轮沿用序号，文件名不撞
+                        self.cycle, self._seq = arg, 0
+            except Exception as e:
+                print("⚠️ 调试产物写入失败:", e)
+
+    def _write(self, kind: str, source: str, data: Union[str, bytes], ext: str, meta: dict):
+        self._seq += 1
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if ext != "png":
+            data = gzip.compress(data, compresslevel=6)
+            ext += ".gz"
+        path = self.root / f"{self.cycle}-{self._seq:04d}-{source}-{kind}.{ext}"
+        path.write_bytes(data)
+        with self._lock:
+            self._ring.append((path, len(data)))
+            self._ring_bytes += len(data)
+            self.stats["saved"] += 1
+            self.stats["bytes"] += len(data)
+            self._evict()
+        self._entries.append({"file": path.name, "kind": kind, "source": source, "bytes": len(data),
+                              "ts": int(time.time()), **meta})
+
+    def _evict(self):
+        while self._ring and (len(self._ring) > self.max_files or self._ring_bytes > self.max_bytes):
+            path, size = self._ring.popleft()
+            self._ring_bytes -= size
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            self.stats["evicted"] += 1
+
+    def _write_index(self):
+        if not self._entries:
+            return
+        entries, self._entries = self._entries, []
+        path = self.index_dir / f"{self.cycle}.json"
+        if path.exists():  # 同一轮多次 end_cycle：追加
+            entries = json.loads(path.read_text(encoding="utf-8"))["artifacts"] + entries
+        path.write_text(json.dumps({"cycle": self.cycle, "artifacts": entries}, ensure_ascii=False, indent=1),
+                        encoding="utf-8")
+        indexes = sorted(self.index_dir.glob("*.json"))
+        for old in indexes[:-self.max_indexes] if self.max_indexes > 0 else []:
+            old.unlink(missing_ok=True)
+
+    # ---------- 统计 ----------
+    def take_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats, **{"ring_files": len(self._ring), "ring_mb": round(self._ring_bytes / 1048576, 1)})
+            for k in ("saved", "bytes", "evicted", "dropped", "screenshots"):
+                self.stats[k] = 0
+        return stats
+
+
+_store: Optional[DebugStore] = None
+
+
+def get_debug_store() -> DebugStore:
+    """全局单例；main 里 start()，适配器直接 save()（未启动时 save 是空操作）"""
+    global _store
+    if _store is None:
+        _store = DebugStore()
+    return _store
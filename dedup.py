@@ -0,0 +1,221 @@
+# dedup.py
+"""
+跨站点近重复识别：同一职位同时挂在 SEEK 和 LinkedIn 上时，只保留一条“正本”。
+  - 指纹：标题词集合的 MinHash 签名，按 BANDS 段做 LSH 分桶；桶键里带公司键，
+    同公司 + 标题相近才会落进同一个桶
+  - 候选查找：整批新行的桶键一次 join job_fp_bands(band, key) 索引 + seen_ts 时间窗口，不扫全表，
+    成本只和桶大小有关，不随历史增长
+  - 窗口外的桶键定期清掉（prune），桶不会随历史无限变大
+  - 校验：标题词 Jaccard ≥ DEDUP_MIN_JACCARD，且两边地点都已知时至少有一个地名词相同
+重复行写 jobs.canonical_rowid 指向正本；它不再发通知，也不进 HTML 报表。
+"""
+import os
+import hashlib
+import random
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Optional
+
+from title_filter import normalize_title
+
+BANDS = 8
+ROWS = 2  # 每段几个 MinHash：8×2 时 Jaccard 0.6 的一对约 97% 概率成为候选
+MIN_JACCARD = float(os.getenv("DEDUP_MIN_JACCARD", "0.6"))
+WINDOW_DAYS = int(os.getenv("DEDUP_WINDOW_DAYS", "30"))
+ENABLED = os.getenv("DEDUP_CROSS_SOURCE", "1") == "1"
+
+_MASK = (1 << 61) - 1  # 梅森素数，MinHash 的线性置换取模
+_rng = random.Random(20240611)
+_PERMS = [(_rng.randrange(1, _MASK), _rng.randrange(0, _MASK)) for _ in range(BANDS * ROWS)]
+
+_TITLE_STOP = {"a", "an", "and", "the", "of", "in", "for", "to", "with", "at", "job", "role"}
+_COMPANY_STOP = {
+    "ltd", "limited", "pty", "inc", "llc", "co", "corp", "corporation", "company",
+    "group", "the", "nz", "new", "zealand", "au", "australia",
+}
+_LOCATION_STOP = {"new", "zealand", "nz", "australia", "au", "cbd", "central", "region", "area", "unknown"}
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(t: str) -> int:
+    return _h64(t)  # 标题词高度重复，缓存掉
+
+
+def title_tokens(title: str) -> frozenset[str]:
+    return frozenset(t for t in normalize_title(title).split() if t not in _TITLE_STOP)
+
+
+def company_key(company: str) -> str:
+    toks = [t for t in normalize_title(company).split() if t not in _COMPANY_STOP]
+    key = " ".join(toks)
+    return "" if key == "unknown" else key
+
+
+def location_tokens(location: str) -> frozenset[str]:
+    return frozenset(t for t in normalize_title(location).split() if t not in _LOCATION_STOP)
+
+
+def minhash(tokens: frozenset[str]) -> list[int]:
+    hs = [_token_hash(t) for t in tokens]
+    return [min((a * h + b) & _MASK for h in hs) for a, b in _PERMS]
+
+
+def band_keys(company: str, sig: list[int]) -> list[tuple[int, int]]:
+    """[(band, key)]；key 是 (公司键, 段号, 段内签名) 的 63 位哈希（SQLite INTEGER 放得下）"""
+    out = []
+    for b in range(BANDS):
+        part = ",".join(str(v) for v in sig[b * ROWS:(b + 1) * ROWS])
+        out.append((b, _h64(f"{company}|{b}|{part}") >> 1))
+    return out
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _fingerprint(job: dict) -> Optional[tuple[str, frozenset, frozenset]]:
+    """(公司键, 标题词, 地点词)；公司或标题缺失时不做指纹"""
+    company = company_key(job.get("company") or "")
+    tokens = title_tokens(job.get("title") or "")
+    if not company or not tokens:
+        return None
+    return company, tokens, location_tokens(job.get("location") or "")
+
+
+def _candidates(cur: sqlite3.Cursor, source: str, probes: list[tuple[int, str, int, int]],
+                since_ts: int) -> dict[int, list[tuple]]:
+    """
+    整批一次查候选：probes = [(序号, 公司键, band, key)] 灌进临时表，与桶索引等值 join。
+    CROSS JOIN 固定连接顺序（探针表驱动），否则没有统计信息时规划器可能去扫整个桶表。
+    返回 {序号: [(正本 rowid, title_key, location_key), ...]}
+    """
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _fp_probe (
+            idx     INTEGER,
+            company TEXT,
+            band    INTEGER,
+            key     INTEGER
+        )
+    """)
+    cur.execute("DELETE FROM temp._fp_probe")
+    cur.executemany("INSERT INTO temp._fp_probe(idx, company, band, key) VALUES(?,?,?,?)", probes)
+    out: dict[int, list[tuple]] = {}
+    for idx, canonical, title_key, location_key in cur.execute("""
+        SELECT DISTINCT p.idx, COALESCE(j.canonical_rowid, j.rowid), f.title_key, f.location_key
+        FROM temp._fp_probe p
+        CROSS JOIN job_fp_bands b
+        CROSS JOIN job_fingerprints f
+        CROSS JOIN jobs j
+        WHERE b.band = p.band AND b.key = p.key
+          AND f.job_rowid = b.job_rowid AND f.company_key = p.company
+          AND j.rowid = b.job_rowid AND j.source != ? AND j.seen_ts >= ?
+    """, (source, since_ts)):
+        out.setdefault(idx, []).append((canonical, title_key, location_key))
+    cur.execute("DELETE FROM temp._fp_probe")
+    return out
+
+
+def _best(fp, candidates: list[tuple]) -> Optional[int]:
+    _company, tokens, loc = fp
+    best, best_score = None, MIN_JACCARD
+    for canonical, title_key, location_key in candidates:
+        other_loc = frozenset((location_key or "").split())
+        if loc and other_loc and not (loc & other_loc):
+            continue
+        score = jaccard(tokens, frozenset(title_key.split()))
+        if score >= best_score:
+            best, best_score = canonical, score
+    return best
+
+
+def _store_many(cur: sqlite3.Cursor, items: list[tuple[int, tuple, list]]):
+    """items：[(rowid, 指纹, 桶键)]"""
+    cur.executemany(
+        "INSERT OR REPLACE INTO job_fingerprints(job_rowid, company_key, title_key, location_key) VALUES(?,?,?,?)",
+        [(rowid, fp[0], " ".join(sorted(fp[1])), " ".join(sorted(fp[2]))) for rowid, fp, _ in items],
+    )
+    cur.executemany(
+        "INSERT INTO job_fp_bands(band, key, job_rowid) VALUES(?,?,?)",
+        [(b, k, rowid) for rowid, _, keys in items for b, k in keys],
+    )
+
+
+def link_new(cur: sqlite3.Cursor, source: str, rows: list[tuple[int, dict]]) -> dict[str, int]:
+    """
+    在调用方的事务里给新入库的行做指纹、找跨站点正本（不 commit）。
+    rows：[(rowid, job)]；返回 {job_id: 正本 rowid}，只含被判为重复的。
+    """
+    if not ENABLED or not rows:
+        return {}
+    todo = []
+    for rowid, job in rows:
+        fp = _fingerprint(job)
+        if fp is not None:
+            todo.append((rowid, job, fp, band_keys(fp[0], minhash(fp[1]))))
+    if not todo:
+        return {}
+    since_ts = int(time.time()) - WINDOW_DAYS * 86400
+    probes = [(i, fp[0], b, k) for i, (_, _, fp, keys) in enumerate(todo) for b, k in keys]
+    candidates = _candidates(cur, source, probes, since_ts)
+
+    dups: dict[str, int] = {}
+    links = []
+    for i, (rowid, job, fp, keys) in enumerate(todo):
+        canonical = _best(fp, candidates.get(i, []))
+        if canonical is not None:
+            dups[job["job_id"]] = canonical
+            links.append((canonical, rowid))
+    _store_many(cur, [(rowid, fp, keys) for rowid, _, fp, keys in todo])
+    if links:
+        cur.executemany("UPDATE jobs SET canonical_rowid=? WHERE rowid=?", links)
+    return dups
+
+
+def relink(cur: sqlite3.Cursor, source: str, rows: list[tuple[int, dict]]) -> dict[str, int]:
+    """
+    已入库的行字段被原地补全后（enrich sweep）：删掉旧指纹/桶键，按新值重做 link_new（不 commit）。
+    已经有正本的行不动。
+    """
+    if not ENABLED or not rows:
+        return {}
+    ids = [(rowid,) for rowid, _ in rows]
+    cur.executemany("DELETE FROM job_fp_bands WHERE job_rowid=?", ids)
+    cur.executemany("DELETE FROM job_fingerprints WHERE job_rowid=?", ids)
+    return link_new(cur, source, rows)
+
+
+def prune(conn: sqlite3.Connection, window_days: int = WINDOW_DAYS) -> int:
+    """删掉时间窗口外的桶键/指纹：桶大小只取决于窗口内的职位数，与历史总量无关"""
+    since_ts = int(time.time()) - window_days * 86400
+    old = "SELECT rowid FROM jobs WHERE seen_ts < ?"
+    n = conn.execute(f"DELETE FROM job_fp_bands WHERE job_rowid IN ({old})", (since_ts,)).rowcount
+    conn.execute(f"DELETE FROM job_fingerprints WHERE job_rowid IN ({old})", (since_ts,))
+    conn.commit()
+    return n
+
+
+def backfill(conn: sqlite3.Connection, window_days: int = WINDOW_DAYS) -> int:
+    """给时间窗口内还没有指纹的行补指纹（不做链接），让新行能匹配到升级前的历史"""
+    if not ENABLED:
+        return 0
+    since_ts = int(time.time()) - window_days * 86400
+    cur = conn.cursor()
+    todo = cur.execute("""
+        SELECT j.rowid, j.title, j.company, j.location FROM jobs j
+        WHERE j.seen_ts >= ? AND NOT EXISTS (SELECT 1 FROM job_fingerprints f WHERE f.job_rowid = j.rowid)
+    """, (since_ts,)).fetchall()
+    items = []
+    for rowid, title, company, location in todo:
+        fp = _fingerprint({"title": title, "company": company, "location": location})
+        if fp is not None:
+            items.append((rowid, fp, band_keys(fp[0], minhash(fp[1]))))
+    _store_many(cur, items)
+    conn.commit()
+    return len(items)
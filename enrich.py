@@ -0,0 +1,405 @@
+# enrich.py
+"""
+详情页补全：卡片上缺公司/地点（"Unknown"）的职位，开详情页读 JSON-LD JobPosting 补齐。
+  - 只排队不完整的职位；有界 worker 池（ENRICH_CONCURRENCY 个标签页）并发抓，每页一次 evaluate；
+    走 HTTP 快速通道时（via 是 HttpFetcher）直接 GET 详情页、正则取 ld+json，不开浏览器
+  - 结果（含 description / datePosted）缓存在 job_details，主键 (source, job_id)：
+    同一个详情页只抓一次，浏览器里也没拿到字段的记下来（status='miss'），不再重抓；
+    HTTP 路径拿不到 JSON-LD 的不记，留给浏览器路径
+  - 入库前：直接改本批 job dict（通知/报表拿到的就是补全后的值）
+  - sweep()：库里以前存成 Unknown 的行，补全后原地 UPDATE jobs，标记给报表补发、重做跨站点去重
+每轮最多抓 ENRICH_MAX_PER_CYCLE 个详情页，避免触发风控。
+"""
+import os
+import re
+import json
+import html
+import time
+import asyncio
+from typing import Callable, Optional, Union
+
+from playwright.async_api import BrowserContext
+
+import dedup
+from db import mark_report_dirty
+from fastpath import HttpFetcher, detect_block, ld_json_blocks
+
+ENABLED = os.getenv("ENRICH_DETAILS", "1") == "1"
+CONCURRENCY = max(1, int(os.getenv("ENRICH_CONCURRENCY", "3")))
+MAX_PER_CYCLE = int(os.getenv("ENRICH_MAX_PER_CYCLE", "20"))
+TIMEOUT_MS = int(os.getenv("ENRICH_TIMEOUT_MS", "20000"))
+SWEEP_DAYS = int(os.getenv("ENRICH_SWEEP_DAYS", "7"))  # sweep 只看最近几天入库的行
+
+UNKNOWN = "Unknown"
+POSTING_TYPES = {"JobPosting", "Posting", "Job"}
+
+# JSON-LD 没有时的可见元素兜底
+DETAIL_SELECTORS = {
+    "seek": {
+        "company": [
+            "[data-automation='advertiser-name']",
+            "[data-testid='advertiser-name']",
+            "a[href*='company-profile']",
+        ],
+        "location": [
+            "[data-automation='job-detail-location']",
+            "[data-testid='job-detail-location']",
+        ],
+    },
+    "linkedin": {
+        "company": [
+            ".topcard__org-name-link",
+            ".job-details-jobs-unified-top-card__company-name",
+            ".jobs-unified-top-card__company-name",
+        ],
+        "location": [
+            ".topcard__flavor--bullet",
+            ".job-details-jobs-unified-top-card__bullet",
+            ".jobs-unified-top-card__bullet",
+        ],
+    },
+}
+
+# 一次往返：所有 ld+json 原文 + 兜底选择器文本
+_DETAIL_JS = """
+([companySel, locationSel]) => {
+  const textFirst = (sels) => {
+    for (const s of sels) {
+      let el = null;
+      try { el = document.querySelector(s); } catch (e) {}
+      const t = el && (el.innerText || el.textContent || '').trim();
+      if (t) return t;
+    }
+    return null;
+  };
+  const ld = Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+    .map(s => s.textContent || '');
+  return { ld, company: textFirst(companySel), location: textFirst(locationSel) };
+}
+"""
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _norm(s) -> Optional[str]:
+    if not isinstance(s, str):
+        return None
+    s = " ".join(s.split())
+    return s or None
+
+
+def _html_to_text(s: Optional[str]) -> Optional[str]:
+    if not s:
+        return None
+    s = re.sub(r"(?i)<br\s*/?>|</p>|</li>", "\n", s)
+    s = html.unescape(_TAG_RE.sub(" ", s))
+    lines = (" ".join(line.split()) for line in s.splitlines())
+    return "\n".join(line for line in lines if line) or None
+
+
+def _iter_nodes(data):
+    """JSON-LD 可能是对象、数组或 @graph"""
+    if isinstance(data, list):
+        for d in data:
+            yield from _iter_nodes(d)
+    elif isinstance(data, dict):
+        yield data
+        if isinstance(data.get("@graph"), list):
+            yield from _iter_nodes(data["@graph"])
+
+
+def _is_posting(node: dict) -> bool:
+    t = node.get("@type")
+    types = t if isinstance(t, list) else [t]
+    return any(x in POSTING_TYPES for x in types)
+
+
+def _location_of(jl) -> Optional[str]:
+    if isinstance(jl, list):
+        jl = jl[0] if jl else None
+    if not isinstance(jl, dict):
+        return None
+    addr = jl.get("address") or {}
+    if isinstance(addr, str):
+        return _norm(addr)
+    if not isinstance(addr, dict):
+        return None
+    country = addr.get("addressCountry")
+    if isinstance(country, dict):
+        country = country.get("name")
+    parts = [_norm(addr.get(k)) for k in ("addressLocality", "addressRegion")] + [_norm(country)]
+    return ", ".join(dict.fromkeys(p for p in parts if p)) or None
+
+
+def parse_job_posting(ld_texts: list[str]) -> Optional[dict]:
+    """从 ld+json 原文里找第一个 JobPosting：{company, location, description, date_posted}"""
+    for txt in ld_texts or []:
+        try:
+            data = json.loads(txt)
+        except Exception:
+            continue
+        for node in _iter_nodes(data):
+            if not _is_posting(node):
+                continue
+            org = node.get("hiringOrganization") or {}
+            company = None
+            if isinstance(org, dict):
+                company = org.get("name") or (org.get("identifier") or {}).get("name")
+            elif isinstance(org, str):
+                company = org
+            return {
+                "company": _norm(company),
+                "location": _location_of(node.get("jobLocation")),
+                "description": _html_to_text(node.get("description")),
+                "date_posted": _norm(node.get("datePosted")),
+            }
+    return None
+
+
+def is_incomplete(job: dict) -> bool:
+    return (job.get("company") or UNKNOWN) == UNKNOWN or (job.get("location") or UNKNOWN) == UNKNOWN
+
+
+def _apply(job: dict, details: dict) -> bool:
+    """只覆盖 Unknown 字段；返回是否有改动"""
+    changed = False
+    for field in ("company", "location"):
+        if (job.get(field) or UNKNOWN) == UNKNOWN and details.get(field):
+            job[field] = details[field]
+            changed = True
+    if details.get("date_posted"):
+        job.setdefault("date_posted", details["date_posted"])
+    return changed
+
+
+class DetailEnricher:
+    def __init__(self, db, concurrency: int = CONCURRENCY, max_per_cycle: int = MAX_PER_CYCLE):
+        self.db = db                      # db.Database
+        self.concurrency = concurrency
+        self.max_per_cycle = max_per_cycle
+        self.budget = max_per_cycle
+        self.stats = {"cached": 0, "fetched": 0, "filled": 0, "miss": 0, "error": 0}
+        # HTTP 拿不到 JSON-LD 的详情页不落缓存（可能是前端渲染的），留给浏览器路径用可见元素兜底；
+        # 进程内记一下，HTTP 路径不再反复花预算
+        self._http_missed: set[tuple[str, str]] = set()
+
+    def new_cycle(self):
+        self.budget = self.max_per_cycle
+
+    def take_stats(self) -> dict:
+        stats = self.stats
+        self.stats = {k: 0 for k in stats}
+        return stats
+
+    # ---------- 缓存 ----------
+    def _cached(self, source: str, ids: list[str]) -> dict[str, dict]:
+        if not ids:
+            return {}
+        out = {}
+        with self.db.read() as conn:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                for job_id, company, location, description, date_posted in conn.execute(
+                    f"SELECT job_id, company, location, description, date_posted FROM job_details "
+                    f"WHERE source=? AND job_id IN ({','.join('?' * len(chunk))})",
+                    [source, *chunk],
+                ):
+                    out[job_id] = {"company": company, "location": location,
+                                   "description": description, "date_posted": date_posted}
+        return out
+
+    def _save(self, source: str, results: list[tuple[dict, Optional[dict]]], update_jobs: bool):
+        """写缓存；update_jobs=True 时顺带原地补 jobs 表里的 Unknown 字段"""
+        now = int(time.time())
+        with self.db.write() as conn:
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO job_details(source, job_id, company, location, description, "
+                    "date_posted, status, fetched_ts) VALUES(?,?,?,?,?,?,?,?)",
+                    [
+                        (source, job["job_id"], d.get("company"), d.get("location"), d.get("description"),
+                         d.get("date_posted"), "ok", now) if d else
+                        (source, job["job_id"], None, None, None, None, "miss", now)
+                        for job, d in results
+                    ],
+                )
+                if update_jobs:
+                    self._update_jobs(conn.cursor(), source, [job for job, d in results if d])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @staticmethod
+    def _update_jobs(cur, source: str, jobs: list[dict]):
+        """
+        原地补 jobs 表的 Unknown 字段（在调用方事务里）。真正改了的行：
+        标记给报表补发，并按新的公司/地点重做跨站点去重（没有正本的才重做）。
+        """
+        changed = []
+        for job in jobs:
+            company = job["company"] if job["company"] != UNKNOWN else None
+            location = job["location"] if job["location"] != UNKNOWN else None
+            cur.execute(
+                "UPDATE jobs SET company=COALESCE(?1, company), location=COALESCE(?2, location) "
+                "WHERE source=?3 AND job_id=?4 "
+                "AND (company IS NOT COALESCE(?1, company) OR location IS NOT COALESCE(?2, location))",
+                (company, location, source, job["job_id"]),
+            )
+            if cur.rowcount:
+                changed.append(job["job_id"])
+        if not changed:
+            return
+        rows = []
+        for i in range(0, len(changed), 500):
+            chunk = changed[i:i + 500]
+            rows += cur.execute(
+                f"SELECT rowid, job_id, title, company, location, canonical_rowid FROM jobs "
+                f"WHERE source=? AND job_id IN ({','.join('?' * len(chunk))})",
+                [source, *chunk],
+            ).fetchall()
+        mark_report_dirty(cur, [r[0] for r in rows])
+        dedup.relink(cur, source, [
+            (rowid, {"job_id": job_id, "title": title, "company": company, "location": location})
+            for rowid, job_id, title, company, location, canonical in rows if canonical is None
+        ])
+
+    # ---------- 抓取 ----------
+    async def _fetch_all(self, context: BrowserContext, source: str, jobs: list[dict]) -> list[tuple[dict, Optional[dict]]]:
+        """有界 worker 池：每个 worker 一个标签页，顺序处理队列里的详情页"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for j in jobs:
+            queue.put_nowait(j)
+        sels = DETAIL_SELECTORS.get(source, {"company": [], "location": []})
+        results: list[tuple[dict, Optional[dict]]] = []
+
+        async def worker():
+            page = None
+            try:
+                while True:
+                    try:
+                        job = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    if page is None:
+                        page = await context.new_page()
+                    try:
+                        await page.goto(job["link"], wait_until="domcontentloaded", timeout=TIMEOUT_MS)
+                        data = await page.evaluate(_DETAIL_JS, [sels["company"], sels["location"]]) or {}
+                    except Exception as e:
+                        self.stats["error"] += 1
+                        print(f"⚠️ [{source}] 详情页失败 {job['job_id']}: {e}")
+                        continue  # 不缓存，下轮再试
+                    self.stats["fetched"] += 1
+                    details = parse_job_posting(data.get("ld") or [])
+                    if details is None and (data.get("company") or data.get("location")):
+                        details = {"company": _norm(data.get("company")), "location": _norm(data.get("location")),
+                                   "description": None, "date_posted": None}
+                    results.append((job, details))
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(jobs)))))
+        return results
+
+    async def _fetch_all_http(self, fetcher: HttpFetcher, source: str, jobs: list[dict]) -> list[tuple[dict, Optional[dict]]]:
+        """HTTP 版：同样最多 concurrency 个并发请求；被拦/出错/没有 JSON-LD 的都不缓存"""
+        sem = asyncio.Semaphore(self.concurrency)
+        results: list[tuple[dict, Optional[dict]]] = []
+
+        async def one(job: dict):
+            async with sem:
+                status, url, text = await fetcher.aget(job["link"])
+            reason = detect_block(status, url, text)
+            details = None if reason else parse_job_posting(ld_json_blocks(text))
+            if details is None and not reason:  # 没有 JSON-LD 又带验证码组件：当成被拦
+                reason = detect_block(status, url, text, empty=True)
+            if reason:
+                self.stats["error"] += 1
+                print(f"⚠️ [{source}] 详情页失败 {job['job_id']}: {reason}")
+                return
+            self.stats["fetched"] += 1
+            if details is None:
+                self.stats["miss"] += 1
+                self._http_missed.add((source, job["job_id"]))
+                return
+            results.append((job, details))
+
+        await asyncio.gather(*(one(j) for j in jobs))
+        return results
+
+    async def _run(self, via: Union[BrowserContext, HttpFetcher], source: str, jobs: list[dict],
+                   update_jobs: bool) -> int:
+        """补全 jobs（原地改 dict）；返回补上字段的条数"""
+        cached = await asyncio.to_thread(self._cached, source, [j["job_id"] for j in jobs])
+        filled = 0
+        todo = []
+        via_http = isinstance(via, HttpFetcher)
+        for j in jobs:
+            hit = cached.get(j["job_id"])
+            if j["job_id"] in cached:
+                self.stats["cached"] += 1
+                if hit and _apply(j, hit):
+                    filled += 1
+            elif via_http and (source, j["job_id"]) in self._http_missed:
+                continue
+            elif self.budget > 0:
+                self.budget -= 1
+                todo.append(j)
+        if not todo:
+            return filled
+        if via_http:
+            results = await self._fetch_all_http(via, source, todo)
+        else:
+            results = await self._fetch_all(via, source, todo)
+        for job, details in results:
+            if details is None:
+                self.stats["miss"] += 1
+            elif _apply(job, details):
+                filled += 1
+        if results:
+            await asyncio.to_thread(self._save, source, results, update_jobs)
+        self.stats["filled"] += filled
+        return filled
+
+    async def enrich(self, via: Union[BrowserContext, HttpFetcher], source: str, jobs: list[dict],
+                     wanted: Callable[[dict], bool] = lambda j: True) -> int:
+        """入库前：只补 wanted(job) 且字段不全的职位；via 是浏览器上下文或 HTTP 客户端"""
+        if not ENABLED or not jobs:
+            return 0
+        todo = [j for j in jobs if is_incomplete(j) and j.get("link") and wanted(j)]
+        if not todo:
+            return 0
+        return await self._run(via, source, todo, update_jobs=False)
+
+    async def sweep(self, via: Union[BrowserContext, HttpFetcher]) -> int:
+        """库里近 SWEEP_DAYS 天存成 Unknown、还没抓过详情的行，补全后原地更新"""
+        if not ENABLED or self.budget <= 0:
+            return 0
+        since_ts = int(time.time()) - SWEEP_DAYS * 86400
+        # HTTP 路径会跳过已知拿不到 JSON-LD 的行，多取这么多条，免得它们占满名额
+        limit = self.budget + (len(self._http_missed) if isinstance(via, HttpFetcher) else 0)
+
+        def pending() -> list[tuple]:
+            with self.db.read() as conn:
+                return conn.execute("""
+                    SELECT j.source, j.job_id, j.company, j.location, j.link FROM jobs j
+                    WHERE j.seen_ts >= ? AND (j.company = ? OR j.location = ?) AND j.link LIKE 'http%'
+                      AND NOT EXISTS (SELECT 1 FROM job_details d WHERE d.source = j.source AND d.job_id = j.job_id)
+                    ORDER BY j.seen_ts DESC LIMIT ?
+                """, (since_ts, UNKNOWN, UNKNOWN, limit)).fetchall()
+
+        rows = await asyncio.to_thread(pending)
+        by_source: dict[str, list[dict]] = {}
+        for source, job_id, company, location, link in rows:
+            by_source.setdefault(source, []).append(
+                {"job_id": job_id, "company": company, "location": location, "link": link}
+            )
+        filled = 0
+        for source, jobs in by_source.items():
+            filled += await self._run(via, source, jobs, update_jobs=True)
+        return filled
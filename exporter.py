@@ -0,0 +1,191 @@
+# exporter.py
+"""
+新职位导出流：
+  - JSONL 分段写入 outputs/export/，当前段是明文 jobs-<序号>-<起始时间>.jsonl（可直接 tail -f）
+  - 段超过 EXPORT_ROTATE_SECONDS / EXPORT_ROTATE_BYTES / EXPORT_ROTATE_ROWS 就封口：gzip 成 .jsonl.gz，删掉明文；
+    压缩先写临时文件再改名，清单更新后才删明文，清单里列的文件任何时刻都是完整的
+  - manifest.json 记录每段的时间范围 / 行数 / 字节数，下游按时间只读需要的段（见 read_jobs）
+  - 文件句柄跨批次常开，不再每批 open + stat
+EXPORT_SINKS 选择输出：jsonl / csv（旧的 new_jobs.csv，可选），逗号分隔。
+"""
+import os
+import gzip
+import json
+import time
+import shutil
+import atexit
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Iterator, Optional
+
+from outputs import append_new_jobs_csv
+
+EXPORT_DIR = Path("outputs") / "export"
+ROTATE_SECONDS = int(os.getenv("EXPORT_ROTATE_SECONDS", str(24 * 3600)))      # 0 = 不按时间切
+ROTATE_BYTES = int(os.getenv("EXPORT_ROTATE_BYTES", str(64 * 1024 * 1024)))   # 0 = 不按大小切
+ROTATE_ROWS = int(os.getenv("EXPORT_ROTATE_ROWS", "0"))                        # 0 = 不按行数切
+SINKS = {s.strip() for s in os.getenv("EXPORT_SINKS", "jsonl,csv").split(",") if s.strip()}
+
+
+class JsonlExporter:
+    def __init__(self, root: Path = EXPORT_DIR,
+                 rotate_seconds: int = ROTATE_SECONDS, rotate_bytes: int = ROTATE_BYTES,
+                 rotate_rows: int = ROTATE_ROWS):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        self.rotate_seconds = rotate_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_rows = rotate_rows
+        self._lock = threading.Lock()
+        self._manifest: Optional[dict] = None
+        self._fh = None
+
+    # ---------- 清单 ----------
+    def _load(self) -> dict:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except Exception:
+                self._manifest = {"version": 1, "segments": []}
+        return self._manifest
+
+    def _save(self):
+        m = self._manifest
+        m["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(m, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _open_segment(self) -> Optional[dict]:
+        segs = self._load()["segments"]
+        return segs[-1] if segs and not segs[-1].get("closed") else None
+
+    # ---------- 写 ----------
+    def write(self, source: str, jobs: list[dict]) -> int:
+        """追加一批职位；返回写入行数"""
+        if not jobs:
+            return 0
+        now = int(time.time())
+        seen_at = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        lines = "".join(
+            json.dumps({
+                "job_id": j.get("job_id", ""), "title": j.get("title", ""),
+                "company": j.get("company", ""), "location": j.get("location", ""),
+                "source": source, "link": j.get("link", ""),
+                "seen_at": seen_at, "seen_ts": now,
+            }, ensure_ascii=False) + "\n"
+            for j in jobs
+        )
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            seg = self._open_segment()
+            if seg is not None and self._due(seg, now):
+                self._rotate(seg)
+                seg = None
+            if seg is None:
+                segs = self._manifest["segments"]
+                seg = {"file": f"jobs-{len(segs) + 1:05d}-{datetime.fromtimestamp(now):%Y%m%d-%H%M%S}.jsonl",
+                       "start_ts": now, "end_ts": now, "rows": 0, "bytes": 0, "closed": False}
+                segs.append(seg)
+            if self._fh is None or self._fh.closed:
+                self._fh = (self.root / seg["file"]).open("a", encoding="utf-8")
+            self._fh.write(lines)
+            self._fh.flush()
+            seg["rows"] += len(jobs)
+            seg["bytes"] = self._fh.tell()
+            seg["end_ts"] = now
+            self._save()
+        return len(jobs)
+
+    def _due(self, seg: dict, now: int) -> bool:
+        if self.rotate_seconds and now - seg["start_ts"] >= self.rotate_seconds:
+            return True
+        if self.rotate_rows and seg["rows"] >= self.rotate_rows:
+            return True
+        return bool(self.rotate_bytes and seg["bytes"] >= self.rotate_bytes)
+
+    def _rotate(self, seg: dict):
+        """
+        封口当前段：压缩成 .gz，清单里标记 closed。
+        顺序保证清单只指向完整文件：临时文件 -> 改名 -> 写清单 -> 删明文；中途崩溃清单仍指向明文段。
+        """
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        src = self.root / seg["file"]
+        dst = src.with_name(src.name + ".gz")
+        if src.exists():
+            tmp = dst.with_name(dst.name + ".tmp")
+            with src.open("rb") as fin, gzip.open(tmp, "wb") as fout:
+                shutil.copyfileobj(fin, fout)
+            os.replace(tmp, dst)
+        seg["file"] = dst.name
+        seg["closed"] = True
+        seg["gz_bytes"] = dst.stat().st_size if dst.exists() else 0
+        self._save()
+        src.unlink(missing_ok=True)
+        print(f"🗜️ 导出段封口：{dst.name}（{seg['rows']} 行）")
+
+    def rotate(self):
+        """手动封口当前段（如定时任务在归档前调用）"""
+        with self._lock:
+            seg = self._open_segment()
+            if seg is not None:
+                self._rotate(seg)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def read_jobs(root: Path = EXPORT_DIR, since_ts: int = 0, until_ts: Optional[int] = None) -> Iterator[dict]:
+    """下游读取：按清单只打开时间范围有交集的段，逐行产出记录"""
+    root = Path(root)
+    try:
+        manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+    except Exception:
+        return
+    for seg in manifest.get("segments", []):
+        if seg["end_ts"] < since_ts or (until_ts is not None and seg["start_ts"] > until_ts):
+            continue
+        path = root / seg["file"]
+        opener = gzip.open if path.suffix == ".gz" else open
+        try:
+            f = opener(path, "rt", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 写到一半的行
+                rec = json.loads(line)
+                if rec["seen_ts"] < since_ts or (until_ts is not None and rec["seen_ts"] > until_ts):
+                    continue
+                yield rec
+
+
+_exporter: Optional[JsonlExporter] = None
+
+
+def get_exporter() -> JsonlExporter:
+    global _exporter
+    if _exporter is None:
+        _exporter = JsonlExporter()
+    return _exporter
+
+
+@atexit.register
+def _close_exporter():
+    if _exporter is not None:
+        _exporter.close()
+
+
+def export_new_jobs(source: str, new_jobs: list[dict]):
+    """把本轮新增写到启用的各个输出（EXPORT_SINKS）"""
+    if "jsonl" in SINKS:
+        get_exporter().write(source, new_jobs)
+    if "csv" in SINKS:
+        append_new_jobs_csv(new_jobs)
@@ -0,0 +1,144 @@
+# fastpath.py
+"""
+免浏览器的 HTTP 快速通道：
+  - requests.Session 连接池（keep-alive），在线程里发，不占事件循环；并发由调用方 gather
+  - 复用 storage_state.json 里的 cookies（文件更新了就重新载入），和浏览器是同一个登录态
+  - 识别风控/验证码/登录墙：detect_block() 给出原因时，调用方退回 Playwright
+站点相关的解析在各自的适配器里（parse_seek_search_html / parse_linkedin_guest_html）。
+"""
+import os
+import re
+import json
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ENABLED = os.getenv("HTTP_FAST_PATH", "1") == "1"
+TIMEOUT = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))
+STORAGE_STATE = Path(os.getenv("STORAGE_STATE_PATH", "storage_state.json"))
+USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+)
+
+# 风控 / 验证码 / 登录墙的特征（URL 或正文片段，小写）
+BLOCK_URL_MARKERS = ("/checkpoint", "/authwall", "/login", "/uas/login", "captcha")
+BLOCK_BODY_MARKERS = (
+    "cf-challenge", "cf_chl_", "px-captcha",
+    "are you a robot", "verify you are human", "unusual activity", "authwall",
+)
+# 正常页面也会带的（Cloudflare 的 challenge-platform 脚本、申请表单里的验证码组件）：
+# 只有结果容器是空的时才算被拦（403/429/503 本身已经按状态码算被拦）
+SOFT_BODY_MARKERS = ("challenge-platform", "g-recaptcha", "h-captcha")
+
+
+def detect_block(status: Optional[int], url: str, text: str, empty: bool = False) -> Optional[str]:
+    """
+    返回被拦的原因；正常页面返回 None。
+    empty=True 表示调用方已解析过、结果容器是空的，这时 SOFT_BODY_MARKERS 也算被拦。
+    """
+    if status is None:
+        return "network error"
+    if status >= 400:  # 含 401/403/429/503，以及 LinkedIn 反爬的 999
+        return f"HTTP {status}"
+    url_lc = (url or "").lower()
+    for m in BLOCK_URL_MARKERS:
+        if m in url_lc:
+            return f"redirected to {m}"
+    head = (text or "")[:20000].lower()
+    for m in BLOCK_BODY_MARKERS + (SOFT_BODY_MARKERS if empty else ()):
+        if m in head:
+            return f"challenge marker '{m}'"
+    return None
+
+
+def embedded_json(text: str, marker: str):
+    """取出页面里 `marker = {...}` 形式的内嵌 JSON（如 window.SEEK_REDUX_DATA），没有返回 None"""
+    i = text.find(marker)
+    if i < 0:
+        return None
+    j = text.find("{", i + len(marker))
+    if j < 0:
+        return None
+    try:
+        obj, _ = json.JSONDecoder().raw_decode(text, j)
+        return obj
+    except ValueError:
+        return None
+
+
+_LD_RE = re.compile(
+    r"<script[^>]+type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.I | re.S
+)
+
+
+def ld_json_blocks(text: str) -> list[str]:
+    """页面里所有 ld+json 原文（详情页补全用）"""
+    return _LD_RE.findall(text or "")
+
+
+class HttpFetcher:
+    def __init__(self, storage_state: Path = STORAGE_STATE, timeout: float = TIMEOUT, pool_size: int = POOL_SIZE):
+        self.storage_state = Path(storage_state)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-NZ,en;q=0.9",
+        })
+        self._cookies_mtime: Optional[float] = None
+        self.requests = 0
+        self.bytes = 0
+
+    def load_cookies(self):
+        """storage_state.json 有更新就把 cookies 灌进 Session"""
+        try:
+            mtime = self.storage_state.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._cookies_mtime:
+            return
+        try:
+            state = json.loads(self.storage_state.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"⚠️ 读取 {self.storage_state} 失败:", e)
+            return
+        for c in state.get("cookies") or []:
+            try:
+                self.session.cookies.set(
+                    c["name"], c["value"], domain=c.get("domain"), path=c.get("path") or "/",
+                    secure=bool(c.get("secure")),
+                )
+            except Exception:
+                continue
+        self._cookies_mtime = mtime
+
+    def get(self, url: str, **headers) -> tuple[Optional[int], str, str]:
+        """同步 GET：返回 (状态码, 最终 URL, 正文)；网络错误状态码为 None"""
+        try:
+            resp = self.session.get(url, timeout=self.timeout, headers=headers or None)
+        except requests.RequestException:
+            return None, url, ""
+        self.requests += 1
+        self.bytes += len(resp.content or b"")
+        return resp.status_code, resp.url, resp.text
+
+    async def aget(self, url: str, **headers) -> tuple[Optional[int], str, str]:
+        return await asyncio.to_thread(self.get, url, **headers)
+
+    def take_stats(self) -> dict:
+        stats = {"requests": self.requests, "bytes": self.bytes}
+        self.requests = self.bytes = 0
+        return stats
+
+    def close(self):
+        self.session.close()
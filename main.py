@@ -1,21 +1,34 @@
-
 # main.py
 import os
-import re
+import json
 import time
 import sqlite3
 import asyncio
-import unicodedata
 from pathlib import Path
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
 
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright, BrowserContext
 
-from utils import notify_user
-from sites.seek_adapter import extract_seek_jobs
-from sites.linkedin_adapter import extract_linkedin_jobs
-from outputs import append_new_jobs_csv, build_html_from_db
+from notifier import get_notifier
+import outbox
+import dedup
+from enrich import DetailEnricher
+from outbox import OutboxDispatcher
+from sites.seek_adapter import extract_seek_jobs, attach_seek_search_collector, parse_seek_search_html
+from sites.linkedin_adapter import (
+    extract_linkedin_jobs, linkedin_guest_url, parse_linkedin_guest_html, GUEST_PAGE_SIZE,
+)
+from outputs import build_html_from_db
+from exporter import export_new_jobs
+from request_policy import RequestPolicy
+from browser_session import BrowserSession, PagePool
+from db import get_db, init_schema, SeenIndex
+from title_filter import TitleFilter
+from debug_store import get_debug_store
+from metrics import METRICS
+import fastpath
+from fastpath import HttpFetcher, detect_block
 
 
 # ========= 环境与配置 =========
@@ -24,20 +37,32 @@ HEADFUL_FLAG = os.getenv("HEADFUL", "0") == "1"
 LOGIN_TARGET = os.getenv("LOGIN_TARGET", "seek").lower()
 DB_PATH = "db.sqlite3"
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL_SECONDS", "600"))  # 默认 10 分钟
+KEEP_BROWSER = os.getenv("KEEP_BROWSER", "1") == "1"  # 常驻浏览器，跨轮复用（0 = 每轮重启）
+CONCURRENT_SITES = os.getenv("CONCURRENT_SITES", "1") == "1"  # 两个站点并发抓取（0 = 串行）
+SEARCHES_FILE = Path(os.getenv("SEARCHES_FILE", "searches.json"))  # 多组搜索配置（不存在则用 .env 单组）
+SEARCH_CONCURRENCY = max(1, int(os.getenv("SEARCH_CONCURRENCY", "3")))  # 同时打开的搜索页数
+SEEK_PAGINATE = os.getenv("SEEK_PAGINATE", "1") == "1"  # 按发布时间翻页，遇到全是已入库的页就停
+SEEK_MAX_PAGES = max(1, int(os.getenv("SEEK_MAX_PAGES", "10")))  # 翻页上限（停机追赶时用）
+USE_SEEN_INDEX = os.getenv("SEEN_INDEX", "1") == "1"  # 已入库的卡片在抽取阶段就跳过
+LINKEDIN_HTTP_MAX_PAGES = max(1, int(os.getenv("LINKEDIN_HTTP_MAX_PAGES", "4")))  # guest 接口每页 25 条
+SEEN = SeenIndex()
 USER_DATA_DIR = Path(__file__).parent / "user_data"
+# 无头模式下的请求拦截（BLOCK_REQUESTS=0 关闭）
+REQUEST_POLICY = RequestPolicy.from_env()
 
-def build_seek_url() -> str:
+def build_seek_url(search: dict | None = None) -> str:
     """
-    从 .env 读取关键词/地区/分类生成 SEEK 搜索 URL。
+    从 .env（或 searches.json 的一组配置）读取关键词/地区/分类生成 SEEK 搜索 URL。
     支持 OR，例如：graduate OR tester OR QA OR developer
     """
-    keywords = os.getenv(
+    search = search or {}
+    keywords = (search.get("keywords") or os.getenv(
         "SEEK_KEYWORDS",
         "graduate OR tester OR QA OR developer OR junior"
-    ).strip()
-    where = os.getenv("SEEK_LOCATION", "").strip()
-    classification = os.getenv("SEEK_CLASSIFICATION", "").strip()   # e.g. information-communication-technology
-    subclass = os.getenv("SEEK_SUBCLASS", "").strip()               # e.g. testing-quality-assurance,developers-programmers
+    )).strip()
+    where = (search.get("where") or os.getenv("SEEK_LOCATION", "")).strip()
+    classification = (search.get("classification") or os.getenv("SEEK_CLASSIFICATION", "")).strip()   # e.g. information-communication-technology
+    subclass = (search.get("subclass") or os.getenv("SEEK_SUBCLASS", "")).strip()                      # e.g. testing-quality-assurance,developers-programmers
 
     qs = {"keywords": keywords}
     if where:
@@ -48,17 +73,18 @@ def build_seek_url() -> str:
         qs["subclassification"] = subclass
     return f"https://www.seek.co.nz/jobs?{urlencode(qs)}"
 
-def build_linkedin_url() -> str:
+def build_linkedin_url(search: dict | None = None) -> str:
     """
     生成 LinkedIn Jobs 搜索 URL（登录后更稳定）。
     f_TPR: r86400=24h, r604800=7天, r2592000=30天
     """
-    keywords = os.getenv(
+    search = search or {}
+    keywords = (search.get("keywords") or os.getenv(
         "LINKEDIN_KEYWORDS",
         "graduate OR junior OR qa OR tester OR automation OR developer OR software"
-    ).strip().replace(" ", "%20")
-    location = os.getenv("LINKEDIN_LOCATION", "New Zealand").strip().replace(" ", "%20")
-    time_range = os.getenv("LINKEDIN_TIME_RANGE", "r604800")  # 最近 7 天
+    )).strip().replace(" ", "%20")
+    location = (search.get("location") or os.getenv("LINKEDIN_LOCATION", "New Zealand")).strip().replace(" ", "%20")
+    time_range = search.get("time_range") or os.getenv("LINKEDIN_TIME_RANGE", "r604800")  # 最近 7 天
 
     return (
         "https://www.linkedin.com/jobs/search/"
@@ -68,6 +94,27 @@ def build_linkedin_url() -> str:
 SEEK_URL = build_seek_url()
 LINKEDIN_URL = build_linkedin_url()
 
+def load_search_urls() -> dict[str, list[str]]:
+    """
+    读取 searches.json，每个站点一组搜索配置，例如：
+      {"seek": [{"keywords": "graduate developer", "where": "Auckland"},
+                {"keywords": "qa tester", "classification": "information-communication-technology"}],
+       "linkedin": [{"keywords": "junior developer", "location": "Auckland"}]}
+    某站点没配就用 .env 的单组搜索。每轮读一次，改文件不用重启。
+    """
+    cfg = {}
+    if SEARCHES_FILE.exists():
+        try:
+            cfg = json.loads(SEARCHES_FILE.read_text(encoding="utf-8")) or {}
+        except Exception as e:
+            print(f"❗ {SEARCHES_FILE} 解析失败，使用 .env 配置:", e)
+    urls = {
+        "seek": [build_seek_url(s) for s in cfg.get("seek") or []] or [SEEK_URL],
+        "linkedin": [build_linkedin_url(s) for s in cfg.get("linkedin") or []] or [LINKEDIN_URL],
+    }
+    # 去掉重复的 URL，保持顺序
+    return {src: list(dict.fromkeys(lst)) for src, lst in urls.items()}
+
 
 # ========= 持久化浏览器上下文 =========
 def ensure_user_data_dir() -> bool:
@@ -99,6 +146,8 @@ async def get_persistent_context(pw) -> BrowserContext:
         "Accept-Language": "en-NZ,en;q=0.9",
         "Referer": "https://www.google.com/",
     })
+    # 只在无头抓取时拦截图片/字体/埋点；可见（登录）会话不装，保证交互正常
+    await REQUEST_POLICY.install(context, headless=headless)
 
     page = context.pages[0] if context.pages else await context.new_page()
 
@@ -127,67 +176,25 @@ async def get_persistent_context(pw) -> BrowserContext:
             await page.wait_for_load_state("networkidle", timeout=8000)
         except Exception:
             pass
-        input(">>> 在打开的浏览器里完成登录/验证后，回到这里按 ENTER 继续…")
+        # 阻塞的 input 放到线程里，别卡住事件循环（通知发送、并发站点照常跑）
+        await asyncio.to_thread(input, ">>> 在打开的浏览器里完成登录/验证后，回到这里按 ENTER 继续…")
     return context
 
 
 # ========= 数据库（含 source 列 & 唯一索引） =========
 def init_db():
-    """
-    初始化或迁移 SQLite：
-      - 增加 company/location/source 列
-      - 建唯一索引 (source, job_id) 避免平台间冲突
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            job_id   TEXT,
-            title    TEXT,
-            link     TEXT,
-            company  TEXT,
-            location TEXT,
-            source   TEXT DEFAULT 'seek',
-            seen_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    # 迁移：补列
-    cur.execute("PRAGMA table_info(jobs)")
-    cols = {row[1] for row in cur.fetchall()}
-    if "company" not in cols:
-        cur.execute("ALTER TABLE jobs ADD COLUMN company TEXT")
-    if "location" not in cols:
-        cur.execute("ALTER TABLE jobs ADD COLUMN location TEXT")
-    if "source" not in cols:
-        cur.execute("ALTER TABLE jobs ADD COLUMN source TEXT DEFAULT 'seek'")
-        cur.execute("UPDATE jobs SET source='seek' WHERE source IS NULL OR source=''")
-    # 唯一索引（若不存在）
-    cur.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_source_jobid
-        ON jobs(source, job_id)
-    """)
-    conn.commit()
-    conn.close()
-
-async def safe_dump_page(page, html_path: str, png_path: str):
-    # 尝试等待一个稳定状态；如果在导航，会抛异常，忽略即可
-    for state in ("networkidle", "domcontentloaded", "load"):
-        try:
-            await page.wait_for_load_state(state, timeout=3000)
-            break
-        except Exception:
-            pass
-    # 尝试用 evaluate 拿整页 HTML（比 page.content() 更不容易撞导航错误）
-    try:
-        html = await page.evaluate("() => document.documentElement.outerHTML")
-        Path(html_path).write_text(html or "", encoding="utf-8")
-    except Exception:
-        pass
-    # 截图也做保护
-    try:
-        await page.screenshot(path=png_path, full_page=True)
-    except Exception:
-        pass
+    """初始化/迁移 jobs 表（见 db.init_schema）"""
+    with get_db(DB_PATH).write() as conn:
+        init_schema(conn)
+        SEEN.load(conn)
+        dedup.prune(conn)
+        n = dedup.backfill(conn)
+        if n:
+            print(f"🔗 补建去重指纹：{n} 条")
+
+def seen_ids(source: str) -> set[str] | None:
+    """传给适配器的已入库 id 集合；SEEN_INDEX=0 时不跳过"""
+    return SEEN.view(source) if USE_SEEN_INDEX else None
 
 async def interactive_login_if_needed(pw, context: BrowserContext, target_url: str, label: str = "LinkedIn"):
     """
@@ -261,7 +268,7 @@ async def interactive_login_if_needed(pw, context: BrowserContext, target_url: s
         pass
 
     print(f">>> 已打开 {label} 登录页，请在浏览器中完成登录，然后回到终端按 ENTER 继续。")
-    input(">>> 登录完成后按 ENTER 继续…")
+    await asyncio.to_thread(input, ">>> 登录完成后按 ENTER 继续…")
 
     # 2) 导出 storage_state
     storage = None
@@ -314,194 +321,594 @@ async def interactive_login_if_needed(pw, context: BrowserContext, target_url: s
     return context
 
 
-def upsert_and_get_new(conn: sqlite3.Connection, jobs: list[dict], source: str) -> list[dict]:
-    """写入未见过的职位（按 source+job_id 去重），返回本轮新增"""
-    new_jobs = []
-    cur = conn.cursor()
+def known_job_ids(source: str, job_ids: list[str]) -> set[str]:
+    """一次 IN 查询，返回 job_ids 中已入库的那部分"""
+    ids = list({j for j in job_ids if j})
+    if not ids:
+        return set()
+    marks = ",".join("?" * len(ids))
+    with get_db(DB_PATH).read() as conn:
+        rows = conn.execute(
+            f"SELECT job_id FROM jobs WHERE source=? AND job_id IN ({marks})", (source, *ids)
+        ).fetchall()
+    return {r[0] for r in rows}
+
+def upsert_and_get_new(conn: sqlite3.Connection, jobs: list[dict], source: str,
+                       notify: bool = True) -> list[dict]:
+    """
+    写入未见过的职位（按 source+job_id 去重），返回本轮新增。
+    整批一个事务：先灌进临时表，一次 NOT EXISTS 求出新增，再一条 INSERT ... SELECT 落库，
+    不再逐行 SELECT + INSERT。notify=True 时新增职位的通知同事务写进发件箱。
+    新行顺带做跨站点近重复识别（dedup.link_new）：判为重复的带上 canonical_rowid，不进发件箱。
+    """
+    # 批内去重：同一 job_id 先到先得
+    batch: dict[str, dict] = {}
     for j in jobs:
         job_id = j.get("job_id")
-        if not job_id:
-            continue
-        # 查重
-        cur.execute("SELECT 1 FROM jobs WHERE source=? AND job_id=?", (source, job_id))
-        if cur.fetchone():
-            continue
-        # 插入
-        cur.execute(
-            "INSERT INTO jobs(job_id, title, link, company, location, source) VALUES(?,?,?,?,?,?)",
-            (job_id, j.get("title",""), j.get("link",""), j.get("company",""), j.get("location",""), source)
+        if job_id and job_id not in batch:
+            batch[job_id] = j
+    if not batch:
+        return []
+
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _batch (
+            ord      INTEGER PRIMARY KEY,
+            job_id   TEXT,
+            title    TEXT,
+            link     TEXT,
+            company  TEXT,
+            location TEXT
         )
-        new_jobs.append(j)
-    conn.commit()
-    return new_jobs
-
-
-# ========= 过滤：剔除资深/管理岗（可叠加你的 IT 过滤） =========
-_EXCLUDE_WORDS = {
-    "senior", "sr", "snr",
-    "intermediate",
-    "principal",
-    "manager", "managers", "management", "managerial",
-    "lead", "leader", "leaders", "leadership",
-    "architect", "architects",
-    "director", "directors",
-    "vp", "vice", "president",
-    "chief", "headcount", "staff",  # 'staff engineer' level roles
-    "civil",  # domain you want to exclude
-}
-_EXCLUDE_PHRASES = {
-    "project manager", "program manager", "product manager",
-    "team lead", "team leader", "tech lead",
-    "head of",  # handled via phrase to capture "head - of", "head, of" after normalization
-}
-
-# Allow the list to be extended from env if needed (comma separated)
-_extra = os.getenv("EXCLUDE_TERMS_EXTRA", "").strip()
-if _extra:
-    for t in _extra.split(","):
-        t = t.strip().lower()
-        if not t:
-            continue
-        if " " in t:
-            _EXCLUDE_PHRASES.add(t)
-        else:
-            _EXCLUDE_WORDS.add(t)
+    """)
+    try:
+        cur.execute("DELETE FROM temp._batch")
+        cur.executemany(
+            "INSERT INTO temp._batch(ord, job_id, title, link, company, location) VALUES(?,?,?,?,?,?)",
+            [
+                (i, job_id, j.get("title",""), j.get("link",""), j.get("company",""), j.get("location",""))
+                for i, (job_id, j) in enumerate(batch.items())
+            ],
+        )
+        # 集合运算求新增（走 idx_jobs_source_jobid）
+        new_ids = [r[0] for r in cur.execute("""
+            SELECT b.job_id FROM temp._batch b
+            WHERE NOT EXISTS (SELECT 1 FROM jobs WHERE source=? AND job_id=b.job_id)
+            ORDER BY b.ord
+        """, (source,))]
+        last_rowid = cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM jobs").fetchone()[0]
+        # 冲突忽略：即便并发写入了同一条也不会报错
+        cur.execute("""
+            INSERT OR IGNORE INTO jobs(job_id, title, link, company, location, source, seen_ts)
+            SELECT job_id, title, link, company, location, ?, CAST(strftime('%s', 'now') AS INTEGER)
+            FROM temp._batch ORDER BY ord
+        """, (source,))
+        inserted = cur.execute(
+            "SELECT rowid, job_id FROM jobs WHERE rowid > ? ORDER BY rowid", (last_rowid,)
+        ).fetchall()
+        dups = dedup.link_new(cur, source, [(rowid, batch[jid]) for rowid, jid in inserted if jid in batch])
+        for jid, canonical in dups.items():
+            batch[jid]["canonical_rowid"] = canonical
+        if notify and new_ids:
+            outbox.enqueue(cur, source, [batch[jid] for jid in new_ids if jid not in dups])
+        cur.execute("DELETE FROM temp._batch")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [batch[jid] for jid in new_ids]
 
-# Characters we’ll collapse to spaces for normalization
-_PUNCT_RE = re.compile(r"[^a-z0-9]+", re.IGNORECASE)
 
-def _normalize_title(s: str) -> str:
-    if not s:
-        return ""
-    # NFKD handles fancy dashes etc.
-    s = unicodedata.normalize("NFKD", s).lower()
-    # collapse punctuation/dashes/commas into spaces
-    s = _PUNCT_RE.sub(" ", s)
-    # single spaces
-    return " ".join(s.split())
+# ========= 过滤：剔除资深/管理岗（规则见 title_filter.py / filters.json） =========
+FILTER_RULES_FILE = Path(os.getenv("FILTER_RULES_FILE", "filters.json"))
+TITLE_FILTER = TitleFilter(FILTER_RULES_FILE)
 
 def should_keep(job: dict) -> bool:
-    title_raw = (job.get("title") or "")
-    t = _normalize_title(title_raw)
+    """只判定，不计入规则命中统计（水位判断等用）"""
+    return TITLE_FILTER.drop_reason(job.get("title") or "") is None
 
-    if not t:
-        return True
+# ========= 详情页补全（卡片缺公司/地点时） =========
+_enricher: DetailEnricher | None = None
 
-    # phrase match first (covers "head of", even if it was "head — of")
-    for phrase in _EXCLUDE_PHRASES:
-        if phrase in t:
-            return False
-
-    # token match (covers plurals/variants already in the set)
-    tokens = set(t.split())
-    if tokens & _EXCLUDE_WORDS:
-        return False
+def get_enricher() -> DetailEnricher:
+    global _enricher
+    if _enricher is None:
+        _enricher = DetailEnricher(get_db(DB_PATH))
+    return _enricher
 
-    return True
+def _worth_enriching(source: str):
+    """只补会入库的：过标题规则、且不在库里"""
+    known = SEEN.view(source)
+    return lambda j: should_keep(j) and j.get("job_id") not in known
 
 # ========= 统一的写库/通知/落地 =========
+_outbox: OutboxDispatcher | None = None
+
+def get_outbox() -> OutboxDispatcher:
+    global _outbox
+    if _outbox is None:
+        _outbox = OutboxDispatcher(get_db(DB_PATH), get_notifier().submit)
+    return _outbox
+
 def finalize_batch(source: str, grabbed: list[dict]):
-    # 过滤
-    jobs = [j for j in grabbed if should_keep(j)]
-    # 入库
-    conn = sqlite3.connect(DB_PATH)
-    new_jobs = upsert_and_get_new(conn, jobs, source=source)
-    conn.close()
-    # 通知 & 输出
+    # 过滤（规则文件有改动会在这里热重载）
+    with METRICS.span("filter", source, rows=len(grabbed)):
+        jobs = TITLE_FILTER.filter(grabbed)
+    hits = TITLE_FILTER.take_hits()
+    if hits:
+        print(f"[{source}] 🧹 {TitleFilter.format_hits(hits)}")
+    # 入库（共享长连接，WAL）
+    with METRICS.span("upsert", source, rows=len(jobs)), get_db(DB_PATH).write() as conn:
+        new_jobs = upsert_and_get_new(conn, jobs, source=source)
+    SEEN.add_many(source, [j["job_id"] for j in new_jobs])
+    METRICS.count("new_jobs", len(new_jobs))
+    # 通知 & 输出（通知已随入库写进发件箱，这里合并成摘要投递）
     if new_jobs:
         print(f"[{source}] 抓取 {len(jobs)} 条，新增 {len(new_jobs)} 条。")
+        dup_count = 0
         for job in new_jobs:
-            notify_user(f"🆕 [{source.capitalize()}] {job['title']} — {job['company']} · {job['location']}\n🔗 {job['link']}")
-        append_new_jobs_csv(new_jobs)
-        html_path = build_html_from_db(DB_PATH, limit=100)
+            if job.get("canonical_rowid"):
+                dup_count += 1
+                continue
+            print(outbox.format_job_message(source, job))
+        if dup_count:
+            print(f"[{source}] 🔗 {dup_count} 条与其它站点已有职位重复，已关联正本，不再通知")
+        with METRICS.span("notify", source):
+            get_outbox().flush()
+        with METRICS.span("export", source):
+            export_new_jobs(source, new_jobs)
+        with METRICS.span("report", source):
+            html_path = build_html_from_db(DB_PATH)
         print(f"📄 已生成 HTML 列表：{html_path}")
     else:
         print(f"[{source}] No new jobs this cycle.")
 
 
+class BatchWriter:
+    """
+    单写者：各站点抓到的结果排队，由一个后台任务按到达顺序串行执行 finalize_batch。
+    finalize_batch 放到线程里跑（含 SQLite/通知/HTML），不阻塞事件循环上的抓取；
+    同一时刻只有一个 finalize_batch，写库和通知不会互相打架。
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            source, jobs = await self.queue.get()
+            try:
+                await asyncio.to_thread(finalize_batch, source, jobs)
+            except Exception as e:
+                print(f"❗ [{source}] finalize error:", e)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, source: str, jobs: list[dict]):
+        await self.queue.put((source, jobs))
+
+    async def close(self):
+        """等队列写完再停掉后台任务"""
+        await self.queue.join()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
 # ========= 两个平台的 monitor =========
-async def monitor_seek(context: BrowserContext):
-    page = context.pages[0] if context.pages else await context.new_page()
+def seek_page_url(url: str, page_no: int) -> str:
+    """在搜索 URL 上加 sortmode=ListedDate（最新在前）和 page=N"""
+    u = urlparse(url)
+    qs = dict(parse_qsl(u.query, keep_blank_values=True))
+    qs["sortmode"] = "ListedDate"
+    if page_no > 1:
+        qs["page"] = str(page_no)
+    else:
+        qs.pop("page", None)
+    return urlunparse(u._replace(query=urlencode(qs)))
+
+async def _scrape_seek_page(page, url: str, page_stats: dict | None = None) -> list[dict]:
+    """打开一页 SEEK 结果并抽取；page_stats 由适配器填本页 {raw, known, filtered}"""
+    # 网络模式：先挂监听再导航，才能捕获首屏的搜索 API 响应
+    collector = attach_seek_search_collector(page)
     try:
-        await page.goto(SEEK_URL, wait_until="domcontentloaded")
-        for _ in range(6):
-            await page.mouse.wheel(0, 1500)
-            await page.wait_for_timeout(800)
-        jobs = await extract_seek_jobs(page)
-        finalize_batch("seek", jobs)
+        with METRICS.span("navigate"):
+            await page.goto(url, wait_until="domcontentloaded")
+        # 网络模式先等搜索 JSON，卡片/SSR 状态先到 DOM 就不再等；没有 payload 时 extract_seek_jobs 走 DOM
+        if collector is not None:
+            with METRICS.span("wait_api"):
+                await collector.wait(timeout_ms=5000)
+        with METRICS.span("extract"):
+            jobs = await extract_seek_jobs(page, collector=collector, seen=seen_ids("seek"),
+                                           title_filter=TITLE_FILTER, page_stats=page_stats)
+        await METRICS.sample_page(page)
+        return jobs
+    finally:
+        if collector is not None:
+            collector.detach()
+
+def _page_has_new(source: str, batch: list[dict], page_stats: dict | None = None) -> bool:
+    """
+    水位判断：本页还有既没入库、也没被标题规则丢掉的卡片才继续翻。
+    page_stats 是适配器给的 {raw, known, filtered}：known 是抽取阶段被 seen 索引跳过的，
+    返回的 batch 再查一次库。被标题过滤的卡片永远不会入库，算“没有新的”，
+    否则只要页上有一条 Senior 稳定状态也会翻满 SEEK_MAX_PAGES；空页（没有结果了）停。
+    """
+    stats = page_stats or {}
+    raw = stats.get("raw", len(batch))
+    if not raw:
+        return False
+    ids = {j.get("job_id") for j in batch if j.get("job_id")}
+    known = stats.get("known", 0) + len(known_job_ids(source, list(ids)))
+    return known + stats.get("filtered", 0) < raw
+
+async def monitor_seek(context: BrowserContext, page=None, url: str = SEEK_URL) -> list[dict] | None:
+    """
+    抓 SEEK，返回职位列表；出错返回 None（落地调试文件）。
+    SEEK_PAGINATE=1 时按发布时间翻页：某页没有新职位就停（稳定状态只看 1 页），
+    停机后追赶则一直往回翻，最多 SEEK_MAX_PAGES 页。
+    """
+    if page is None:
+        page = context.pages[0] if context.pages else await context.new_page()
+    jobs: list[dict] = []
+    try:
+        if not SEEK_PAGINATE:
+            return await _scrape_seek_page(page, url)
+
+        for page_no in range(1, SEEK_MAX_PAGES + 1):
+            page_stats: dict = {}
+            batch = await _scrape_seek_page(page, seek_page_url(url, page_no), page_stats)
+            jobs.extend(batch)
+            if not _page_has_new("seek", batch, page_stats):
+                break
+        else:
+            print(f"[seek] 翻到上限 {SEEK_MAX_PAGES} 页仍有新职位，可调大 SEEK_MAX_PAGES")
+        return jobs
     except Exception as e:
-        try:
-            Path("debug_seek.html").write_text(await page.content(), encoding="utf-8")
-            await page.screenshot(path="debug_seek.png", full_page=True)
-        except Exception:
-            pass
+        await get_debug_store().capture_page(page, "seek", f"monitor error: {e}")
         print("❗ SEEK monitor error:", e)
-
-async def monitor_linkedin(context):
-    page = await context.new_page()
+        # 翻页中途出错：已抓到的页照样交给写库
+        return jobs or None
+
+async def monitor_linkedin(context, page=None, url: str = LINKEDIN_URL) -> list[dict] | None:
+    """抓 LinkedIn，返回职位列表；出错返回 None（现场交给调试产物存储）"""
+    # 传入的是常驻热页就不关，自己开的才关
+    own_page = page is None
+    if own_page:
+        page = await context.new_page()
     try:
-        await page.goto(LINKEDIN_URL, wait_until="domcontentloaded")
-        # 兜底：如果被重定向到 feed，强制回到搜索页
-        if "linkedin.com/feed" in (page.url or "").lower():
-            await page.goto(LINKEDIN_URL, wait_until="domcontentloaded")
+        with METRICS.span("navigate"):
+            await page.goto(url, wait_until="domcontentloaded")
+            # 兜底：如果被重定向到 feed，强制回到搜索页
+            if "linkedin.com/feed" in (page.url or "").lower():
+                await page.goto(url, wait_until="domcontentloaded")
 
         # 尝试接受 cookie / 同意按钮（国际化兜底）
-        for sel in [
-            'button:has-text("Accept")',
-            'button:has-text("同意")',
-            'button:has-text("Agree")',
-            'button[aria-label*="Accept"]',
-            'button[aria-label*="accept"]'
-        ]:
+        with METRICS.span("consent"):
+            for sel in [
+                'button:has-text("Accept")',
+                'button:has-text("同意")',
+                'button:has-text("Agree")',
+                'button[aria-label*="Accept"]',
+                'button[aria-label*="accept"]'
+            ]:
+                try:
+                    await page.locator(sel).first.click(timeout=2000)
+                    break
+                except Exception:
+                    pass
+
+        # 等一等让 SPA 稳定
+        with METRICS.span("settle"):
             try:
-                await page.locator(sel).first.click(timeout=2000)
-                break
+                await page.wait_for_load_state("networkidle", timeout=8000)
             except Exception:
                 pass
 
-        # 等一等让 SPA 稳定
-        try:
-            await page.wait_for_load_state("networkidle", timeout=8000)
-        except Exception:
-            pass
-
-        # 轻微滚动触发懒加载
-        for _ in range(4):
-            await page.mouse.wheel(0, 1200)
-            await page.wait_for_timeout(600)
-
-        jobs = await extract_linkedin_jobs(page)
-        finalize_batch("linkedin", jobs)
+        # 懒加载滚动交给 extract_linkedin_jobs（滚到卡片数稳定为止）
+        with METRICS.span("extract"):
+            jobs = await extract_linkedin_jobs(page, seen=seen_ids("linkedin"), title_filter=TITLE_FILTER)
+        await METRICS.sample_page(page)
+        return jobs
 
     except Exception as e:
-        await safe_dump_page(page, "debug_linkedin.html", "debug_linkedin.png")
+        await get_debug_store().capture_page(page, "linkedin", f"monitor error: {e}")
         print("❗ LinkedIn monitor error:", e)
+        return None
     finally:
-        await page.close()
+        if own_page:
+            await page.close()
 
 
+# ========= HTTP 快速通道（免浏览器；被拦/解析不了的 URL 交回 Playwright） =========
+_http: HttpFetcher | None = None
 
-# ========= 入口 =========
-async def main():
-    init_db()
-    while True:
-        print(f"[{time.strftime('%H:%M:%S')}] 开始检测新职位...")
-        async with async_playwright() as pw:
-            context = await get_persistent_context(pw)
-            # 一轮跑两个站点
-            await monitor_seek(context)
-            context = await interactive_login_if_needed(pw, context, LINKEDIN_URL, label="LinkedIn")
-            await monitor_linkedin(context)
+def get_http() -> HttpFetcher:
+    global _http
+    if _http is None:
+        _http = HttpFetcher()
+    return _http
+
+def _prefilter(source: str, jobs: list[dict], page_stats: dict | None = None) -> list[dict]:
+    """与页面端同口径：已入库的跳过，命中标题规则的直接丢（计入页面端统计）；page_stats 同适配器"""
+    known = seen_ids(source)
+    dropped: dict[str, int] = {}
+    kept = []
+    skipped = 0
+    for j in jobs:
+        if known is not None and j["job_id"] in known:
+            skipped += 1
+            continue
+        reason = TITLE_FILTER.drop_reason(j.get("title") or "")
+        if reason is not None:
+            dropped[reason] = dropped.get(reason, 0) + 1
+            continue
+        kept.append(j)
+    TITLE_FILTER.record_page(source, dropped)
+    if page_stats is not None:
+        page_stats.update(raw=len(jobs), known=skipped, filtered=sum(dropped.values()))
+    return kept
+
+async def _http_page(source: str, url: str, parse) -> list[dict] | None:
+    """GET 一页并解析；被拦或认不出页面结构返回 None"""
+    with METRICS.span("http_fetch"):
+        status, final_url, text = await get_http().aget(url)
+    reason = detect_block(status, final_url, text)
+    with METRICS.span("parse"):
+        batch = None if reason else parse(text)
+    if batch == []:  # 空结果 + 验证码/挑战脚本：当成被拦，而不是“这页没职位”
+        reason = detect_block(status, final_url, text, empty=True)
+        if reason:
+            batch = None
+    if batch is None:
+        print(f"[{source}] HTTP 快速通道不可用（{reason or 'unrecognised page'}），回退浏览器")
+    return batch
+
+async def http_seek(url: str) -> list[dict] | None:
+    """SEEK 服务端渲染页直接解析；翻页/水位规则与 monitor_seek 相同。任一页失败整条 URL 回退"""
+    if not SEEK_PAGINATE:
+        batch = await _http_page("seek", url, parse_seek_search_html)
+        return None if batch is None else _prefilter("seek", batch)
+    jobs: list[dict] = []
+    for page_no in range(1, SEEK_MAX_PAGES + 1):
+        batch = await _http_page("seek", seek_page_url(url, page_no), parse_seek_search_html)
+        if batch is None:
+            return None
+        page_stats: dict = {}
+        batch = _prefilter("seek", batch, page_stats)
+        jobs.extend(batch)
+        if not _page_has_new("seek", batch, page_stats):
+            break
+    else:
+        print(f"[seek] 翻到上限 {SEEK_MAX_PAGES} 页仍有新职位，可调大 SEEK_MAX_PAGES")
+    return jobs
+
+async def http_linkedin(url: str) -> list[dict] | None:
+    """LinkedIn guest 接口（HTML 片段，每页 25 条）；没有新职位或到底了就停"""
+    jobs: list[dict] = []
+    for k in range(LINKEDIN_HTTP_MAX_PAGES):
+        raw = await _http_page("linkedin", linkedin_guest_url(url, k * GUEST_PAGE_SIZE),
+                               parse_linkedin_guest_html)
+        if raw is None:
+            return None
+        page_stats: dict = {}
+        batch = _prefilter("linkedin", raw, page_stats)
+        jobs.extend(batch)
+        if len(raw) < GUEST_PAGE_SIZE or not _page_has_new("linkedin", batch, page_stats):
+            break
+    return jobs
+
+async def http_cycle(urls: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    先走 HTTP：每组搜索一个请求序列（同一时刻最多 SEARCH_CONCURRENCY 个），成功的直接交给单写者，
+    详情补全也走 HTTP。返回需要浏览器兜底的 URL（各站点列表都为空时本轮不用开浏览器）。
+    """
+    fetcher = get_http()
+    fetcher.load_cookies()
+    sem = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    monitors = {"seek": http_seek, "linkedin": http_linkedin}
+    fallback: dict[str, list[str]] = {}
+
+    def site_task(source: str):
+        async def run():
+            async def one(url):
+                async with sem:
+                    try:
+                        return await monitors[source](url)
+                    except Exception as e:
+                        print(f"❗ [{source}] HTTP 快速通道出错，回退浏览器:", e)
+                        return None
+            results = await asyncio.gather(*(one(u) for u in urls[source]))
+            fallback[source] = [u for u, r in zip(urls[source], results) if r is None]
+            return merge_jobs(results)
+        return run
+
+    writer = BatchWriter().start()
+    try:
+        await asyncio.gather(*(_run_site(writer, src, site_task(src), fetcher) for src in monitors))
+    finally:
+        await writer.close()
+    stats = fetcher.take_stats()
+    METRICS.count("http_requests", stats["requests"])
+    METRICS.count("http_bytes", stats["bytes"])
+    print(f"⚡ HTTP 快速通道：{stats['requests']} 个请求，{stats['bytes'] / 1024:.0f} KiB；"
+          f"回退浏览器 {sum(len(v) for v in fallback.values())} 组搜索")
+    return fallback
 
-            # 保存登录态以便其它脚本复用
+
+# ========= 入口 =========
+def merge_jobs(results: list[list[dict] | None]) -> list[dict] | None:
+    """合并同一站点多组搜索的结果，按 job_id 去重（保持先到先得）；全部失败返回 None"""
+    if all(r is None for r in results):
+        return None
+    merged, seen = [], set()
+    for jobs in results:
+        for j in jobs or []:
+            jid = j.get("job_id")
+            if not jid or jid in seen:
+                continue
+            seen.add(jid)
+            merged.append(j)
+    return merged
+
+async def _run_site(writer: BatchWriter, source: str, make_coro, via=None):
+    """
+    单站点任务：异常只影响本站点；不完整的新职位先补详情页（浏览器或 HTTP），再交给单写者。
+    via 是 BrowserContext / HttpFetcher，或任务跑完后再取的无参函数（LinkedIn 登录后可能换了上下文）。
+    """
+    with METRICS.site(source):
+        try:
+            jobs = await make_coro()
+        except Exception as e:
+            print(f"❗ [{source}] task error:", e)
+            return
+        if jobs is None:
+            return
+        if callable(via):
+            via = via()
+        if via is not None:
             try:
-                await context.storage_state(path="storage_state.json")
-            except Exception:
-                pass
+                with METRICS.span("enrich"):
+                    await get_enricher().enrich(via, source, jobs, wanted=_worth_enriching(source))
+            except Exception as e:
+                print(f"❗ [{source}] enrich error:", e)
+        await writer.submit(source, jobs)
+
+async def run_cycle(pw, context: BrowserContext, session: BrowserSession | None = None,
+                    urls: dict[str, list[str]] | None = None):
+    """
+    一轮跑两个站点（默认并发）。每个站点可有多组搜索，全部经由同一个
+    有界页面池（SEARCH_CONCURRENCY 个标签页）执行，合并去重后交给单写者。
+    有 session 时池里的标签页跨轮常驻。urls 只含 HTTP 快速通道没搞定的搜索时，空站点跳过。
+    """
+    if urls is None:
+        urls = load_search_urls()
+    factory = (lambda i: session.page(f"pool-{i}")) if session else (lambda i: context.new_page())
+    pool = PagePool(SEARCH_CONCURRENCY, factory, close_pages=session is None)
+
+    async def run_searches(monitor, ctx, site_urls):
+        async def one(url):
+            async with pool.page() as page:
+                return await monitor(ctx, page=page, url=url)
+        return merge_jobs(await asyncio.gather(*(one(u) for u in site_urls)))
+
+    async def seek_task():
+        return await run_searches(monitor_seek, context, urls["seek"])
+
+    site_ctx = {"seek": context, "linkedin": context}
+
+    async def linkedin_task():
+        ctx = await interactive_login_if_needed(pw, context, LINKEDIN_URL, label="LinkedIn")
+        site_ctx["linkedin"] = ctx  # 详情补全也用登录后的上下文
+        return await run_searches(monitor_linkedin, ctx, urls["linkedin"])
+
+    writer = BatchWriter().start()
+    try:
+        tasks = [(src, fn) for src, fn in (("seek", seek_task), ("linkedin", linkedin_task)) if urls.get(src)]
+        if CONCURRENT_SITES:
+            await asyncio.gather(*(_run_site(writer, src, fn, lambda src=src: site_ctx[src]) for src, fn in tasks))
+        else:
+            for src, fn in tasks:
+                await _run_site(writer, src, fn, lambda src=src: site_ctx[src])
+    finally:
+        await writer.close()
+        await pool.close()
+
+    # 保存登录态以便其它脚本复用（HTTP 快速通道下一轮也会载入这些 cookies）
+    try:
+        await context.storage_state(path="storage_state.json")
+    except Exception:
+        pass
+
+async def sweep_details(via: BrowserContext | HttpFetcher):
+    """以前存成 Unknown 的行：本轮预算还有剩就补，原地更新"""
+    enricher = get_enricher()
+    try:
+        with METRICS.span("enrich_sweep"):
+            await enricher.sweep(via)
+    except Exception as e:
+        print("❗ enrich sweep error:", e)
+    stats = enricher.take_stats()
+    if stats["fetched"] or stats["cached"] or stats["error"]:
+        print("🔎 详情补全：" + ", ".join(f"{k} {v}" for k, v in stats.items()))
+
+async def browser_cycle(session: BrowserSession | None, urls: dict[str, list[str]] | None):
+    """Playwright 路径：全量（快速通道关闭）或只跑快速通道回退的搜索"""
+    if session:
+        # 常驻模式：健康检查 + 按策略回收，只付页面刷新的成本
+        try:
+            with METRICS.span("browser_ensure"):
+                context = await session.ensure()
+            await run_cycle(session.pw, context, session, urls)
+            await sweep_details(context)
+        except Exception as e:
+            print("❗ cycle error, 下轮重启浏览器:", e)
+            await session.close()
+    else:
+        async with async_playwright() as pw:
+            with METRICS.span("browser_launch"):
+                context = await get_persistent_context(pw)
+            await run_cycle(pw, context, urls=urls)
+            await sweep_details(context)
             await context.close()
 
-        print(f"等待 {CHECK_INTERVAL // 60} 分钟后再次检查...\n")
-        await asyncio.sleep(CHECK_INTERVAL)
+async def main():
+    init_db()
+    # 通知走后台队列，抓取不等投递
+    notifier = get_notifier().start()
+    debug_store = get_debug_store().start()
+    # 上次没送达的通知（崩溃/Telegram 不通）先重放
+    replayed = await asyncio.to_thread(get_outbox().flush)
+    if replayed:
+        print(f"📨 重放发件箱：{replayed} 条摘要")
+    session = BrowserSession(get_persistent_context) if KEEP_BROWSER else None
+    try:
+        while True:
+            print(f"[{time.strftime('%H:%M:%S')}] 开始检测新职位...")
+            METRICS.new_cycle()
+            get_enricher().new_cycle()
+            debug_store.new_cycle()
+            urls = None
+            if fastpath.ENABLED:
+                urls = await http_cycle(load_search_urls())
+            if urls is None or any(urls.values()):
+                await browser_cycle(session, urls)
+            else:
+                # 全部走了 HTTP：不启动浏览器；常驻的也先关掉，省下空转的内存
+                await sweep_details(get_http())
+                if session and session.context is not None:
+                    await session.close()
+                print("⚡ 本轮全部走 HTTP 快速通道，未启动浏览器")
+
+            # 本轮失败留在发件箱里的，下一轮再试
+            with METRICS.span("notify"):
+                await asyncio.to_thread(get_outbox().flush)
+            print(f"🧹 页面端标题过滤：{TitleFilter.format_page_skipped(TITLE_FILTER.take_page_skipped())}")
+            print(f"🚦 请求拦截：{RequestPolicy.format_stats(REQUEST_POLICY.take_stats())}")
+            debug_store.end_cycle()
+            print("🐞 调试产物：" + ", ".join(f"{k} {v}" for k, v in debug_store.take_stats().items()))
+            summary = METRICS.end_cycle()
+            if summary:
+                print(f"📊 {summary}")
+            print(f"等待 {CHECK_INTERVAL // 60} 分钟后再次检查...\n")
+            await asyncio.sleep(CHECK_INTERVAL)
+    finally:
+        if session:
+            await session.close()
+        if _http is not None:
+            _http.close()
+        debug_store.close()
+        await notifier.close()
+        # 已送达但还没删的发件箱行，退出前删掉，免得下次启动重发
+        get_outbox().purge()
 
 
 if __name__ == "__main__":
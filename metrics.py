@@ -0,0 +1,278 @@
+# metrics.py
+"""
+每轮的分阶段耗时与资源指标：
+  - span(stage)：包住导航 / 同意按钮 / 滚动 / 抽取 / 过滤 / 写库 / 通知 / 报表等阶段，
+    同步、异步代码里都用 `with METRICS.span("navigate"):`；站点由 site(source) 设在 contextvar 里，
+    asyncio 任务和 asyncio.to_thread 都会继承，嵌套的 span 记下父阶段（如 scroll 的父阶段是 extract）
+  - sample_page()：经 CDP Performance.getMetrics 取 JS 堆、DOM 节点数等（只有 Chromium 支持，失败就跳过）
+  - 进程 RSS（本进程 + 子进程，即浏览器）从 /proc 读；非 Linux 退回 ru_maxrss（峰值）
+  - end_cycle()：span 逐条 + 本轮汇总写进 METRICS_FILE（JSONL，超过 METRICS_MAX_MB 滚动成 .1），
+    Prometheus textfile（METRICS_PROM_FILE，原子替换，给 node_exporter 的 textfile collector）
+    按 (站点, 阶段) 给出上一轮耗时/次数，并返回一行汇总
+METRICS=0 关闭（span 变成空操作）。
+"""
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+ENABLED = os.getenv("METRICS", "1") == "1"
+METRICS_FILE = Path(os.getenv("METRICS_FILE", "outputs/metrics.jsonl"))
+PROM_FILE = Path(os.getenv("METRICS_PROM_FILE", "outputs/metrics.prom"))
+MAX_BYTES = int(float(os.getenv("METRICS_MAX_MB", "20")) * 1024 * 1024)
+PREFIX = "jobwatch"
+
+# 保留的 CDP 指标（Performance.getMetrics 的名字 -> 输出名）
+CDP_METRICS = {
+    "JSHeapUsedSize": "js_heap_used_bytes",
+    "JSHeapTotalSize": "js_heap_total_bytes",
+    "Nodes": "dom_nodes",
+    "Documents": "documents",
+    "JSEventListeners": "js_event_listeners",
+    "LayoutCount": "layouts",
+}
+
+_source: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("metrics_source", default=None)
+_parent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("metrics_parent", default=None)
+
+
+def _rss_of(pid: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _children() -> dict[str, list[str]]:
+    tree: dict[str, list[str]] = defaultdict(list)
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # comm 可能含空格/括号，从最后一个 ')' 之后切
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+        except (OSError, IndexError):
+            continue
+        tree[ppid].append(pid)
+    return tree
+
+
+def process_rss() -> dict:
+    """{"rss_bytes": 本进程, "children_rss_bytes": 所有子孙进程（浏览器）}；拿不到的字段为 None"""
+    own = _rss_of("self")
+    if own is None:
+        try:
+            import resource
+            # ru_maxrss 是峰值：Linux 上 KiB，macOS 上字节
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            own = peak if os.uname().sysname == "Darwin" else peak * 1024
+        except Exception:
+            pass
+        return {"rss_bytes": own, "children_rss_bytes": None}
+    tree = _children()
+    total, stack = 0, list(tree.get(str(os.getpid()), []))
+    while stack:
+        pid = stack.pop()
+        total += _rss_of(pid) or 0
+        stack.extend(tree.get(pid, []))
+    return {"rss_bytes": own, "children_rss_bytes": total}
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class Metrics:
+    def __init__(self, jsonl_path: Path = METRICS_FILE, prom_path: Path = PROM_FILE,
+                 enabled: bool = ENABLED, max_bytes: int = MAX_BYTES):
+        self.jsonl_path = Path(jsonl_path)
+        self.prom_path = Path(prom_path)
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.cycles = 0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.cycle_id = time.strftime("%Y%m%d-%H%M%S")
+        self._t0 = time.perf_counter()
+        self._started = time.time()
+        self._spans: list[dict] = []
+        self._pages: dict[str, dict] = {}      # 站点 -> 本轮 CDP 采样的峰值
+        self._counters: dict[str, int] = defaultdict(int)
+
+    # ---------- 记录 ----------
+    def new_cycle(self):
+        with self._lock:
+            self._reset()
+
+    @contextmanager
+    def site(self, source: str):
+        """这段代码里的 span 都归到 source 名下"""
+        token = _source.set(source)
+        try:
+            yield
+        finally:
+            _source.reset(token)
+
+    @contextmanager
+    def span(self, stage: str, source: Optional[str] = None, **attrs):
+        if not self.enabled:
+            yield
+            return
+        src = source or _source.get()
+        parent = _parent.get()
+        token = _parent.set(stage)
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            _parent.reset(token)
+            rec = {"stage": stage, "source": src, "parent": parent,
+                   "ms": round((time.perf_counter() - t0) * 1000, 1), "ok": ok}
+            if attrs:
+                rec.update(attrs)
+            with self._lock:
+                self._spans.append(rec)
+
+    def count(self, name: str, n: int = 1):
+        """本轮计数（新职位数、请求数等），进汇总和 textfile"""
+        if self.enabled and n:
+            with self._lock:
+                self._counters[name] += n
+
+    async def sample_page(self, page, source: Optional[str] = None):
+        """CDP 采样一次（抽取完成后调用）；非 Chromium / 页面已关时静默跳过"""
+        if not self.enabled or page is None:
+            return
+        src = source or _source.get() or "?"
+        try:
+            cdp = await page.context.new_cdp_session(page)
+            try:
+                await cdp.send("Performance.enable")
+                raw = await cdp.send("Performance.getMetrics")
+            finally:
+                await cdp.detach()
+        except Exception:
+            return
+        vals = {CDP_METRICS[m["name"]]: m["value"] for m in raw.get("metrics", []) if m.get("name") in CDP_METRICS}
+        with self._lock:
+            prev = self._pages.get(src)
+            # 多组搜索共用一个站点名：取本轮的峰值
+            self._pages[src] = {k: max(v, (prev or {}).get(k, 0)) for k, v in vals.items()}
+
+    # ---------- 输出 ----------
+    def _aggregate(self) -> dict[tuple[str, str], dict]:
+        agg: dict[tuple[str, str], dict] = {}
+        for s in self._spans:
+            a = agg.setdefault((s["source"] or "-", s["stage"]), {"ms": 0.0, "calls": 0, "max_ms": 0.0, "errors": 0})
+            a["ms"] += s["ms"]
+            a["calls"] += 1
+            a["max_ms"] = max(a["max_ms"], s["ms"])
+            a["errors"] += not s["ok"]
+        return agg
+
+    def end_cycle(self) -> Optional[str]:
+        """写 JSONL + textfile，返回一行汇总（关闭时返回 None）"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            spans, pages, counters = self._spans, self._pages, dict(self._counters)
+            agg = self._aggregate()
+            total_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+            cycle_id, started = self.cycle_id, self._started
+            self._spans = []
+        self.cycles += 1
+        rss = process_rss()
+        record = {
+            "type": "cycle", "cycle": cycle_id, "ts": int(started), "ms": total_ms,
+            "stages": {f"{src}/{stage}": a for (src, stage), a in sorted(agg.items())},
+            "pages": pages, "counters": counters, **rss,
+        }
+        try:
+            self._write_jsonl([{"type": "span", "cycle": cycle_id, **s} for s in spans] + [record])
+            self._write_prom(agg, pages, counters, rss, total_ms, started)
+        except OSError as e:
+            print("⚠️ 指标写入失败:", e)
+        return self.format_summary(record)
+
+    def _write_jsonl(self, records: list[dict]):
+        path = self.jsonl_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > self.max_bytes:
+            os.replace(path, path.with_name(path.name + ".1"))
+        with open(path, "a", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    def _write_prom(self, agg, pages, counters, rss, total_ms, started):
+        p = PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Wall time spent in a stage during the last cycle.",
+            f"# TYPE {p}_stage_seconds gauge",
+        ]
+        lines += [f'{p}_stage_seconds{{site="{_esc(src)}",stage="{_esc(st)}"}} {a["ms"] / 1000:.3f}'
+                  for (src, st), a in sorted(agg.items())]
+        lines += [f"# HELP {p}_stage_calls Number of spans per stage during the last cycle.",
+                  f"# TYPE {p}_stage_calls gauge"]
+        lines += [f'{p}_stage_calls{{site="{_esc(src)}",stage="{_esc(st)}"}} {a["calls"]}'
+                  for (src, st), a in sorted(agg.items())]
+        lines += [f"# HELP {p}_stage_errors Spans that raised during the last cycle.",
+                  f"# TYPE {p}_stage_errors gauge"]
+        lines += [f'{p}_stage_errors{{site="{_esc(src)}",stage="{_esc(st)}"}} {a["errors"]}'
+                  for (src, st), a in sorted(agg.items())]
+        for name in sorted({k for v in pages.values() for k in v}):
+            lines += [f"# TYPE {p}_page_{name} gauge"]
+            lines += [f'{p}_page_{name}{{site="{_esc(src)}"}} {vals[name]:.0f}'
+                      for src, vals in sorted(pages.items()) if name in vals]
+        for name, v in sorted(counters.items()):
+            lines += [f"# TYPE {p}_cycle_{name} gauge", f"{p}_cycle_{name} {v}"]
+        for name, v in rss.items():
+            if v is not None:
+                lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {v}"]
+        lines += [
+            f"# TYPE {p}_cycle_seconds gauge", f"{p}_cycle_seconds {total_ms / 1000:.3f}",
+            f"# TYPE {p}_cycle_start_timestamp_seconds gauge", f"{p}_cycle_start_timestamp_seconds {int(started)}",
+            f"# TYPE {p}_cycles_total counter", f"{p}_cycles_total {self.cycles}",
+        ]
+        path = self.prom_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)  # textfile collector 不会读到写了一半的文件
+
+    @staticmethod
+    def format_summary(record: dict, top: int = 6) -> str:
+        """一行：总耗时 | 最耗时的阶段（嵌套阶段也单独列，如 extract 含 scroll） | 各站点 JS 堆 / DOM 节点 | RSS"""
+        stages = sorted(record["stages"].items(), key=lambda kv: -kv[1]["ms"])
+        parts = [f"{name} {a['ms'] / 1000:.1f}s" + (f"×{a['calls']}" if a["calls"] > 1 else "")
+                 for name, a in stages[:top]]
+        for src, vals in sorted(record["pages"].items()):
+            heap = vals.get("js_heap_used_bytes")
+            nodes = vals.get("dom_nodes")
+            if heap is not None:
+                parts.append(f"{src} heap {heap / 1048576:.0f}MB / {nodes or 0:.0f} nodes")
+
+        def mb(v):
+            return f"{v / 1048576:.0f}MB" if v is not None else "?"
+
+        rss = f"rss {mb(record['rss_bytes'])}"
+        if record.get("children_rss_bytes"):
+            rss += f" + browser {mb(record['children_rss_bytes'])}"
+        counters = ", ".join(f"{k} {v}" for k, v in sorted(record["counters"].items()))
+        return (f"cycle {record['ms'] / 1000:.1f}s | " + ("; ".join(parts) or "no spans")
+                + f" | {rss}" + (f" | {counters}" if counters else ""))
+
+
+METRICS = Metrics()
@@ -0,0 +1,208 @@
+# notifier.py
+"""
+异步通知派发：消息进队列，由后台 worker 投递到 Telegram。
+  - requests.Session 连接池（keep-alive，不再每条消息一次 TLS 握手），在线程里发，不占事件循环
+  - 每个请求有超时；429 按 Telegram 返回的 retry_after 等待后重试，5xx/网络错误指数退避
+  - submit() 线程安全、立即返回，抓取永远不等投递
+TELEGRAM_API_BASE 可指向本地桩服务器做离线测试。
+"""
+import os
+import time
+import asyncio
+import threading
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT_SECONDS", "10"))
+MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "5"))
+WORKERS = max(1, int(os.getenv("NOTIFY_WORKERS", "1")))  # Telegram 单聊天有频率限制，默认串行
+
+
+class TelegramNotifier:
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        api_base: str = API_BASE,
+        timeout: float = TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        workers: int = WORKERS,
+    ):
+        self.token = token if token is not None else os.getenv("TELEGRAM_BOT_TOKEN")
+        self.chat_id = chat_id if chat_id is not None else os.getenv("TELEGRAM_CHAT_ID")
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.workers = workers
+        self.sent = 0
+        self.failed = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(2, workers))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    @property
+    def url(self) -> str:
+        return f"{self.api_base}/bot{self.token}/sendMessage"
+
+    # ---------- 生命周期 ----------
+    def start(self):
+        """在事件循环里调用一次，启动后台 worker"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def close(self, drain_timeout: float = 30):
+        """尽量把队列发完（最多 drain_timeout 秒），再停 worker"""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️ 通知队列还有 {self._queue.qsize()} 条未发送")
+        for t in self._tasks:
+            t.cancel()
+        for t in self._tasks:
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+        self.session.close()
+
+    # ---------- 入队 ----------
+    def submit(self, text: str, on_done: Optional[Callable[[bool], None]] = None):
+        """
+        线程安全，立即返回。未启动 worker 时退化为同步发送（带超时/重试）。
+        on_done(ok) 在投递结束后回调（worker 模式下在事件循环线程里）。
+        未配置 Telegram 时视为已处理，直接 on_done(True)。
+        """
+        if not self.enabled:
+            if on_done:
+                on_done(True)
+            return
+        item = (text, on_done)
+        if self._queue is None or self._loop is None:
+            self._finish(on_done, self._deliver_sync(text))
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._queue.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    @staticmethod
+    def _finish(on_done, ok: bool):
+        if on_done is None:
+            return
+        try:
+            on_done(ok)
+        except Exception as e:
+            print("❗ notify callback error:", e)
+
+    async def drain(self):
+        if self._queue is not None:
+            await self._queue.join()
+
+    # ---------- 投递 ----------
+    async def _worker(self):
+        while True:
+            text, on_done = await self._queue.get()
+            ok = False
+            try:
+                ok = await self._deliver(text)
+            except Exception as e:
+                self.failed += 1
+                print("❗ notify error:", e)
+            finally:
+                self._finish(on_done, ok)
+                self._queue.task_done()
+
+    def _post(self, text: str) -> tuple[Optional[int], float]:
+        """发一次；返回 (状态码, 建议等待秒数)。网络错误返回 (None, 0)"""
+        try:
+            resp = self.session.post(
+                self.url, data={"chat_id": self.chat_id, "text": text}, timeout=self.timeout
+            )
+        except requests.RequestException:
+            return None, 0.0
+        wait = 0.0
+        if resp.status_code == 429:
+            try:
+                wait = float(resp.json().get("parameters", {}).get("retry_after", 0))
+            except Exception:
+                wait = 0.0
+            if not wait:
+                try:
+                    wait = float(resp.headers.get("Retry-After", 1))
+                except ValueError:
+                    wait = 1.0
+        return resp.status_code, wait
+
+    @staticmethod
+    def _next_wait(status: Optional[int], wait: float, attempt: int) -> Optional[float]:
+        """决定是否重试：None = 不再重试"""
+        if status is not None and status < 300:
+            return None
+        if status == 429:
+            return max(wait, 0.5)
+        if status is None or status >= 500:
+            return min(2 ** attempt, 30)
+        return None  # 其它 4xx：重试也没用
+
+    async def _deliver(self, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            status, wait = await asyncio.to_thread(self._post, text)
+            if status is not None and status < 300:
+                self.sent += 1
+                return True
+            delay = self._next_wait(status, wait, attempt)
+            if delay is None or attempt == self.max_retries:
+                break
+            await asyncio.sleep(delay)
+        self.failed += 1
+        print(f"❗ 通知发送失败（status={status}）：{text[:60]}")
+        return False
+
+    def _deliver_sync(self, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            status, wait = self._post(text)
+            if status is not None and status < 300:
+                self.sent += 1
+                return True
+            delay = self._next_wait(status, wait, attempt)
+            if delay is None or attempt == self.max_retries:
+                break
+            time.sleep(delay)
+        self.failed += 1
+        return False
+
+
+_notifier: Optional[TelegramNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> TelegramNotifier:
+    """进程内共享的通知器"""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = TelegramNotifier()
+        return _notifier
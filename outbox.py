@@ -0,0 +1,150 @@
+# outbox.py
+"""
+持久化通知发件箱：
+  - 新职位的通知文本与 jobs 插入在同一个事务里写进 notify_outbox（进程挂了/Telegram 不通也不丢）
+  - 投递时把待发行合并成摘要消息（每条不超过 Telegram 的 4096 个 UTF-16 码元），消息数而非职位数决定吞吐
+  - 发送成功才删除对应行；失败的留在表里，下一轮或下次启动重放
+  - 送达回调在事件循环线程里，不碰数据库：只记下已送达的 id，由下一次 flush()/purge()（在线程里）删除
+"""
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+MAX_MESSAGE_CHARS = 4096  # Telegram sendMessage 文本上限（按 UTF-16 码元计，emoji 占 2）
+PENDING_BATCH = 500       # 每次 flush 最多取多少行
+
+
+def format_job_message(source: str, job: dict) -> str:
+    return (
+        f"🆕 [{source.capitalize()}] {job.get('title','')} — {job.get('company','')} · "
+        f"{job.get('location','')}\n🔗 {job.get('link','')}"
+    )
+
+
+def enqueue(cur: sqlite3.Cursor, source: str, jobs: list[dict]):
+    """在调用方的事务里写入发件箱（不 commit）"""
+    now = int(time.time())
+    cur.executemany(
+        "INSERT INTO notify_outbox(source, job_id, text, created_ts) VALUES(?,?,?,?)",
+        [(source, j.get("job_id"), format_job_message(source, j), now) for j in jobs],
+    )
+
+
+def _u16(s: str) -> int:
+    """Telegram 计长方式：UTF-16 码元数（BMP 外的字符，如多数 emoji，算 2）"""
+    return len(s.encode("utf-16-le")) // 2
+
+
+def _truncate_u16(s: str, limit: int) -> str:
+    """截到不超过 limit 个 UTF-16 码元（含末尾省略号），不切开代理对"""
+    if _u16(s) <= limit:
+        return s
+    out, n = [], 1  # 省略号占 1
+    for ch in s:
+        w = 2 if ord(ch) > 0xFFFF else 1
+        if n + w > limit:
+            break
+        out.append(ch)
+        n += w
+    return "".join(out) + "…"
+
+
+def build_digests(rows: list[tuple[int, str]], limit: int = MAX_MESSAGE_CHARS) -> list[tuple[str, list[int]]]:
+    """
+    把 (id, text) 行合并成若干条摘要：[(message, [ids...])]。
+    每条摘要带一行标题（本条含几条职位），总长（UTF-16 码元）不超过 limit；单条超长的截断。
+    """
+    digests: list[tuple[str, list[int]]] = []
+    parts: list[str] = []
+    ids: list[int] = []
+    size = 0
+    header_room = 32  # 标题行预留
+
+    def flush():
+        if not ids:
+            return
+        header = f"🆕 {len(ids)} new job{'s' if len(ids) > 1 else ''}" if len(ids) > 1 else ""
+        body = "\n\n".join(parts)
+        digests.append(((header + "\n\n" + body) if header else body, list(ids)))
+
+    for row_id, text in rows:
+        text = text or ""
+        text = _truncate_u16(text, limit - header_room)
+        add = _u16(text) + (2 if parts else 0)
+        if parts and size + add > limit - header_room:
+            flush()
+            parts, ids, size = [], [], 0
+            add = _u16(text)
+        parts.append(text)
+        ids.append(row_id)
+        size += add
+    flush()
+    return digests
+
+
+class OutboxDispatcher:
+    """
+    从 notify_outbox 取待发行，合并成摘要交给通知器；已送达的行在下一次 flush()/purge() 时删除。
+    in-flight（含已送达未删除）的行记在内存里，避免同一行被重复入队。
+    flush()/purge() 会拿写锁，调用方要在线程里调（finalize_batch 本来就在 to_thread 里）。
+    """
+
+    def __init__(self, db, submit: Callable[..., None]):
+        self.db = db              # db.Database
+        self.submit = submit      # submit(text, on_done=callable(ok: bool))
+        self._inflight: set[int] = set()
+        self._acked: set[int] = set()   # 已送达、还没从表里删掉
+        self._lock = threading.Lock()
+
+    def pending(self) -> list[tuple[int, str]]:
+        with self.db.read() as conn:
+            rows = conn.execute(
+                "SELECT id, text FROM notify_outbox ORDER BY id LIMIT ?", (PENDING_BATCH,)
+            ).fetchall()
+        with self._lock:
+            return [r for r in rows if r[0] not in self._inflight]
+
+    def flush(self) -> int:
+        """先删掉已送达的行，再把当前待发的行打包投递；返回入队的消息条数"""
+        self.purge()
+        rows = self.pending()
+        if not rows:
+            return 0
+        digests = build_digests(rows)
+        with self._lock:
+            for _, ids in digests:
+                self._inflight.update(ids)
+        for text, ids in digests:
+            self.submit(text, on_done=lambda ok, ids=ids: self._done(ids, ok))
+        return len(digests)
+
+    def _done(self, ids: list[int], ok: bool):
+        """通知器回调（事件循环线程）：只改内存状态，不等写锁"""
+        with self._lock:
+            if ok:
+                self._acked.update(ids)
+            else:
+                self._inflight.difference_update(ids)
+
+    def purge(self) -> int:
+        """把已送达的行从表里删掉；返回删除数"""
+        with self._lock:
+            acked, self._acked = self._acked, set()
+        if not acked:
+            return 0
+        try:
+            with self.db.write() as conn:
+                conn.executemany("DELETE FROM notify_outbox WHERE id=?", [(i,) for i in acked])
+                conn.commit()
+        except Exception:
+            with self._lock:
+                self._acked |= acked
+            raise
+        with self._lock:
+            self._inflight.difference_update(acked)
+        return len(acked)
+
+    def backlog(self) -> int:
+        with self.db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM notify_outbox").fetchone()[0]
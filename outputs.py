@@ -1,14 +1,22 @@
 # outputs.py
 from pathlib import Path
+import os
 import csv
-import sqlite3
+import json
 from datetime import datetime
-import html  # 新增：用于安全转义
+
+from db import get_db, jobs_after, dirty_jobs, clear_report_dirty, JOB_COLUMNS
 
 
 OUTPUT_DIR = Path("outputs")
 CSV_PATH   = OUTPUT_DIR / "new_jobs.csv"
 HTML_PATH  = OUTPUT_DIR / "latest.html"
+# 报表数据：分块的追加式 JS 文件 + 清单（file:// 下 fetch 不能读本地 JSON，所以用 <script> 加载）
+DATA_DIR   = OUTPUT_DIR / "data"
+MANIFEST_JSON = DATA_DIR / "manifest.json"   # Python 侧状态
+MANIFEST_JS   = DATA_DIR / "manifest.js"     # 浏览器侧清单
+CHUNK_ROWS = int(os.getenv("REPORT_CHUNK_ROWS", "5000"))  # 每块最多多少行，满了开新块
+MANIFEST_VERSION = 2  # 2：数据行带 rowid；版本不符时从头重建
 
 def ensure_output_dir():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -26,37 +34,118 @@ def append_new_jobs_csv(new_jobs: list[dict]):
             writer.writerow([now, j.get("job_id",""), j.get("title",""), j.get("company",""),
                              j.get("location",""), j.get("link","")])
 
-def build_html_from_db(db_path: str, limit: int = 100):
+# 每行在数据文件里的字段顺序（紧凑数组）。rowid 是行的身份：
+# 页面按 rowid 去重，同一 rowid 后到的覆盖先到的（补丁行 / 崩溃后重复追加的行），只有 [rowid] 表示删除
+ROW_FIELDS = ["rowid", "job_id", "title", "company", "location", "source", "link", "seen_at"]
+_CANONICAL = 1 + JOB_COLUMNS.index("canonical_rowid")  # jobs_after 行里 canonical_rowid 的位置
+
+def _report_row(r: tuple) -> list:
+    """(rowid, *JOB_COLUMNS) -> 数据行；跨站点重复（canonical_rowid 非空）只显示正本，给删除标记"""
+    if r[_CANONICAL] is not None:
+        return [r[0]]
+    return [r[0]] + [r[1 + k] or "" for k in range(len(ROW_FIELDS) - 1)]
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+def _empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "chunks": [], "last_rowid": 0, "total": 0}
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST_JSON.read_text(encoding="utf-8"))
+    except Exception:
+        return _empty_manifest()
+
+def _save_manifest(m: dict):
+    m["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    text = json.dumps(m, ensure_ascii=False)
+    _write_atomic(MANIFEST_JSON, text)
+    _write_atomic(MANIFEST_JS, f"window.__jobsManifest = {text};\n")
+
+def _chunk_line(rows: list[list]) -> str:
+    # U+2028/2029 在老浏览器的 JS 字符串里非法，转义掉
+    payload = json.dumps(rows, ensure_ascii=False).replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    return f"__jobsPush({payload});\n"
+
+def append_report_rows(rows: list[list], manifest: dict):
+    """把数据行（新行或补丁行）追加到当前数据块，满 CHUNK_ROWS 开新块；只写新增部分"""
+    chunks = manifest["chunks"]
+    i = 0
+    while i < len(rows):
+        if not chunks or chunks[-1]["rows"] >= CHUNK_ROWS:
+            chunks.append({"file": f"jobs_{len(chunks) + 1:04d}.js", "rows": 0})
+        cur = chunks[-1]
+        take = rows[i:i + CHUNK_ROWS - cur["rows"]]
+        path = DATA_DIR / cur["file"]
+        with path.open("a", encoding="utf-8") as f:
+            f.write(_chunk_line(take))
+        cur["rows"] += len(take)
+        cur["bytes"] = path.stat().st_size  # 页面缓存版本：崩溃后重复追加的块也会换版本
+        i += len(take)
+
+def build_html_from_db(db_path: str, limit: int = CHUNK_ROWS) -> str:
     """
-    从数据库读取最近职位，生成一个可浏览的 HTML 文件（表格样式 + 轻量筛选/搜索）。
+    增量更新 HTML 报表：latest.html 是静态外壳（内容不变就不重写），
+    数据按 rowid 水位从库里只取新行，追加到 data/jobs_NNNN.js 分块并更新清单。
+    输出过之后又被 UPDATE 的行（report_dirty：详情补全、事后关联正本）追加一条同 rowid 的补丁行。
+    没有新行/补丁时什么都不写。首次运行会把全部历史分批灌进去。
+    追加数据块和写清单不是一个原子操作：中途崩溃会重复追加，页面按 rowid 去重，结果不变。
     """
     ensure_output_dir()
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    rows = cur.execute("""
-        SELECT job_id, title, company, location, source, link, seen_at
-        FROM jobs
-        ORDER BY datetime(seen_at) DESC
-        LIMIT ?
-    """, (limit,)).fetchall()
-    conn.close()
-
-    # 简单预处理
-    data = [{
-        "job_id": r[0] or "",
-        "title": r[1] or "",
-        "company": r[2] or "",
-        "location": r[3] or "",
-        "source": (r[4] or "").lower(),
-        "link": r[5] or "",
-        "seen_at": r[6] or ""
-    } for r in rows]
-
-    # 唯一地点列表（用于下拉）
-    locations = sorted({d["location"].strip() for d in data if d["location"] and d["location"].strip() and d["location"] != "Unknown"})
-
-    # 生成 HTML（极简样式 + 原生 JS）
-    css = """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    _write_shell()
+
+    manifest = _load_manifest()
+    # 数据文件被删了 / 旧格式：从头重建
+    if manifest.get("version") != MANIFEST_VERSION or any(
+        not (DATA_DIR / c["file"]).exists() for c in manifest["chunks"]
+    ):
+        for c in manifest["chunks"]:
+            (DATA_DIR / c["file"]).unlink(missing_ok=True)
+        manifest = _empty_manifest()
+
+    changed = False
+    db = get_db(db_path)
+    with db.read() as conn:
+        # 补丁先于新行：只针对旧水位之前已经输出过的行
+        dirty_ids, dirty = dirty_jobs(conn, manifest["last_rowid"])
+        if dirty:
+            append_report_rows([_report_row(r) for r in dirty], manifest)
+            changed = True
+        while True:
+            batch = jobs_after(conn, manifest["last_rowid"], limit)
+            if not batch:
+                break
+            # 跨站点重复（canonical_rowid 非空）只显示正本
+            rows = [_report_row(r) for r in batch if r[_CANONICAL] is None]
+            if rows:
+                append_report_rows(rows, manifest)
+                manifest["total"] = manifest.get("total", 0) + len(rows)
+            manifest["last_rowid"] = batch[-1][0]
+            changed = True
+    if changed or not MANIFEST_JS.exists():
+        _save_manifest(manifest)
+    if dirty_ids:
+        # 清单落盘之后才清脏标记：中途崩溃最多重复补一次
+        with db.write() as conn:
+            clear_report_dirty(conn, dirty_ids)
+    return str(HTML_PATH)
+
+def _write_shell():
+    """外壳只在内容变化时重写"""
+    try:
+        if HTML_PATH.read_text(encoding="utf-8") == SHELL_HTML:
+            return
+    except FileNotFoundError:
+        pass
+    _write_atomic(HTML_PATH, SHELL_HTML)
+
+
+# 生成 HTML（极简样式 + 原生 JS）
+_CSS = """
     :root{
       --bg:#0b0c0f; --panel:#101217; --text:#e6e6e6; --muted:#9aa3af; --border:#23262d;
       --chip:#1f2937; --seek:#e11d48; --ln:#2563eb;
@@ -81,12 +170,101 @@ def build_html_from_db(db_path: str, limit: int = 100):
     .src.seek{background:#fee2e2;color:#991b1b;border-color:#fecaca}
     .src.linkedin{background:#dbeafe;color:#1d4ed8;border-color:#bfdbfe}
     .empty{padding:16px;text-align:center;color:var(--muted)}
-    """
+    #scroller{height:70vh;overflow:auto}
+    #scroller table{table-layout:fixed;margin-top:0}
+    #scroller th{position:sticky;top:0;background:var(--panel);z-index:1}
+    #tbody td{white-space:nowrap;overflow:hidden;text-overflow:ellipsis;line-height:20px}
+    #tbody tr.pad td{padding:0;border:0}
+"""
 
-    # 轻量搜索/筛选脚本（-exclude / OR）
-    js = """
-    const $=s=>document.querySelector(s); const $$=s=>Array.from(document.querySelectorAll(s));
+# 加载清单 -> 依次加载数据块 -> 建索引 -> 虚拟列表渲染
+# 搜索：每行的 title/company/location 小写后按空白切词，建 词 -> 行 倒排；
+# 查询词（不含空白）是 hay 的子串 <=> 是某个词的子串，所以只扫词表（远小于行数）得到行掩码，
+# 掩码按查询词缓存；输入防抖，每次输入只解析一次查询；只渲染可视区域的行。
+_JS = """
+    const $=s=>document.querySelector(s);
     const state={ q:"", src:"", loc:"" };
+    const FIELDS=%(fields)s;
+    const DATA=[];
+    // 按 rowid 去重：补丁行/重复追加的行覆盖原值（Map 保留首次出现的位置），[rowid] 表示删除
+    const BY_ROWID=new Map();
+    window.__jobsPush = rows => {
+      for(const r of rows){
+        if(r.length===1){ BY_ROWID.delete(r[0]); continue; }
+        const o={}; FIELDS.forEach((f,i)=>o[f]=r[i]||""); BY_ROWID.set(r[0], o);
+      }
+    };
+
+    let SRC=[], LOC=[], TOKENS=[], POST=new Map(), VIEW=[];
+    let ROW_H=41;
+    const OVERSCAN=12;
+    const termCache=new Map();
+
+    function loadScript(src){
+      return new Promise((ok,err)=>{ const s=document.createElement("script"); s.src=src; s.onload=ok; s.onerror=err; document.head.appendChild(s); });
+    }
+
+    async function load(){
+      await loadScript("data/manifest.js?t="+Date.now());
+      const m = window.__jobsManifest || {chunks:[]};
+      // 用块大小做缓存版本：块没变就走浏览器缓存
+      for(const c of m.chunks){ await loadScript("data/"+c.file+"?v="+(c.bytes||c.rows)); }
+      start();
+    }
+
+    function start(){
+      for(const o of BY_ROWID.values()) DATA.push(o);
+      DATA.reverse();  // 最新在前
+      const t0=performance.now();
+      buildIndex();
+      window.__indexMs = performance.now()-t0;
+      $("#total").textContent = DATA.length;
+      document.title = "Latest Jobs · " + DATA.length;
+      const locs=[...new Set(DATA.map(d=>(d.location||"").trim()).filter(l=>l && l!=="Unknown"))].sort();
+      $("#location").insertAdjacentHTML("beforeend", locs.map(l=>`<option value="${esc(l)}">${esc(l)}</option>`).join(""));
+      applyFilter();
+    }
+
+    function buildIndex(){
+      SRC=new Array(DATA.length); LOC=new Array(DATA.length);
+      POST=new Map();
+      for(let i=0;i<DATA.length;i++){
+        const d=DATA[i];
+        SRC[i]=(d.source||"").toLowerCase();
+        LOC[i]=(d.location||"").toLowerCase();
+        const hay=(d.title+" "+d.company+" "+d.location).toLowerCase();
+        for(const t of new Set(hay.split(/\\s+/))){
+          if(!t) continue;
+          let p=POST.get(t); if(!p) POST.set(t, p=[]);
+          p.push(i);
+        }
+      }
+      TOKENS=[...POST.keys()];
+      termCache.clear();
+    }
+
+    // 某个查询词命中的行掩码（Uint8Array），按词缓存
+    function rowsFor(term){
+      let mask=termCache.get(term);
+      if(mask) return mask;
+      mask=new Uint8Array(DATA.length);
+      for(const t of TOKENS){ if(t.includes(term)) for(const i of POST.get(t)) mask[i]=1; }
+      if(termCache.size>256) termCache.clear();
+      termCache.set(term, mask);
+      return mask;
+    }
+
+    function esc(s){ return String(s||"").replace(/[&<>"']/g, c=>({"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"}[c])); }
+
+    function rowHTML(d){
+      const source=(d.source||"").toLowerCase();
+      const cls = (source==="seek"||source==="linkedin") ? "src "+source : "src";
+      return `<tr>`
+        + `<td><a href="${esc(d.link||"#")}" target="_blank" rel="noopener" title="${esc(d.title)}">${esc(d.title||"Untitled")}</a></td>`
+        + `<td title="${esc(d.company)}">${esc(d.company||"—")}</td><td title="${esc(d.location)}">${esc(d.location||"—")}</td>`
+        + `<td><span class="${cls}">${esc(source||"N/A")}</span></td>`
+        + `<td><span class="muted">${esc(d.seen_at)}</span></td></tr>`;
+    }
 
     function parseQuery(q){
       const tokens=(q||"").trim().split(/\\s+/);
@@ -101,78 +279,74 @@ def build_html_from_db(db_path: str, limit: int = 100):
       return {must,or,not};
     }
 
-    function match(text,q){
-      if(!q) return true;
-      const hay=(text||"").toLowerCase();
-      const {must,or,not}=parseQuery(q);
-      if(must.some(k=>!hay.includes(k))) return false;
-      if(or.length && !or.some(k=>hay.includes(k))) return false;
-      if(not.some(k=>hay.includes(k))) return false;
-      return true;
+    function applyFilter(){
+      const t0=performance.now();
+      const {must,or,not}=parseQuery(state.q);
+      const mustM=must.map(rowsFor), orM=or.map(rowsFor), notM=not.map(rowsFor);
+      const src=state.src, loc=state.loc.toLowerCase();
+      const out=[];
+      outer: for(let i=0;i<DATA.length;i++){
+        if(src && SRC[i]!==src) continue;
+        if(loc && LOC[i]!==loc) continue;
+        for(const m of mustM) if(!m[i]) continue outer;
+        if(orM.length){
+          let any=false;
+          for(const m of orM) if(m[i]){ any=true; break; }
+          if(!any) continue;
+        }
+        for(const m of notM) if(m[i]) continue outer;
+        out.push(i);
+      }
+      VIEW=out;
+      window.__lastFilterMs = performance.now()-t0;
+      $("#count").textContent = out.length;
+      $("#took").textContent = window.__lastFilterMs.toFixed(1)+" ms";
+      $("#scroller").scrollTop = 0;
+      paint();
     }
 
-    function render(){
-      const q = state.q;
-      const src = state.src;
-      const loc = state.loc;
-
-      let shown = 0;
-      $$("#tbody tr").forEach(tr=>{
-        const t = tr.dataset.title, c = tr.dataset.company, l = tr.dataset.location, s = tr.dataset.source;
-        const hay = (t+" "+c+" "+l).toLowerCase();
-        const passQ = match(hay,q);
-        const passS = !src || s===src;
-        const passL = !loc || l.toLowerCase()===loc.toLowerCase();
-        const on = passQ && passS && passL;
-        tr.style.display = on ? "" : "none";
-        if(on) shown++;
-      });
-      $("#count").textContent = shown;
+    // 虚拟列表：只渲染可视区 ± OVERSCAN 行，上下用占位行撑出滚动高度
+    function paint(){
+      const sc=$("#scroller"), tbody=$("#tbody");
+      if(!VIEW.length){
+        tbody.innerHTML = `<tr><td colspan="5" class="empty">${DATA.length ? "No match." : "No data."}</td></tr>`;
+        return;
+      }
+      const top=sc.scrollTop, h=sc.clientHeight||600;
+      const start=Math.max(0, Math.floor(top/ROW_H)-OVERSCAN);
+      const end=Math.min(VIEW.length, Math.ceil((top+h)/ROW_H)+OVERSCAN);
+      let html=`<tr class="pad"><td colspan="5" style="height:${start*ROW_H}px"></td></tr>`;
+      for(let k=start;k<end;k++) html+=rowHTML(DATA[VIEW[k]]);
+      html+=`<tr class="pad"><td colspan="5" style="height:${(VIEW.length-end)*ROW_H}px"></td></tr>`;
+      tbody.innerHTML=html;
+      // 首次渲染后量一下真实行高
+      const r=tbody.querySelector("tr:not(.pad)");
+      if(r && r.offsetHeight && Math.abs(r.offsetHeight-ROW_H)>0.5){ ROW_H=r.offsetHeight; paint(); }
     }
 
-    $("#q").addEventListener("input", e=>{ state.q=e.target.value; render(); });
-    $("#source").addEventListener("change", e=>{ state.src=e.target.value; render(); });
-    $("#location").addEventListener("change", e=>{ state.loc=e.target.value; render(); });
+    let raf=0;
+    $("#scroller").addEventListener("scroll", ()=>{ if(!raf) raf=requestAnimationFrame(()=>{ raf=0; paint(); }); });
 
-    render();
-    """
+    let timer=0;
+    $("#q").addEventListener("input", e=>{
+      clearTimeout(timer);
+      timer=setTimeout(()=>{ state.q=e.target.value; applyFilter(); }, 120);
+    });
+    $("#source").addEventListener("change", e=>{ state.src=e.target.value; applyFilter(); });
+    $("#location").addEventListener("change", e=>{ state.loc=e.target.value; applyFilter(); });
+
+    load();
+""" % {"fields": json.dumps(ROW_FIELDS)}
 
-    # 构建地点下拉 HTML
-    loc_options = "<option value=''>All locations</option>" + "".join(
-        f"<option value='{html.escape(l)}'>{html.escape(l)}</option>" for l in locations
-    )
-
-    # 构建表格行
-    rows_html = []
-    for d in data:
-        title = html.escape(d["title"] or "Untitled")
-        company = html.escape(d["company"] or "—")
-        location = html.escape(d["location"] or "—")
-        source = (d["source"] or "")
-        seen = html.escape(d["seen_at"] or "")
-        href = (d["link"] or "#")
-        src_class = f"src {source}" if source in ("seek","linkedin") else "src"
-
-        rows_html.append(
-            f"<tr data-title='{html.escape(d['title'])}' data-company='{html.escape(d['company'])}' "
-            f"data-location='{html.escape(d['location'])}' data-source='{html.escape(source)}'>"
-            f"<td><a href='{html.escape(href)}' target='_blank' rel='noopener'>{title}</a></td>"
-            f"<td>{company}</td>"
-            f"<td>{location}</td>"
-            f"<td><span class='{src_class}'>{html.escape(source or 'N/A')}</span></td>"
-            f"<td><span class='muted'>{seen}</span></td>"
-            f"</tr>"
-        )
-
-    html_out = f"""<!doctype html>
+SHELL_HTML = f"""<!doctype html>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
-<title>Latest Jobs · {len(data)}</title>
-<style>{css}</style>
+<title>Latest Jobs</title>
+<style>{_CSS}</style>
 <div class="wrap">
   <div class="row">
     <h1>Latest Jobs</h1>
-    <div class="muted">showing <span id="count">{len(data)}</span> / {len(data)}</div>
+    <div class="muted">showing <span id="count">0</span> / <span id="total">0</span> · <span id="took"></span></div>
   </div>
 
   <div class="panel">
@@ -183,32 +357,28 @@ def build_html_from_db(db_path: str, limit: int = 100):
         <option value="seek">Seek</option>
         <option value="linkedin">LinkedIn</option>
       </select>
-      <select id="location">{loc_options}</select>
+      <select id="location"><option value=''>All locations</option></select>
     </div>
   </div>
 
-  <div class="panel" style="margin-top:10px; overflow:auto;">
+  <div class="panel" id="scroller" style="margin-top:10px;">
     <table>
       <thead>
         <tr>
-          <th>Title</th>
-          <th>Company</th>
-          <th>Location</th>
-          <th>Source</th>
-          <th>Seen at</th>
+          <th style="width:36%">Title</th>
+          <th style="width:20%">Company</th>
+          <th style="width:20%">Location</th>
+          <th style="width:10%">Source</th>
+          <th style="width:14%">Seen at</th>
         </tr>
       </thead>
       <tbody id="tbody">
-        {"".join(rows_html) if rows_html else '<tr><td colspan="5" class="empty">No data.</td></tr>'}
+        <tr><td colspan="5" class="empty">Loading…</td></tr>
       </tbody>
     </table>
   </div>
 
   <p class="muted" style="margin-top:10px">Tip: e.g. <code class="muted">tester OR qa -senior -lead</code></p>
 </div>
-<script>{js}</script>
+<script>{_JS}</script>
 """
-
-    HTML_PATH.write_text(html_out, encoding="utf-8")
-    return str(HTML_PATH)
-
@@ -0,0 +1,58 @@
+# recent.py
+"""
+命令行查最近入库的职位（db.recent_jobs 的 keyset 分页，不扫全表）。
+
+用法：
+    python recent.py [--source seek] [--location "Auckland CBD, Auckland"] [--limit 20]
+                     [--before SEEN_TS:ROWID] [--pages 1] [--db db.sqlite3]
+
+每页末尾打印下一页的游标，传给 --before 接着往前翻；--pages 一次连翻几页。
+跨站点重复（canonical_rowid 非空）默认不显示，--all 全显示。
+"""
+import sys
+import argparse
+from datetime import datetime
+
+from db import get_db, recent_jobs
+
+DB_PATH = "db.sqlite3"
+
+
+def _cursor(s: str) -> tuple[int, int]:
+    seen_ts, rowid = s.split(":")
+    return int(seen_ts), int(rowid)
+
+
+def iter_pages(conn, limit: int, source=None, location=None, before=None, pages: int = 1):
+    """依次产出 (rows, next_cursor)；没有更多时停"""
+    for _ in range(pages):
+        rows, before = recent_jobs(conn, limit=limit, source=source, location=location, before=before)
+        yield rows, before
+        if before is None:
+            return
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="最近入库的职位（seen_ts 倒序）")
+    ap.add_argument("--source")
+    ap.add_argument("--location")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--before", type=_cursor, help="上一页打印的游标 SEEN_TS:ROWID")
+    ap.add_argument("--pages", type=int, default=1)
+    ap.add_argument("--all", action="store_true", help="也显示跨站点重复")
+    ap.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args(argv)
+
+    with get_db(args.db).read() as conn:
+        for rows, nxt in iter_pages(conn, args.limit, args.source, args.location, args.before, args.pages):
+            for j in rows:
+                if j["canonical_rowid"] is not None and not args.all:
+                    continue
+                when = datetime.fromtimestamp(j["seen_ts"]).strftime("%Y-%m-%d %H:%M") if j["seen_ts"] else "?"
+                print(f"{when}  [{j['source']}] {j['title']} — {j['company']} · {j['location']}\n    {j['link']}")
+            print(f"-- next: --before {nxt[0]}:{nxt[1]}" if nxt else "-- end")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# request_policy.py
+"""
+无头抓取时的请求拦截：按站点丢掉图片/字体/媒体、统计/广告脚本。
+只在 headless 上下文启用；登录用的可见浏览器不装路由，保证交互登录正常。
+注意：Playwright 开启 route 后该上下文的 HTTP 缓存会被禁用。
+"""
+import os
+from typing import Optional
+from urllib.parse import urlparse
+
+# 所有站点都丢的资源类型（stylesheet 保留：布局影响懒加载/滚动）
+DEFAULT_BLOCK_TYPES = {"image", "media", "font"}
+
+# 统计/广告/埋点（子串匹配，小写）
+COMMON_BLOCK_PATTERNS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "adservice.google", "facebook.net", "connect.facebook",
+    "hotjar.com", "segment.io", "segment.com/analytics", "newrelic.com", "nr-data.net",
+    "optimizely.com", "bat.bing.com", "clarity.ms", "tiktok.com/i18n/pixel",
+]
+
+# 站点 -> {domains, block_types, block_patterns}
+SITE_POLICIES = {
+    "seek": {
+        "domains": ["seek.co.nz", "seek.com.au"],
+        "block_types": DEFAULT_BLOCK_TYPES,
+        "block_patterns": COMMON_BLOCK_PATTERNS + [
+            "tealium", "tags.tiqcdn.com", "/_tracking", "snowplow", "sp.seek",
+        ],
+    },
+    "linkedin": {
+        "domains": ["linkedin.com", "licdn.com"],
+        "block_types": DEFAULT_BLOCK_TYPES,
+        "block_patterns": COMMON_BLOCK_PATTERNS + [
+            "px.ads.linkedin.com", "snap.licdn.com", "dc.ads.linkedin.com",
+            "/li/track", "/tscp-serving/", "platform.linkedin.com/litms",
+        ],
+    },
+}
+
+
+def _env_set(name: str) -> Optional[set]:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return None
+    return {t.strip().lower() for t in raw.split(",") if t.strip()}
+
+
+class RequestPolicy:
+    """
+    装到 BrowserContext 上的路由层。
+    stats 按站点累计：放行的请求数和实际传输字节数（请求结束后 request.sizes() 的响应头+响应体，
+    压缩后的大小；拿不到时退回 body 长度）；被拦的请求单独计数并按原因分类（资源类型或 url 规则），
+    它们不上网，不计字节。每轮用 take_stats() 取出并清零。
+    """
+
+    def __init__(self, sites: dict, enabled: bool = True):
+        self.sites = sites
+        self.enabled = enabled
+        self.stats: dict[str, dict] = {}
+
+    @classmethod
+    def from_env(cls) -> "RequestPolicy":
+        types_override = _env_set("BLOCK_RESOURCE_TYPES")
+        extra_patterns = sorted(_env_set("BLOCK_URL_PATTERNS_EXTRA") or [])
+        sites = {}
+        for name, pol in SITE_POLICIES.items():
+            sites[name] = {
+                "domains": list(pol["domains"]),
+                "block_types": set(types_override if types_override is not None else pol["block_types"]),
+                "block_patterns": list(pol["block_patterns"]) + extra_patterns,
+            }
+        return cls(sites, enabled=os.getenv("BLOCK_REQUESTS", "1") == "1")
+
+    # ---------- 站点归属 ----------
+    def site_for_url(self, url: str) -> Optional[str]:
+        host = (urlparse(url or "").hostname or "").lower()
+        for name, pol in self.sites.items():
+            if any(host == d or host.endswith("." + d) for d in pol["domains"]):
+                return name
+        return None
+
+    def _site_for(self, req_or_resp) -> str:
+        # 第三方脚本（GA 等）按“所在页面”的站点归属
+        try:
+            site = self.site_for_url(req_or_resp.frame.url)
+            if site:
+                return site
+        except Exception:
+            pass
+        return self.site_for_url(req_or_resp.url) or "other"
+
+    def block_reason(self, site: str, resource_type: str, url: str) -> Optional[str]:
+        """要拦时返回原因（资源类型，或 "url" 表示命中 url 规则），否则 None"""
+        pol = self.sites.get(site)
+        url_lc = (url or "").lower()
+        if pol is None:
+            return "url" if any(p in url_lc for p in COMMON_BLOCK_PATTERNS) else None
+        if resource_type in pol["block_types"]:
+            return resource_type
+        return "url" if any(p in url_lc for p in pol["block_patterns"]) else None
+
+    def should_block(self, site: str, resource_type: str, url: str) -> bool:
+        return self.block_reason(site, resource_type, url) is not None
+
+    def _bucket(self, site: str) -> dict:
+        return self.stats.setdefault(site, {"blocked": 0, "blocked_by": {}, "allowed": 0, "bytes": 0})
+
+    # ---------- Playwright 回调 ----------
+    async def _route(self, route):
+        req = route.request
+        site = self._site_for(req)
+        reason = self.block_reason(site, req.resource_type, req.url)
+        if reason:
+            bucket = self._bucket(site)
+            bucket["blocked"] += 1
+            bucket["blocked_by"][reason] = bucket["blocked_by"].get(reason, 0) + 1
+            try:
+                await route.abort("blockedbyclient")
+            except Exception:
+                pass
+            return
+        self._bucket(site)["allowed"] += 1
+        try:
+            await route.continue_()
+        except Exception:
+            pass
+
+    async def _on_request_finished(self, req):
+        # Content-Length 常常没有（chunked / 压缩），用请求结束后的实际传输大小
+        try:
+            sizes = await req.sizes()
+            size = max(0, sizes.get("responseBodySize", 0)) + max(0, sizes.get("responseHeadersSize", 0))
+        except Exception:
+            try:
+                resp = await req.response()
+                size = len(await resp.body()) if resp else 0
+            except Exception:
+                size = 0
+        if size:
+            self._bucket(self._site_for(req))["bytes"] += size
+
+    async def install(self, context, headless: bool) -> bool:
+        """headless 且启用时装路由；返回是否生效"""
+        if not (self.enabled and headless):
+            return False
+        await context.route("**/*", self._route)
+        context.on("requestfinished", self._on_request_finished)
+        return True
+
+    def take_stats(self) -> dict:
+        stats, self.stats = self.stats, {}
+        return stats
+
+    @staticmethod
+    def format_stats(stats: dict) -> str:
+        if not stats:
+            return "no requests routed"
+        parts = []
+        for site, s in sorted(stats.items()):
+            blocked = f"blocked {s['blocked']}"
+            if s["blocked_by"]:
+                blocked += " [" + ", ".join(f"{k} {v}" for k, v in sorted(s["blocked_by"].items())) + "]"
+            parts.append(f"{site}: allowed {s['allowed']} ({s['bytes'] / 1024:.0f} KiB transferred), {blocked}")
+        return "; ".join(parts)
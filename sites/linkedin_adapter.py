@@ -1,10 +1,14 @@
 # sites/linkedin_adapter.py
 from __future__ import annotations
 from playwright.async_api import Page
-from typing import Optional, List, Dict
-from urllib.parse import urljoin, urlparse, parse_qs
+from typing import Container, Optional, List, Dict
+from urllib.parse import urljoin, urlparse, parse_qs, parse_qsl, urlencode
+from html.parser import HTMLParser
 import re
-from pathlib import Path
+
+from sites.scrolling import scroll_until_stable
+from title_filter import TitleFilter, PAGE_FILTER_JS
+from debug_store import get_debug_store
 
 # =============== 小工具 ===============
 def _norm(s: Optional[str]) -> Optional[str]:
@@ -28,19 +32,6 @@ def _job_id_from_link(href: str) -> str:
     m = re.search(r"/jobs/view/(\d+)", href)
     return m.group(1) if m else (href or "")
 
-async def _text_first(root, selectors: List[str]) -> Optional[str]:
-    for sel in selectors:
-        el = await root.query_selector(sel)
-        if el:
-            try:
-                t = await el.inner_text()
-                t = _norm(t)
-                if t:
-                    return t
-            except Exception:
-                pass
-    return None
-
 def _parse_company_location_from_aria(aria: str) -> tuple[Optional[str], Optional[str]]:
     """
     常见 aria-label 形如：
@@ -63,14 +54,117 @@ def _parse_company_location_from_aria(aria: str) -> tuple[Optional[str], Optiona
 # 只要页面里出现“查看职位”的链接就算有卡片
 JOB_LINK_SEL = 'a[href*="/jobs/view/"]'
 
+# 卡片容器（向上找常见容器）
+CARD_SEL = "li, .base-card, .job-card-container, .jobs-search-results__list-item"
+
+COMPANY_SELECTORS = [
+    ".job-card-container__company-name",
+    ".base-search-card__subtitle a",
+    ".base-search-card__subtitle",
+    ".base-card__subtitle a",
+    ".base-card__subtitle",
+    ".artdeco-entity-lockup__subtitle a",
+    ".artdeco-entity-lockup__subtitle span",
+]
+
+LOCATION_SELECTORS = [
+    ".job-card-container__metadata-item--location",
+    ".job-card-container__metadata-item",
+    ".base-search-card__metadata > span",
+    ".base-card__metadata > span",
+]
+
+# 采样到的轮次保存前几张卡片 HTML 便于排查（没采到时页面端不序列化）
+DEBUG_CARD_COUNT = 6
+
+# 页面端一次性抽取：不在 Python 侧持有任何元素句柄
+# 返回 {rows: [[job_id, href, title, company, location], ...], debug: [outerHTML, ...], dropped}
+# 标题命中排除规则的卡片读完标题就丢，不找卡片容器、不探测选择器；
+# withFields=false 时（有 seen 索引）只读 id/href/title，卡片暂存在 window 上，
+# 由 _FIELDS_JS 只对未入库的下标补 company/location
+_TEXT_FIRST_JS = """
+  const textFirst = (root, sels) => {
+    for (const s of sels) {
+      let el = null;
+      try { el = root.querySelector(s); } catch (e) {}
+      if (!el) continue;
+      const t = (el.innerText || '').trim();
+      if (t) return t;
+    }
+    return null;
+  };
+"""
+
+_BATCH_JS = (
+    "([linkSel, cardSel, companySel, locationSel, debugCount, withFields, rules]) => {"
+    + _TEXT_FIRST_JS
+    + PAGE_FILTER_JS
+    + """
+  const filter = titleDropper(rules);
+  const links = Array.from(document.querySelectorAll(linkSel));
+  const debug = links.slice(0, debugCount).map(a => {
+    try { return (a.closest(cardSel) || a).outerHTML || ''; } catch (e) { return ''; }
+  });
+  const seen = new Set();
+  const rows = [];
+  const cards = [];
+  for (const a of links) {
+    try {
+      const href = a.getAttribute('href') || '';
+      if (!href) continue;
+      const m = href.match(/\\/jobs\\/view\\/(\\d+)/);
+      if (!m) continue;
+      const jobId = m[1];
+      if (seen.has(jobId)) continue;
+      seen.add(jobId);
+      const title = a.innerText || '';
+      if (filter.drop(title)) continue;
+      const card = a.closest(cardSel) || a;
+      if (withFields) {
+        rows.push([jobId, href, title, textFirst(card, companySel), textFirst(card, locationSel)]);
+      } else {
+        rows.push([jobId, href, title, null, null]);
+        cards.push(card);
+      }
+    } catch (e) {
+      // 单个卡片失败不影响整体
+    }
+  }
+  window.__lnCards = withFields ? null : cards;
+  return { rows, debug, dropped: filter.dropped };
+}"""
+)
+
+_FIELDS_JS = (
+    "([indexes, companySel, locationSel]) => {"
+    + _TEXT_FIRST_JS
+    + """
+  const cards = window.__lnCards || [];
+  const out = indexes.map(i => {
+    const card = cards[i];
+    if (!card) return [null, null];
+    try { return [textFirst(card, companySel), textFirst(card, locationSel)]; }
+    catch (e) { return [null, null]; }
+  });
+  window.__lnCards = null;
+  return out;
+}"""
+)
+
 
 # =============== 适配器 ===============
-async def extract_linkedin_jobs(page: Page) -> List[Dict]:
+async def extract_linkedin_jobs(page: Page, seen: Optional[Container[str]] = None,
+                                title_filter: Optional[TitleFilter] = None,
+                                page_stats: Optional[Dict] = None) -> List[Dict]:
     """
     更稳健的 LinkedIn 列表抓取：
     - 不依赖固定的 ul.jobs-search__results-list
     - 以 a[href*="/jobs/view/"] 为基准抓取
     - 处理懒加载/弹窗/无结果
+    - 卡片字段在页面端一次 evaluate 取回，不产生逐卡 ElementHandle
+    - seen（已入库的 job_id 集合）命中的卡片读到 id 就跳过，不返回
+    - title_filter 的排除规则在页面端读到标题时就生效，丢弃数记到 title_filter.page_skipped
+    - page_stats 传入 dict 时填本页 {raw, known, filtered}（卡片总数 / 已入库跳过 / 标题规则丢弃）
     """
     # 避免用 page.content()（导航期易报错），改为 evaluate 读取可见文本
     url_lc = (page.url or "").lower()
@@ -102,99 +196,145 @@ async def extract_linkedin_jobs(page: Page) -> List[Dict]:
         # 再缓一缓
         await page.wait_for_timeout(1200)
 
-    # 轻微滚动触发懒加载
-    for _ in range(3):
-        await page.mouse.wheel(0, 1000)
-        await page.wait_for_timeout(400)
-
-    # 第一次抓
-    links = await page.query_selector_all(JOB_LINK_SEL)
-    # 若还少，再滚几屏
-    if not links:
-        for _ in range(6):
-            await page.mouse.wheel(0, 1400)
-            await page.wait_for_timeout(500)
-            links = await page.query_selector_all(JOB_LINK_SEL)
-            if links:
-                break
+    # 懒加载：滚到卡片数稳定为止（取代固定的 3+6 步滚动）
+    await scroll_until_stable(page, JOB_LINK_SEL, label="linkedin")
+
+    store = get_debug_store()
+    debug_count = DEBUG_CARD_COUNT if store.sampled() else 0
+    data = await page.evaluate(
+        _BATCH_JS,
+        [JOB_LINK_SEL, CARD_SEL, COMPANY_SELECTORS, LOCATION_SELECTORS, debug_count, seen is None,
+         title_filter.page_rules() if title_filter is not None else None],
+    ) or {}
+    rows = data.get("rows") or []
+    if title_filter is not None and data.get("dropped"):
+        title_filter.record_page("linkedin", data["dropped"])
+    filtered = sum((data.get("dropped") or {}).values())
+    total = len(rows)
+
+    # 已入库的卡片不再补字段
+    if seen is not None:
+        todo = [i for i, r in enumerate(rows) if r[0] not in seen]
+        if len(todo) < len(rows):
+            print(f"[linkedin] 跳过 {len(rows) - len(todo)} 张已入库的卡片")
+        fields = []
+        if todo:
+            fields = await page.evaluate(_FIELDS_JS, [todo, COMPANY_SELECTORS, LOCATION_SELECTORS]) or []
+        rows = [rows[i][:3] + list(f) for i, f in zip(todo, fields)]
+    if page_stats is not None:
+        page_stats.update(raw=total + filtered, known=total - len(rows), filtered=filtered)
+
+    for idx, outer in enumerate(data.get("debug") or [], 1):
+        store.save("card", "linkedin", outer or "", card=idx, url=page.url)
 
     jobs: List[Dict] = []
-    seen_ids: set[str] = set()
-
-    # 保存前几张卡片 HTML 便于排查
-    Path("debug_cards").mkdir(exist_ok=True)
-
-    for idx, a in enumerate(links[:6], 1):
-        try:
-            outer = await a.evaluate("el => (el.closest('li, .base-card, .job-card-container, .jobs-search-results__list-item') || el).outerHTML")
-            Path(f"debug_cards/ln_card_{idx}.html").write_text(outer or "", encoding="utf-8")
-        except Exception:
-            pass
-
-    for a in links:
-        try:
-            href = await a.get_attribute("href") or ""
-            if not href:
-                continue
-
-            # job_id
-            m = re.search(r"/jobs/view/(\d+)", href)
-            if not m:
-                continue
-            job_id = m.group(1)
-            if job_id in seen_ids:
-                continue
-            seen_ids.add(job_id)
-
-            # 标题（链接文本）
-            try:
-                title = _norm(await a.inner_text()) or "Unknown title"
-            except Exception:
-                title = "Unknown title"
-
-            # 找到卡片容器（向上找常见容器）
-            card_js = await a.evaluate_handle(
-                "el => el.closest('li, .base-card, .job-card-container, .jobs-search-results__list-item') || el"
-            )
-            card = card_js.as_element()
-
-            # 公司
-            company = "Unknown"
-            if card:
-                company = await _text_first(card, [
-                    ".job-card-container__company-name",
-                    ".base-search-card__subtitle a",
-                    ".base-search-card__subtitle",
-                    ".base-card__subtitle a",
-                    ".base-card__subtitle",
-                    ".artdeco-entity-lockup__subtitle a",
-                    ".artdeco-entity-lockup__subtitle span",
-                ]) or "Unknown"
-
-            # 地点
-            location = "Unknown"
-            if card:
-                location = await _text_first(card, [
-                    ".job-card-container__metadata-item--location",
-                    ".job-card-container__metadata-item",
-                    ".base-search-card__metadata > span",
-                    ".base-card__metadata > span",
-                ]) or "Unknown"
-
-            # 规范化链接（去掉追踪参数）
-            link = href.split("?")[0]
-            if not link.startswith("http"):
-                link = urljoin("https://www.linkedin.com", link)
-
-            jobs.append({
-                "job_id": job_id,
-                "title": title,
-                "company": company,
-                "location": location,
-                "link": link,
-            })
-        except Exception:
-            # 单个卡片失败不影响整体
-            continue
+    for job_id, href, title, company, location in rows:
+        # 规范化链接（去掉追踪参数）
+        link = href.split("?")[0]
+        if not link.startswith("http"):
+            link = urljoin("https://www.linkedin.com", link)
+
+        jobs.append({
+            "job_id": job_id,
+            "title": _norm(title) or "Unknown title",
+            "company": _norm(company) or "Unknown",
+            "location": _norm(location) or "Unknown",
+            "link": link,
+        })
 
     return jobs
+
+
+# =============== HTTP 快速通道：公开的 guest 列表接口 ===============
+GUEST_API = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+GUEST_PAGE_SIZE = 25
+
+def linkedin_guest_url(search_url: str, start: int = 0) -> str:
+    """把 /jobs/search/?keywords=..&location=..&f_TPR=.. 换成 guest 接口（返回卡片 HTML 片段）"""
+    qs = dict(parse_qsl(urlparse(search_url).query, keep_blank_values=True))
+    qs["start"] = str(start)
+    return f"{GUEST_API}?{urlencode(qs)}"
+
+class _GuestCardParser(HTMLParser):
+    """guest 列表卡片：data-entity-urn 带 job id，标题/公司/地点按 base-search-card 类名取"""
+    FIELDS = (
+        ("base-search-card__title", "title"),
+        ("base-search-card__subtitle", "company"),
+        ("job-search-card__location", "location"),
+    )
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards: list[dict] = []
+        self._field: Optional[str] = None
+        self._tag: Optional[str] = None
+        self._depth = 0
+        self._buf: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._field is not None:
+            if tag == self._tag:
+                self._depth += 1
+            return
+        a = dict(attrs)
+        urn = a.get("data-entity-urn") or ""
+        m = re.search(r"jobPosting:(\d+)", urn)
+        if m:
+            self.cards.append({"job_id": m.group(1)})
+            return
+        if not self.cards:
+            return
+        cls = a.get("class") or ""
+        card = self.cards[-1]
+        if tag == "a" and "base-card__full-link" in cls and "href" not in card:
+            card["href"] = a.get("href") or ""
+            return
+        for marker, field in self.FIELDS:
+            if marker in cls and field not in card:
+                self._field, self._tag, self._depth, self._buf = field, tag, 0, []
+                return
+
+    def handle_endtag(self, tag):
+        if self._field is None or tag != self._tag:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+        self.cards[-1][self._field] = " ".join("".join(self._buf).split())
+        self._field = None
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._buf.append(data)
+
+def parse_linkedin_guest_html(text: str) -> Optional[List[Dict]]:
+    """
+    解析 guest 接口 / 未登录搜索页的卡片 HTML。
+    空响应（翻到底了）返回 []；有内容却一张卡都解析不出（改版/被拦）返回 None。
+    """
+    if not (text or "").strip():
+        return []
+    parser = _GuestCardParser()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:
+        pass
+    jobs: List[Dict] = []
+    ids = set()
+    for c in parser.cards:
+        jid = c.get("job_id")
+        if not jid or jid in ids:
+            continue
+        ids.add(jid)
+        link = (c.get("href") or "").split("?")[0] or f"https://www.linkedin.com/jobs/view/{jid}/"
+        if not link.startswith("http"):
+            link = urljoin("https://www.linkedin.com", link)
+        jobs.append({
+            "job_id": jid,
+            "title": _norm(c.get("title")) or "Unknown title",
+            "company": _norm(c.get("company")) or "Unknown",
+            "location": _norm(c.get("location")) or "Unknown",
+            "link": link,
+        })
+    return jobs or None
@@ -0,0 +1,73 @@
+# sites/scrolling.py
+from __future__ import annotations
+from playwright.async_api import Page
+from typing import Optional
+import os
+
+from metrics import METRICS
+
+SCROLL_STEP_PX = int(os.getenv("SCROLL_STEP_PX", "1600"))
+SCROLL_SETTLE_MS = int(os.getenv("SCROLL_SETTLE_MS", "700"))   # 每步最多等多久的 DOM 变化
+SCROLL_MAX_MS = int(os.getenv("SCROLL_MAX_MS", "8000"))        # 硬上限
+SCROLL_STABLE_ROUNDS = int(os.getenv("SCROLL_STABLE_ROUNDS", "2"))  # 连续几步卡片数不涨就停
+
+# 整个循环在页面端跑，一次 evaluate 往返：
+# 滚一步 -> 等 DOM 变化（MutationObserver）或 settle 超时 -> 数卡片；
+# 卡片数连续 stableRounds 步不涨 / 达到 target / 超过 maxMs 即停。
+# 除了滚 window，还把最后一张卡 scrollIntoView，兼容 LinkedIn 那种内层滚动容器。
+_SCROLL_JS = """
+async ([sel, target, stepPx, settleMs, maxMs, stableRounds]) => {
+  const t0 = performance.now();
+  const count = () => document.querySelectorAll(sel).length;
+  const waitMutation = (ms) => new Promise(resolve => {
+    let done = false;
+    const finish = () => { if (!done) { done = true; obs.disconnect(); resolve(); } };
+    const obs = new MutationObserver(() => setTimeout(finish, 80));
+    obs.observe(document.body || document.documentElement, { childList: true, subtree: true });
+    setTimeout(finish, ms);
+  });
+  let last = count(), stable = 0, steps = 0;
+  while (performance.now() - t0 < maxMs) {
+    if (target && last >= target) break;
+    const els = document.querySelectorAll(sel);
+    if (els.length) {
+      try { els[els.length - 1].scrollIntoView({ block: 'end' }); } catch (e) {}
+    }
+    window.scrollBy(0, stepPx);
+    steps++;
+    await waitMutation(settleMs);
+    const n = count();
+    if (n > last) { last = n; stable = 0; }
+    else if (++stable >= stableRounds) break;
+  }
+  return { steps, ms: Math.round(performance.now() - t0), count: last };
+}
+"""
+
+
+async def scroll_until_stable(
+    page: Page,
+    selector: str,
+    *,
+    label: str = "",
+    target: Optional[int] = None,
+    step_px: int = SCROLL_STEP_PX,
+    settle_ms: int = SCROLL_SETTLE_MS,
+    max_ms: int = SCROLL_MAX_MS,
+    stable_rounds: int = SCROLL_STABLE_ROUNDS,
+) -> dict:
+    """
+    滚动直到 selector 匹配的卡片数不再增长（或达到 target / 超过 max_ms）。
+    返回 {"steps", "ms", "count"}，并打印一行汇总。
+    """
+    try:
+        with METRICS.span("scroll"):
+            stats = await page.evaluate(
+                _SCROLL_JS, [selector, target or 0, step_px, settle_ms, max_ms, stable_rounds]
+            )
+    except Exception:
+        # 导航中/页面关闭：当作没滚
+        stats = {"steps": 0, "ms": 0, "count": 0}
+    if label:
+        print(f"[scroll] {label}: {stats['steps']} steps, {stats['ms']} ms, {stats['count']} cards")
+    return stats
@@ -200,10 +200,213 @@
 
 # sites/seek_adapter.py
 from __future__ import annotations
-from playwright.async_api import Page
-from pathlib import Path
-import re, json
-from typing import Optional
+from playwright.async_api import Page, Response
+import os, re, json, asyncio
+from typing import Container, Optional
+from html.parser import HTMLParser
+
+from sites.scrolling import scroll_until_stable
+from title_filter import TitleFilter, PAGE_FILTER_JS
+from fastpath import embedded_json
+from debug_store import get_debug_store
+
+SEEK_BASE = "https://www.seek.co.nz"
+
+# 抽取模式：batch = 页面端一次 evaluate 抽全部卡片；per-card = 旧版逐卡 IPC
+EXTRACT_MODE = os.getenv("SEEK_EXTRACT_MODE", "batch").strip().lower()
+
+# 数据来源：network = 监听搜索 API 的 JSON 响应（无 payload 时回退 DOM）；dom = 只抓 DOM
+BACKEND = os.getenv("SEEK_BACKEND", "network").strip().lower()
+
+# 搜索 API 的 URL 特征（v4 chalice-search / v5 jobsearch）
+SEARCH_API_RE = re.compile(
+    os.getenv("SEEK_SEARCH_API_RE", r"/api/(?:jobsearch/v\d+|chalice-search/v\d+)/search"),
+    re.I,
+)
+
+# 标题/链接（多兜底）
+TITLE_SELECTORS = [
+    "h3 a",
+    "a[data-automation='jobTitle']",
+    "a[href*='/job/']"  # 兜底
+]
+
+# 公司（多组选择器）
+COMPANY_SELECTORS = [
+    "a[data-automation='jobCompany']",
+    "[data-automation='jobCompany']",
+    "[data-type='company']",
+    "[data-testid='job-company']",
+    "[class*='company'] a",
+    "[class*='company']",
+    "a[href*='company']"
+]
+
+# 地点（多组选择器；用 ~ 允许“公司后续兄弟”而非紧邻）
+LOCATION_SELECTORS = [
+    "span[data-automation='jobLocation']",
+    "[data-testid='job-location']",
+    "[class*='location']",
+    "a[data-automation='jobCompany'] ~ span",
+    "[data-type='location']",
+]
+
+# 页面端：从 a 向上回溯最多 8 层，每层尝试多组选择器（两种模式共用）
+_CARD_FIELDS_JS = """
+function cardFields(el, companySel, locationSel) {
+  // 尽量找“包含这张卡所有字段”的容器
+  const isCard = (n) => {
+    if (!n || n.nodeType !== 1) return false;
+    const ds = n.dataset || {};
+    const cls = n.className || '';
+    return (
+      (ds.testid && String(ds.testid).includes('job-card')) ||
+      (ds.automation && String(ds.automation).toLowerCase().includes('job')) ||
+      (typeof cls === 'string' && (
+         cls.includes('job') || cls.includes('card') ||
+         cls.includes('_1kr') || cls.includes('_1bo7')   // 哈希类名片段
+      ))
+    );
+  };
+
+  // 收集祖先链
+  const ancestors = [];
+  let cur = el;
+  for (let i = 0; i < 8 && cur; i++) {
+    ancestors.push(cur);
+    cur = cur.parentElement;
+  }
+
+  // 选一个“看起来像卡片”的祖先作为主容器；找不到就退化为最接近的 div
+  let container = ancestors.find(isCard);
+  if (!container) container = ancestors.find(n => n && n.tagName === 'DIV') || ancestors[0];
+
+  const trySelectors = (root, sels) => {
+    for (const s of sels) {
+      const node = root.querySelector(s);
+      if (node) {
+        const t = (node.textContent || '').trim();
+        if (t) return t;
+      }
+    }
+    return null;
+  };
+
+  // 先在“容器”里找
+  let company = trySelectors(container, companySel);
+  let location = trySelectors(container, locationSel);
+
+  // 如果还没有，就在祖先链每一层尝试一次
+  if (!company || !location) {
+    for (const anc of ancestors) {
+      if (!company) company = trySelectors(anc, companySel);
+      if (!location) location = trySelectors(anc, locationSel);
+      if (company && location) break;
+    }
+  }
+
+  // 作为兜底：从标题链接自身的描述性属性解析
+  if (!company || !location) {
+    const label = el.getAttribute('aria-label') || el.getAttribute('title') || '';
+    const t = label.trim();
+    if (t) {
+      // "... at COMPANY – LOCATION" 或 "... at COMPANY in LOCATION"
+      const m1 = t.match(/\\bat\\s+(.+?)\\s+[–-]\\s+(.+)$/i);
+      const m2 = t.match(/\\bat\\s+(.+?)\\s+in\\s+(.+)$/i);
+      if (m1) { company = company || m1[1].trim(); location = location || m1[2].trim(); }
+      else if (m2) { company = company || m2[1].trim(); location = location || m2[2].trim(); }
+    }
+  }
+
+  // 导出这张卡片的 outerHTML（若需要调试）
+  const cardHTML =
+    (container && container.outerHTML) ||
+    (ancestors[0] && ancestors[0].outerHTML) || '';
+
+  return { company: company || null, location: location || null, cardHTML };
+}
+"""
+
+# 逐卡模式：对单个 a 调用
+_PER_CARD_JS = (
+    "(el, [companySel, locationSel]) => {\n"
+    + _CARD_FIELDS_JS
+    + "\n  return cardFields(el, companySel, locationSel);\n}"
+)
+
+# 批量模式：一次 evaluate 完成 去重 + 标题过滤 + 回溯 + 选择器 + aria-label 兜底
+# 返回 {rows: [[link, title, company, location, missHTML], ...], dropped}，missHTML 仅在缺字段时非空；
+# 被标题规则排除的卡片读完标题就丢，不做回溯/选择器
+_BATCH_JS = (
+    "([titleSel, companySel, locationSel, base, rules]) => {\n"
+    + _CARD_FIELDS_JS
+    + PAGE_FILTER_JS
+    + """
+  const filter = titleDropper(rules);
+  const seen = new Set();
+  const out = [];
+  for (const sel of titleSel) {
+    for (const a of document.querySelectorAll(sel)) {
+      const href = a.getAttribute('href');
+      if (!href) continue;
+      const link = href.startsWith('http') ? href : base + href;
+      if (seen.has(link)) continue;
+      seen.add(link);
+      const title = a.innerText || '';
+      if (filter.drop(title)) continue;
+      const f = cardFields(a, companySel, locationSel);
+      const miss = !(f.company && f.location);
+      out.push([link, title, f.company, f.location, miss ? f.cardHTML : '']);
+    }
+  }
+  return { rows: out, dropped: filter.dropped };
+}"""
+)
+
+# 两段式（有 seen 索引时）：第一段只读 link/title（顺带丢掉被标题规则排除的）并把 a 暂存在 window 上，
+# Python 侧剔除已入库的 job_id 后，第二段只对剩下的下标做回溯/选择器
+_BATCH_IDS_JS = (
+    "([titleSel, base, rules]) => {\n"
+    + PAGE_FILTER_JS
+    + """
+  const filter = titleDropper(rules);
+  const seen = new Set();
+  const anchors = [];
+  const out = [];
+  for (const sel of titleSel) {
+    for (const a of document.querySelectorAll(sel)) {
+      const href = a.getAttribute('href');
+      if (!href) continue;
+      const link = href.startsWith('http') ? href : base + href;
+      if (seen.has(link)) continue;
+      seen.add(link);
+      const title = a.innerText || '';
+      if (filter.drop(title)) continue;
+      anchors.push(a);
+      out.push([link, title]);
+    }
+  }
+  window.__seekAnchors = anchors;
+  return { rows: out, dropped: filter.dropped };
+}"""
+)
+
+_BATCH_FIELDS_JS = (
+    "([indexes, companySel, locationSel]) => {\n"
+    + _CARD_FIELDS_JS
+    + """
+  const anchors = window.__seekAnchors || [];
+  const out = indexes.map(i => {
+    const a = anchors[i];
+    if (!a) return [null, null, ''];
+    const f = cardFields(a, companySel, locationSel);
+    const miss = !(f.company && f.location);
+    return [f.company, f.location, miss ? f.cardHTML : ''];
+  });
+  window.__seekAnchors = null;
+  return out;
+}"""
+)
 
 def _norm(s: Optional[str]) -> Optional[str]:
     if not s: return None
@@ -214,161 +417,387 @@ def _job_id_from_url(url: str) -> str:
     m = re.search(r"/job/(\d+)", url or "")
     return m.group(1) if m else (url or "")
 
-async def extract_seek_jobs(page: Page):
-    """极端稳健版：对每个标题向上回溯多层祖先搜索 company/location"""
+def _full_link(href: str) -> str:
+    return href if href.startswith("http") else f"{SEEK_BASE}{href}"
+
+def _make_job(link: str, title: Optional[str], company: Optional[str], location: Optional[str]) -> dict:
+    return {
+        "job_id": _job_id_from_url(link),
+        "title": _norm(title) or "Unknown title",
+        "company": _norm(company) or "Unknown",
+        "location": _norm(location) or "Unknown",
+        "link": link
+    }
+
+def _report_skipped(n: int):
+    if n:
+        print(f"[seek] 跳过 {n} 张已入库的卡片")
+
+def _page_rules(title_filter: Optional[TitleFilter]) -> Optional[dict]:
+    return title_filter.page_rules() if title_filter is not None else None
+
+def _record_dropped(title_filter: Optional[TitleFilter], dropped: dict):
+    if title_filter is not None and dropped:
+        title_filter.record_page("seek", dropped)
+
+def _fill_stats(page_stats: Optional[dict], raw: int, known: int, dropped: Optional[dict]):
+    """翻页水位用：本页卡片总数 / 被 seen 跳过的 / 被标题规则丢掉的"""
+    if page_stats is not None:
+        filtered = sum((dropped or {}).values())
+        page_stats.update(raw=raw + filtered, known=known, filtered=filtered)
+
+def _dump_miss(idx: int, card_html: str):
+    # 调试：抓不到字段的卡片按采样率交给调试产物存储（异步压缩落盘）
+    store = get_debug_store()
+    if store.sampled():
+        store.save("miss_card", "seek", card_html or "", card=idx)
+
+async def _scroll_results(page: Page) -> dict:
+    """懒加载：滚到卡片数稳定为止（不再固定 8 步）"""
     await page.wait_for_load_state("domcontentloaded")
-    for _ in range(8):
-        await page.mouse.wheel(0, 1800)
-        await page.wait_for_timeout(700)
-
-    # 标题/链接（多兜底）
-    title_selectors = [
-        "h3 a",
-        "a[data-automation='jobTitle']",
-        "a[href*='/job/']"  # 兜底
-    ]
+    return await scroll_until_stable(page, ", ".join(TITLE_SELECTORS), label="seek")
+
+async def extract_seek_cards_batch(page: Page, seen: Optional[Container[str]] = None,
+                                   title_filter: Optional[TitleFilter] = None,
+                                   page_stats: Optional[dict] = None) -> list[dict]:
+    """
+    page.evaluate 批量抽取全部卡片（不滚动），输出与逐卡模式一致。
+    seen 为已入库的 job_id 集合时分两段：已知卡片读完 link 就跳过，不再做回溯/选择器。
+    title_filter 的排除规则在页面端读到标题时就生效，丢弃数记到 title_filter.page_skipped。
+    page_stats 传入 dict 时填 {raw, known, filtered}（见 _fill_stats）。
+    """
+    jobs = []
+    rules = _page_rules(title_filter)
+    if seen is None:
+        data = await page.evaluate(
+            _BATCH_JS, [TITLE_SELECTORS, COMPANY_SELECTORS, LOCATION_SELECTORS, SEEK_BASE, rules]
+        ) or {}
+        _record_dropped(title_filter, data.get("dropped"))
+        _fill_stats(page_stats, len(data.get("rows") or []), 0, data.get("dropped"))
+        for idx, (link, title, company, location, miss_html) in enumerate(data.get("rows") or [], 1):
+            if miss_html:
+                _dump_miss(idx, miss_html)
+            jobs.append(_make_job(link, title, company, location))
+        return jobs
+
+    data = await page.evaluate(_BATCH_IDS_JS, [TITLE_SELECTORS, SEEK_BASE, rules]) or {}
+    _record_dropped(title_filter, data.get("dropped"))
+    heads = data.get("rows") or []
+    todo = [i for i, (link, _) in enumerate(heads) if _job_id_from_url(link) not in seen]
+    _report_skipped(len(heads) - len(todo))
+    _fill_stats(page_stats, len(heads), len(heads) - len(todo), data.get("dropped"))
+    if not todo:
+        return jobs
+    fields = await page.evaluate(_BATCH_FIELDS_JS, [todo, COMPANY_SELECTORS, LOCATION_SELECTORS])
+    for i, (company, location, miss_html) in zip(todo, fields or []):
+        link, title = heads[i]
+        if miss_html:
+            _dump_miss(i + 1, miss_html)
+        jobs.append(_make_job(link, title, company, location))
+    return jobs
+
+async def extract_seek_cards_per_card(page: Page, seen: Optional[Container[str]] = None,
+                                      title_filter: Optional[TitleFilter] = None,
+                                      page_stats: Optional[dict] = None) -> list[dict]:
+    """旧版逐卡抽取（每张卡 3~4 次 IPC），保留作对照/回退"""
     anchors = []
-    seen = set()
-    for sel in title_selectors:
+    links = set()
+    for sel in TITLE_SELECTORS:
         for a in await page.query_selector_all(sel):
             href = await a.get_attribute("href")
             if not href:
                 continue
-            link = href if href.startswith("http") else f"https://www.seek.co.nz{href}"
-            if link in seen:
+            link = _full_link(href)
+            if link in links:
                 continue
-            seen.add(link)
+            links.add(link)
             anchors.append(a)
 
-    Path("debug_cards").mkdir(exist_ok=True)
-
     jobs = []
-    detail_budget = 4  # 如需打开详情页兜底可调大（此版先不启用详情页）
-
+    skipped = 0
+    dropped: dict[str, int] = {}
     for idx, a in enumerate(anchors, 1):
-        href = await a.get_attribute("href")
-        link = href if href.startswith("http") else f"https://www.seek.co.nz{href}"
-        title = _norm(await a.inner_text()) or "Unknown title"
-        jid = _job_id_from_url(link)
-
-        # 在页面端执行：从 a 向上回溯最多 8 层，每层尝试多组选择器
-        data = await a.evaluate("""
-        (el) => {
-          // 尽量找“包含这张卡所有字段”的容器
-          const isCard = (n) => {
-            if (!n || n.nodeType !== 1) return false;
-            const ds = n.dataset || {};
-            const cls = n.className || '';
-            return (
-              (ds.testid && String(ds.testid).includes('job-card')) ||
-              (ds.automation && String(ds.automation).toLowerCase().includes('job')) ||
-              (typeof cls === 'string' && (
-                 cls.includes('job') || cls.includes('card') ||
-                 cls.includes('_1kr') || cls.includes('_1bo7')   // 哈希类名片段
-              ))
-            );
-          };
-
-          // 收集祖先链
-          const ancestors = [];
-          let cur = el;
-          for (let i = 0; i < 8 && cur; i++) {
-            ancestors.push(cur);
-            cur = cur.parentElement;
-          }
-
-          // 选一个“看起来像卡片”的祖先作为主容器；找不到就退化为最接近的 div
-          let container = ancestors.find(isCard);
-          if (!container) container = ancestors.find(n => n && n.tagName === 'DIV') || ancestors[0];
-
-          const trySelectors = (root, sels) => {
-            for (const s of sels) {
-              const node = root.querySelector(s);
-              if (node) {
-                const t = (node.textContent || '').trim();
-                if (t) return t;
-              }
-            }
-            return null;
-          };
-
-          // 公司（多组选择器）
-          const companySel = [
-            "a[data-automation='jobCompany']",
-            "[data-automation='jobCompany']",
-            "[data-type='company']",
-            "[data-testid='job-company']",
-            "[class*='company'] a",
-            "[class*='company']",
-            "a[href*='company']"
-          ];
-
-          // 地点（多组选择器；用 ~ 允许“公司后续兄弟”而非紧邻）
-          const locationSel = [
-            "span[data-automation='jobLocation']",
-            "[data-testid='job-location']",
-            "[class*='location']",
-            "a[data-automation='jobCompany'] ~ span",
-            "[data-type='location']",
-          ];
-
-          // 先在“容器”里找
-          let company = trySelectors(container, companySel);
-          let location = trySelectors(container, locationSel);
-
-          // 如果还没有，就在祖先链每一层尝试一次
-          if (!company || !location) {
-            for (const anc of ancestors) {
-              if (!company) company = trySelectors(anc, companySel);
-              if (!location) location = trySelectors(anc, locationSel);
-              if (company && location) break;
-            }
-          }
-
-          // 作为兜底：从标题链接自身的描述性属性解析
-          if (!company || !location) {
-            const label = el.getAttribute('aria-label') || el.getAttribute('title') || '';
-            const t = label.trim();
-            if (t) {
-              // "... at COMPANY – LOCATION" 或 "... at COMPANY in LOCATION"
-              const m1 = t.match(/\bat\s+(.+?)\s+[–-]\s+(.+)$/i);
-              const m2 = t.match(/\bat\s+(.+?)\s+in\s+(.+)$/i);
-              if (!company || !location) {
-                if (m1) { company = company || m1[1].trim(); location = location || m1[2].trim(); }
-                else if (m2) { company = company || m2[1].trim(); location = location || m2[2].trim(); }
-              }
-            }
-          }
-
-          // 导出这张卡片的 outerHTML（若需要调试）
-          const cardHTML =
-            (container && container.outerHTML) ||
-            (ancestors[0] && ancestors[0].outerHTML) || '';
-
-          return {
-            company: company || null,
-            location: location || null,
-            cardHTML,
-          };
-        }
-        """)
-
-        company = _norm(data.get("company"))
-        location = _norm(data.get("location"))
-
-        # 调试：抓不到就把卡片落地
-        if not company or not location:
-            try:
-                Path(f"debug_cards/miss_{idx}.html").write_text(data.get("cardHTML",""), encoding="utf-8")
-            except Exception:
-                pass
-
-        jobs.append({
-            "job_id": jid,
-            "title": title,
-            "company": company or "Unknown",
-            "location": location or "Unknown",
-            "link": link
-        })
+        link = _full_link(await a.get_attribute("href"))
+        if seen is not None and _job_id_from_url(link) in seen:
+            skipped += 1
+            continue
+        title = await a.inner_text()
+        if title_filter is not None:
+            reason = title_filter.drop_reason(title)
+            if reason is not None:
+                dropped[reason] = dropped.get(reason, 0) + 1
+                continue
+        data = await a.evaluate(_PER_CARD_JS, [COMPANY_SELECTORS, LOCATION_SELECTORS])
+        job = _make_job(link, title, data.get("company"), data.get("location"))
+        if not _norm(data.get("company")) or not _norm(data.get("location")):
+            _dump_miss(idx, data.get("cardHTML", ""))
+        jobs.append(job)
 
+    _report_skipped(skipped)
+    _record_dropped(title_filter, dropped)
+    _fill_stats(page_stats, len(anchors) - sum(dropped.values()), skipped, dropped)
     return jobs
+
+# ---------- 网络拦截：直接读搜索 API 的 JSON ----------
+def _first_str(*vals) -> Optional[str]:
+    for v in vals:
+        if isinstance(v, (str, int)) and str(v).strip():
+            return str(v)
+    return None
+
+def _job_from_search_item(item: dict) -> Optional[dict]:
+    """把搜索 API 的一条 data[] 记录转成与 DOM 抽取一致的 dict（额外带 listed_at）"""
+    if not isinstance(item, dict):
+        return None
+    jid = _first_str(item.get("id"), item.get("jobId"))
+    if not jid:
+        return None
+
+    advertiser = item.get("advertiser") or {}
+    company = _first_str(
+        item.get("companyName"),
+        advertiser.get("description") if isinstance(advertiser, dict) else None,
+        advertiser.get("name") if isinstance(advertiser, dict) else None,
+    )
+
+    location = None
+    locs = item.get("locations")
+    if isinstance(locs, list) and locs and isinstance(locs[0], dict):
+        location = _first_str(locs[0].get("label"), locs[0].get("description"))
+    if not location:
+        jl = item.get("jobLocation")
+        if isinstance(jl, dict):
+            location = _first_str(jl.get("label"), jl.get("displayText"))
+    if not location:
+        # v4：location / area / suburb 分散在几个字段
+        parts = [_first_str(item.get(k)) for k in ("suburb", "area", "location")]
+        location = ", ".join(dict.fromkeys(p for p in parts if p)) or None
+
+    job = _make_job(f"{SEEK_BASE}/job/{jid}", item.get("title"), company, location)
+    job["job_id"] = jid
+    job["listed_at"] = _first_str(item.get("listingDate"), item.get("listingDateDisplay"))
+    return job
+
+def parse_search_payload(payload) -> list[dict]:
+    """解析一份搜索 API 响应体：{"data": [...]}"""
+    items = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return []
+    return [j for j in (_job_from_search_item(it) for it in items) if j]
+
+# 结果已在 DOM 里：有职位卡片，或服务端渲染的状态已注入（首屏 SSR 页不会再发搜索 XHR）
+_RESULTS_READY_JS = """
+(sel) => !!(document.querySelector(sel)
+  || window.SEEK_REDUX_DATA || window.SEEK_APOLLO_DATA
+  || document.getElementById('__NEXT_DATA__'))
+"""
+RESULTS_READY_SEL = "a[data-automation='jobTitle'], article a[href*='/job/']"
+
+class SeekSearchCollector:
+    """
+    在 page.goto 之前挂上，收集 SEEK 搜索 API 的 JSON 响应。
+    用 Playwright 的 response 事件，不改请求本身。
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.payloads: list = []
+        self._got = asyncio.Event()
+        page.on("response", self._on_response)
+
+    async def _on_response(self, resp: Response):
+        if not SEARCH_API_RE.search(resp.url or ""):
+            return
+        try:
+            if "json" not in (resp.headers.get("content-type") or "") or not resp.ok:
+                return
+            self.payloads.append(await resp.json())
+            self._got.set()
+        except Exception:
+            # 导航/页面关闭时读 body 会失败，忽略即可
+            pass
+
+    async def wait(self, timeout_ms: int = 8000, dom_ready: bool = True) -> bool:
+        """
+        等到至少一份 payload；dom_ready=True 时结果卡片 / SSR 状态先出现在 DOM 里也结束等待
+        （SSR 首屏不发 XHR，不能干等满 timeout）。返回是否拿到了 payload。
+        """
+        waiters = [asyncio.ensure_future(self._got.wait())]
+        if dom_ready:
+            waiters.append(asyncio.ensure_future(
+                self.page.wait_for_function(_RESULTS_READY_JS, arg=RESULTS_READY_SEL, timeout=timeout_ms)
+            ))
+        done, pending = await asyncio.wait(waiters, timeout=timeout_ms / 1000,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        for t in pending:
+            t.cancel()
+        for t in done:
+            t.exception()  # 取走异常（导航中/超时），不让它变成“未处理”警告
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return bool(self.payloads)
+
+    def jobs(self) -> list[dict]:
+        jobs, seen = [], set()
+        for payload in self.payloads:
+            for j in parse_search_payload(payload):
+                if j["job_id"] in seen:
+                    continue
+                seen.add(j["job_id"])
+                jobs.append(j)
+        return jobs
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+def attach_seek_search_collector(page: Page) -> Optional[SeekSearchCollector]:
+    """BACKEND=network 时返回收集器；dom 模式返回 None"""
+    return SeekSearchCollector(page) if BACKEND == "network" else None
+
+async def extract_seek_jobs(page: Page, mode: Optional[str] = None,
+                            collector: Optional[SeekSearchCollector] = None,
+                            seen: Optional[Container[str]] = None,
+                            title_filter: Optional[TitleFilter] = None,
+                            page_stats: Optional[dict] = None):
+    """
+    极端稳健版：对每个标题向上回溯多层祖先搜索 company/location。
+    seen：已入库的 job_id 集合；命中的卡片读到 id 就跳过，不返回。
+    title_filter：标题命中排除规则的卡片读到标题就跳过，不返回。
+    page_stats：传入 dict 时填本页 {raw, known, filtered}，供翻页水位判断。
+    """
+    # 网络模式：拿到搜索 JSON 就不用滚动/抓 DOM 了
+    if collector is not None and collector.payloads:
+        jobs = collector.jobs()
+        if jobs:
+            raw = len(jobs)
+            if seen is not None:
+                fresh = [j for j in jobs if j["job_id"] not in seen]
+                _report_skipped(len(jobs) - len(fresh))
+                jobs = fresh
+            known = raw - len(jobs)
+            dropped: dict[str, int] = {}
+            if title_filter is not None:
+                kept = []
+                for j in jobs:
+                    reason = title_filter.drop_reason(j["title"])
+                    if reason is None:
+                        kept.append(j)
+                    else:
+                        dropped[reason] = dropped.get(reason, 0) + 1
+                _record_dropped(title_filter, dropped)
+                jobs = kept
+            _fill_stats(page_stats, raw - sum(dropped.values()), known, dropped)
+            return jobs
+
+    await _scroll_results(page)
+    if (mode or EXTRACT_MODE) == "per-card":
+        return await extract_seek_cards_per_card(page, seen=seen, title_filter=title_filter, page_stats=page_stats)
+    return await extract_seek_cards_batch(page, seen=seen, title_filter=title_filter, page_stats=page_stats)
+
+# ---------- HTTP 快速通道：直接解析服务端渲染的结果页 ----------
+# 结果页里内嵌的状态 JSON（按顺序尝试）
+SSR_MARKERS = ["window.SEEK_REDUX_DATA", "window.SEEK_APOLLO_DATA", 'id="__NEXT_DATA__"']
+NO_RESULTS_MARKERS = ("no matching search results", "searchresults-noresults", "no-results")
+
+def _find_job_items(obj, depth: int = 0) -> Optional[list]:
+    """在内嵌 JSON 里找第一个“像职位列表”的数组（元素带 id + title）"""
+    if depth > 12:
+        return None
+    if isinstance(obj, list):
+        dicts = [x for x in obj if isinstance(x, dict)]
+        if dicts and all(("id" in x or "jobId" in x) and "title" in x for x in dicts[:5]):
+            return dicts
+        items = obj
+    elif isinstance(obj, dict):
+        items = obj.values()
+    else:
+        return None
+    for v in items:
+        if isinstance(v, (dict, list)):
+            found = _find_job_items(v, depth + 1)
+            if found:
+                return found
+    return None
+
+class _SeekCardParser(HTMLParser):
+    """兜底：按 data-automation 读卡片（jobTitle 链接 / jobCompany / jobLocation）"""
+    FIELDS = {"jobTitle": "title", "jobCompany": "company", "jobLocation": "location"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards: list[dict] = []
+        self._field: Optional[str] = None
+        self._tag: Optional[str] = None
+        self._depth = 0
+        self._buf: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._field is not None:
+            if tag == self._tag:
+                self._depth += 1
+            return
+        a = dict(attrs)
+        if tag == "article" or a.get("data-testid") == "job-card":
+            self.cards.append({})
+        field = self.FIELDS.get(a.get("data-automation") or "")
+        if not field:
+            return
+        if field == "title":
+            href = a.get("href") or ""
+            if "/job/" not in href:
+                return
+            # 同一个 article 里第一个标题链接归这张卡；否则开新卡
+            if self.cards and "link" not in self.cards[-1]:
+                self.cards[-1]["link"] = _full_link(href)
+            else:
+                self.cards.append({"link": _full_link(href)})
+        elif not self.cards:
+            return
+        self._field, self._tag, self._depth, self._buf = field, tag, 0, []
+
+    def handle_endtag(self, tag):
+        if self._field is None or tag != self._tag:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+        card = self.cards[-1]
+        card.setdefault(self._field, " ".join("".join(self._buf).split()))
+        self._field = None
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._buf.append(data)
+
+def parse_seek_search_html(text: str) -> Optional[list[dict]]:
+    """
+    解析服务端渲染的 SEEK 结果页：优先内嵌状态 JSON，其次按卡片标记解析 HTML。
+    明确“没有结果”时返回 []；既没数据也没有无结果标记（页面改版/被拦）返回 None。
+    """
+    for marker in SSR_MARKERS:
+        items = _find_job_items(embedded_json(text, marker))
+        if items:
+            jobs = [j for j in (_job_from_search_item(it) for it in items) if j]
+            if jobs:
+                return jobs
+
+    parser = _SeekCardParser()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:
+        pass
+    jobs, links = [], set()
+    for c in parser.cards:
+        link = c.get("link")
+        if not link or link in links:
+            continue
+        links.add(link)
+        jobs.append(_make_job(link, c.get("title"), c.get("company"), c.get("location")))
+    if jobs:
+        return jobs
+    lc = text.lower()
+    return [] if any(m in lc for m in NO_RESULTS_MARKERS) else None
@@ -0,0 +1,82 @@
+# tests/test_dedup.py
+"""跨站点近重复识别：内存库 + 正式 schema，走 link_new 的真实 SQL。"""
+import sqlite3
+import time
+
+import pytest
+
+import dedup
+from db import init_schema
+
+
+@pytest.fixture
+def cur():
+    conn = sqlite3.connect(":memory:")
+    init_schema(conn)
+    yield conn.cursor()
+    conn.close()
+
+
+def _insert(cur, source: str, job: dict) -> int:
+    cur.execute(
+        "INSERT INTO jobs(job_id, title, company, location, source, link, seen_ts) VALUES(?,?,?,?,?,?,?)",
+        (job["job_id"], job["title"], job["company"], job["location"], source, "https://x/" + job["job_id"],
+         int(time.time())),
+    )
+    return cur.lastrowid
+
+
+def _add(cur, source: str, **job) -> tuple[int, dict]:
+    rowid = _insert(cur, source, job)
+    return rowid, dedup.link_new(cur, source, [(rowid, job)])
+
+
+def test_cross_posted_job_links_to_canonical(cur):
+    seek_rowid, dups = _add(cur, "seek", job_id="s1", title="Junior Software Developer",
+                            company="Acme Ltd", location="Auckland CBD, Auckland")
+    assert dups == {}
+    li_rowid, dups = _add(cur, "linkedin", job_id="l1", title="Junior Software Developer (Graduate)",
+                          company="Acme Limited", location="Auckland, New Zealand")
+    assert dups == {"l1": seek_rowid}
+    assert cur.execute("SELECT canonical_rowid FROM jobs WHERE rowid=?", (li_rowid,)).fetchone() == (seek_rowid,)
+
+
+def test_different_title_is_not_linked(cur):
+    _add(cur, "seek", job_id="s1", title="Junior Software Developer", company="Acme Ltd", location="Auckland")
+    _, dups = _add(cur, "linkedin", job_id="l1", title="Senior Payroll Administrator",
+                   company="Acme Ltd", location="Auckland")
+    assert dups == {}
+
+
+def test_same_title_different_location_is_not_linked(cur):
+    _add(cur, "seek", job_id="s1", title="Junior Software Developer", company="Acme Ltd", location="Auckland")
+    _, dups = _add(cur, "linkedin", job_id="l1", title="Junior Software Developer",
+                   company="Acme Ltd", location="Christchurch, Canterbury")
+    assert dups == {}
+
+
+def test_same_site_is_never_linked(cur):
+    _add(cur, "seek", job_id="s1", title="Junior Software Developer", company="Acme Ltd", location="Auckland")
+    _, dups = _add(cur, "seek", job_id="s2", title="Junior Software Developer", company="Acme Ltd",
+                   location="Auckland")
+    assert dups == {}
+
+
+def test_unknown_company_is_not_fingerprinted(cur):
+    _add(cur, "seek", job_id="s1", title="Junior Software Developer", company="Unknown", location="Auckland")
+    rowid, dups = _add(cur, "linkedin", job_id="l1", title="Junior Software Developer",
+                       company="Unknown", location="Auckland")
+    assert dups == {}
+    assert cur.execute("SELECT COUNT(*) FROM job_fingerprints").fetchone() == (0,)
+    assert cur.execute("SELECT COUNT(*) FROM job_fp_bands").fetchone() == (0,)
+
+
+def test_relink_after_company_is_filled_in(cur):
+    seek_rowid, _ = _add(cur, "seek", job_id="s1", title="Junior Software Developer",
+                         company="Acme Ltd", location="Auckland")
+    li_rowid, dups = _add(cur, "linkedin", job_id="l1", title="Junior Software Developer",
+                          company="Unknown", location="Auckland")
+    assert dups == {}
+    dups = dedup.relink(cur, "linkedin", [(li_rowid, {"job_id": "l1", "title": "Junior Software Developer",
+                                                      "company": "Acme Ltd", "location": "Auckland"})])
+    assert dups == {"l1": seek_rowid}
@@ -0,0 +1,132 @@
+# tests/test_enrich.py
+"""详情页补全：JSON-LD JobPosting 解析，以及没有可用数据时的 miss 缓存（浏览器路径记，HTTP 路径不记）。"""
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from db import get_db, init_schema
+from enrich import DetailEnricher, parse_job_posting
+from fastpath import HttpFetcher, ld_json_blocks
+
+FIXTURE = Path(__file__).resolve().parent.parent / "bench" / "fixtures" / "seek_job_detail.html"
+
+
+def test_parse_job_posting_fixture():
+    details = parse_job_posting(ld_json_blocks(FIXTURE.read_text(encoding="utf-8")))
+    assert details == {
+        "company": "Halter",
+        "location": "Auckland CBD, Auckland, New Zealand",
+        "description": "Join our platform team.\nPython & Go\nKubernetes",
+        "date_posted": "2026-10-17T21:04:11Z",
+    }
+
+
+def test_parse_job_posting_variants():
+    bad = "{not json"
+    as_list = json.dumps([{"@type": ["Thing", "JobPosting"], "hiringOrganization": "Acme Ltd",
+                           "jobLocation": [{"address": "Wellington"}]}])
+    assert parse_job_posting([bad, as_list]) == {
+        "company": "Acme Ltd", "location": "Wellington", "description": None, "date_posted": None,
+    }
+
+
+@pytest.mark.parametrize("blocks", [[], ["{not json"], [json.dumps({"@type": "Organization", "name": "Acme"})]])
+def test_parse_job_posting_without_posting_is_none(blocks):
+    assert parse_job_posting(blocks) is None
+
+
+# ---------- miss 缓存 ----------
+@pytest.fixture
+def database(tmp_path):
+    db = get_db(str(tmp_path / "jobs.sqlite3"))
+    with db.write() as conn:
+        init_schema(conn)
+    yield db
+    db.close()
+
+
+def _status(db, job_id):
+    with db.read() as conn:
+        row = conn.execute("SELECT status FROM job_details WHERE job_id=?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+
+class _FakePage:
+    def __init__(self, data):
+        self.data = data
+
+    async def goto(self, url, **kw):
+        pass
+
+    async def evaluate(self, js, arg=None):
+        return self.data
+
+    async def close(self):
+        pass
+
+
+class _FakeContext:
+    def __init__(self, data):
+        self.data = data
+        self.pages = 0
+
+    async def new_page(self):
+        self.pages += 1
+        return _FakePage(self.data)
+
+
+class _FakeFetcher(HttpFetcher):
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def aget(self, url, **headers):
+        self.calls += 1
+        return 200, url, self.text
+
+
+def _job(job_id="81234567"):
+    return {"job_id": job_id, "title": "Graduate Software Developer", "company": "Unknown",
+            "location": "Unknown", "link": f"https://www.seek.co.nz/job/{job_id}"}
+
+
+def test_browser_page_without_data_is_cached_as_miss(database):
+    enricher = DetailEnricher(database)
+    ctx = _FakeContext({"ld": [], "company": None, "location": None})
+    job = _job()
+    assert asyncio.run(enricher.enrich(ctx, "seek", [job])) == 0
+    assert _status(database, job["job_id"]) == "miss"
+    assert enricher.take_stats()["miss"] == 1
+    # 下一轮命中缓存，不再开页
+    assert asyncio.run(enricher.enrich(ctx, "seek", [_job()])) == 0
+    assert ctx.pages == 1 and enricher.take_stats()["cached"] == 1
+
+
+def test_browser_page_with_json_ld_fills_job(database):
+    enricher = DetailEnricher(database)
+    ld = ld_json_blocks(FIXTURE.read_text(encoding="utf-8"))
+    job = _job()
+    assert asyncio.run(enricher.enrich(_FakeContext({"ld": ld}), "seek", [job])) == 1
+    assert (job["company"], job["location"]) == ("Halter", "Auckland CBD, Auckland, New Zealand")
+    assert _status(database, job["job_id"]) == "ok"
+
+
+def test_http_page_without_json_ld_is_not_cached(database):
+    enricher = DetailEnricher(database)
+    fetcher = _FakeFetcher("<html><body>client-rendered shell</body></html>")
+    assert asyncio.run(enricher.enrich(fetcher, "seek", [_job()])) == 0
+    assert _status(database, "81234567") is None        # 留给浏览器路径
+    assert enricher.take_stats()["miss"] == 1
+    asyncio.run(enricher.enrich(fetcher, "seek", [_job()]))
+    assert fetcher.calls == 1                           # HTTP 路径不再为它花预算
+
+
+def test_http_page_with_captcha_and_no_data_is_a_block(database):
+    enricher = DetailEnricher(database)
+    fetcher = _FakeFetcher('<html><div class="g-recaptcha"></div></html>')
+    asyncio.run(enricher.enrich(fetcher, "seek", [_job()]))
+    stats = enricher.take_stats()
+    assert stats["error"] == 1 and stats["miss"] == 0
+    assert _status(database, "81234567") is None
@@ -0,0 +1,120 @@
+# tests/test_exporter.py
+"""JSONL 导出流：按大小/行数切段、清单只指向完整文件、read_jobs 读回原样。"""
+import gzip
+import json
+
+import pytest
+
+import exporter
+from exporter import JsonlExporter, read_jobs
+
+
+def _jobs(start: int, n: int) -> list[dict]:
+    return [{"job_id": f"j{i}", "title": f"Junior Developer {i}", "company": "Acme",
+             "location": "Auckland", "link": f"https://x/{i}"} for i in range(start, start + n)]
+
+
+def _manifest(root) -> dict:
+    return json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+
+
+def _assert_manifest_files_complete(root):
+    segs = _manifest(root)["segments"]
+    for seg in segs:
+        path = root / seg["file"]
+        assert path.exists(), seg
+        if seg["closed"]:
+            assert path.suffix == ".gz"
+            with gzip.open(path, "rt", encoding="utf-8") as f:  # 截断的 gzip 在这里会报错
+                lines = f.read().splitlines()
+        else:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == seg["rows"]
+    assert not list(root.glob("*.tmp"))
+    # 只有最后一段可以是开着的
+    assert all(s["closed"] for s in segs[:-1])
+
+
+def test_rotates_on_row_limit(tmp_path):
+    ex = JsonlExporter(tmp_path, rotate_seconds=0, rotate_bytes=0, rotate_rows=5)
+    for k in range(4):
+        ex.write("seek", _jobs(k * 3, 3))
+    ex.close()
+    segs = _manifest(tmp_path)["segments"]
+    # 满 5 行后的下一批开新段：3+3 | 3+3
+    assert [s["rows"] for s in segs] == [6, 6]
+    assert [s["closed"] for s in segs] == [True, False]
+    assert segs[0]["file"].endswith(".jsonl.gz") and segs[1]["file"].endswith(".jsonl")
+    _assert_manifest_files_complete(tmp_path)
+
+
+def test_rotates_on_size_limit(tmp_path):
+    ex = JsonlExporter(tmp_path, rotate_seconds=0, rotate_bytes=500, rotate_rows=0)
+    for k in range(10):
+        ex.write("linkedin", _jobs(k * 2, 2))
+    ex.close()
+    segs = _manifest(tmp_path)["segments"]
+    assert len(segs) > 1
+    assert all(s["bytes"] >= 500 for s in segs[:-1])
+    assert sum(s["rows"] for s in segs) == 20
+    _assert_manifest_files_complete(tmp_path)
+
+
+def test_rotates_on_age(tmp_path, monkeypatch):
+    clock = [1_700_000_000]
+    monkeypatch.setattr(exporter.time, "time", lambda: clock[0])
+    ex = JsonlExporter(tmp_path, rotate_seconds=3600, rotate_bytes=0)
+    ex.write("seek", _jobs(0, 1))
+    clock[0] += 3599
+    ex.write("seek", _jobs(1, 1))
+    clock[0] += 1
+    ex.write("seek", _jobs(2, 1))
+    ex.close()
+    assert [s["rows"] for s in _manifest(tmp_path)["segments"]] == [2, 1]
+
+
+def test_crash_during_compression_keeps_manifest_on_the_plain_segment(tmp_path, monkeypatch):
+    ex = JsonlExporter(tmp_path, rotate_seconds=0, rotate_bytes=0, rotate_rows=2)
+    ex.write("seek", _jobs(0, 2))
+
+    def boom(*a, **kw):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(exporter.shutil, "copyfileobj", boom)
+    with pytest.raises(OSError):
+        ex.write("seek", _jobs(2, 2))
+    seg = _manifest(tmp_path)["segments"][0]
+    assert seg["closed"] is False and seg["file"].endswith(".jsonl")
+    assert [r["job_id"] for r in read_jobs(tmp_path)] == ["j0", "j1"]
+
+
+def test_read_jobs_round_trip(tmp_path):
+    ex = JsonlExporter(tmp_path, rotate_seconds=0, rotate_bytes=0, rotate_rows=4)
+    written = []
+    for k, source in enumerate(["seek", "linkedin", "seek", "linkedin"]):
+        batch = _jobs(k * 3, 3)
+        batch[0]["title"] = "Développeur — “quoted” ✓"  # 非 ASCII 原样保留
+        ex.write(source, batch)
+        written += [(source, j) for j in batch]
+    ex.rotate()
+    ex.close()
+
+    got = list(read_jobs(tmp_path))
+    assert len(got) == len(written)
+    for rec, (source, job) in zip(got, written):
+        assert rec["source"] == source
+        assert {k: rec[k] for k in job} == job
+        assert rec["seen_ts"] and rec["seen_at"]
+    assert all(s["closed"] for s in _manifest(tmp_path)["segments"])
+
+
+def test_read_jobs_by_time_range(tmp_path, monkeypatch):
+    clock = [1_700_000_000]
+    monkeypatch.setattr(exporter.time, "time", lambda: clock[0])
+    ex = JsonlExporter(tmp_path, rotate_seconds=0, rotate_bytes=0, rotate_rows=1)
+    for i in range(5):
+        ex.write("seek", _jobs(i, 1))
+        clock[0] += 100
+    ex.close()
+    got = [r["job_id"] for r in read_jobs(tmp_path, since_ts=1_700_000_100, until_ts=1_700_000_300)]
+    assert got == ["j1", "j2", "j3"]
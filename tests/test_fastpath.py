@@ -0,0 +1,93 @@
+# tests/test_fastpath.py
+"""HTTP 快速通道（离线）：被拦判定（含只在空结果时才算的软特征）、LinkedIn guest 卡片解析、_http_page 的回退。"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import main
+from fastpath import detect_block
+from sites.linkedin_adapter import linkedin_guest_url, parse_linkedin_guest_html
+from sites.seek_adapter import parse_seek_search_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "bench" / "fixtures"
+SEEK_PAGE = (FIXTURES / "seek_search.html").read_text(encoding="utf-8")
+CF_SCRIPT = '<script src="/cdn-cgi/challenge-platform/scripts/jsd/main.js"></script>'
+RECAPTCHA = '<div class="g-recaptcha" data-sitekey="x"></div>'
+NO_RESULTS = '<div data-automation="searchResults-noResults">No matching search results</div>'
+
+
+# ---------- detect_block ----------
+@pytest.mark.parametrize("status", [401, 403, 429, 503, 999])
+def test_block_statuses(status):
+    assert detect_block(status, "https://www.seek.co.nz/jobs", "") == f"HTTP {status}"
+
+
+def test_network_error_and_login_redirect():
+    assert detect_block(None, "", "") == "network error"
+    assert detect_block(200, "https://www.linkedin.com/authwall?trk=x", "").startswith("redirected to")
+
+
+def test_hard_marker_blocks_regardless():
+    assert detect_block(200, "https://x", "<title>Just a moment...</title><div id=cf-challenge>") is not None
+
+
+@pytest.mark.parametrize("marker", [CF_SCRIPT, RECAPTCHA, '<div class="h-captcha"></div>'])
+def test_soft_marker_only_with_empty_results(marker):
+    page = SEEK_PAGE.replace("</head>", marker + "</head>")  # 只扫前 20000 字符，挂件放页头
+    assert detect_block(200, "https://www.seek.co.nz/jobs", page) is None
+    assert detect_block(200, "https://www.seek.co.nz/jobs", page, empty=True) is not None
+
+
+# ---------- LinkedIn guest 卡片 ----------
+def test_guest_parser_fixture():
+    jobs = parse_linkedin_guest_html((FIXTURES / "linkedin_guest.html").read_text(encoding="utf-8"))
+    assert jobs == [
+        {"job_id": "4012345601", "title": "Graduate Software Developer", "company": "Halter",
+         "location": "Auckland, Auckland, New Zealand",
+         "link": "https://nz.linkedin.com/jobs/view/graduate-software-developer-at-halter-4012345601"},
+        {"job_id": "4012345602", "title": "Junior QA Tester", "company": "One New Zealand",
+         "location": "Wellington, Wellington, New Zealand",
+         "link": "https://nz.linkedin.com/jobs/view/junior-qa-tester-4012345602"},
+        {"job_id": "4012345603", "title": "Support Engineer", "company": "Datacom", "location": "Unknown",
+         "link": "https://nz.linkedin.com/jobs/view/support-engineer-4012345603"},
+        {"job_id": "4012345605", "title": "Data Analyst", "company": "Kiwibank", "location": "Auckland",
+         "link": "https://www.linkedin.com/jobs/view/data-analyst-4012345605"},
+    ]
+
+
+def test_guest_parser_end_of_results_vs_unrecognised():
+    assert parse_linkedin_guest_html("") == []
+    assert parse_linkedin_guest_html("  \n ") == []
+    assert parse_linkedin_guest_html("<html><body>Sign in to continue</body></html>") is None
+
+
+def test_guest_url_keeps_filters_and_sets_start():
+    url = linkedin_guest_url("https://www.linkedin.com/jobs/search/?keywords=graduate&location=New%20Zealand&f_TPR=r86400", 50)
+    assert "keywords=graduate" in url and "f_TPR=r86400" in url and url.endswith("start=50")
+
+
+# ---------- _http_page ----------
+class _Http:
+    def __init__(self, status, text, url="https://www.seek.co.nz/jobs"):
+        self.resp = (status, url, text)
+
+    async def aget(self, url, **headers):
+        return self.resp
+
+
+@pytest.mark.parametrize("text, expected", [
+    (SEEK_PAGE.replace("</head>", CF_SCRIPT + RECAPTCHA + "</head>"), 40),  # 有结果：软特征不算被拦
+    (NO_RESULTS, 0),                                                        # 真的没结果
+    (NO_RESULTS + CF_SCRIPT, None),                                         # 空结果 + 挑战脚本：回退浏览器
+    ("<html>" + RECAPTCHA + "</html>", None),                               # 认不出页面
+])
+def test_http_page_soft_markers(monkeypatch, text, expected):
+    monkeypatch.setattr(main, "get_http", lambda: _Http(200, text))
+    batch = asyncio.run(main._http_page("seek", "https://www.seek.co.nz/jobs", parse_seek_search_html))
+    assert (None if batch is None else len(batch)) == expected
+
+
+def test_http_page_block_status(monkeypatch):
+    monkeypatch.setattr(main, "get_http", lambda: _Http(503, SEEK_PAGE))
+    assert asyncio.run(main._http_page("seek", "https://www.seek.co.nz/jobs", parse_seek_search_html)) is None
@@ -0,0 +1,112 @@
+# tests/test_notifier.py
+"""通知器对着进程内的 Telegram 桩服务器跑：全部送达、遵守 retry_after、失败的留在发件箱重发。"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+import outbox
+from db import get_db, init_schema
+from notifier import TelegramNotifier
+from outbox import OutboxDispatcher
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bench"))
+
+import telegram_stub_server  # noqa: E402
+
+
+@pytest.fixture
+def stub(request):
+    every_429, retry_after = getattr(request, "param", (0, 1))
+    srv, state = telegram_stub_server.start_server(every_429=every_429, retry_after=retry_after, latency_ms=0)
+    yield f"http://127.0.0.1:{srv.server_address[1]}", state
+    srv.shutdown()
+    srv.server_close()
+
+
+async def _send_all(notifier: TelegramNotifier, texts: list[str]) -> list[bool]:
+    results: list[bool] = []
+    notifier.start()
+    for t in texts:
+        notifier.submit(t, on_done=results.append)
+    await notifier.drain()
+    await notifier.close()
+    return results
+
+
+@pytest.mark.parametrize("stub", [(4, 1)], indirect=True)
+def test_every_message_delivered_in_order_despite_429(stub):
+    base, state = stub
+    notifier = TelegramNotifier(token="T", chat_id="1", api_base=base)
+    texts = [f"job {i}" for i in range(6)]
+    results = asyncio.run(_send_all(notifier, texts))
+    assert results == [True] * 6
+    assert notifier.sent == 6 and notifier.failed == 0
+    assert state["messages"] == texts          # 单 worker：被限流的那条重试后顺序不变
+    assert state["throttled"] == state["requests"] - 6 == 1
+
+
+@pytest.mark.parametrize("stub", [(2, 1)], indirect=True)
+def test_retry_after_is_honoured(stub):
+    base, state = stub
+    notifier = TelegramNotifier(token="T", chat_id="1", api_base=base)
+    assert asyncio.run(_send_all(notifier, ["a", "b"])) == [True, True]
+    # 请求 2 被 429（retry_after=1），请求 3 是它的重试
+    assert state["requests"] == 3 and state["throttled"] == 1
+    assert state["times"][2] - state["times"][1] >= 1.0
+
+
+def test_keep_alive_connection_reused(stub):
+    base, state = stub
+    notifier = TelegramNotifier(token="T", chat_id="1", api_base=base)
+    asyncio.run(_send_all(notifier, [f"m{i}" for i in range(5)]))
+    assert notifier.sent == 5
+    assert len(state["peers"]) == 1  # 5 条消息一个 TCP 连接
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = get_db(str(tmp_path / "outbox.sqlite3"))
+    with database.write() as conn:
+        init_schema(conn)
+        outbox.enqueue(conn.cursor(), "seek", [
+            {"job_id": f"j{i}", "title": f"Job {i}", "company": "Acme", "location": "Auckland",
+             "link": f"https://x/{i}"} for i in range(3)
+        ])
+        conn.commit()
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("stub", [(1, 0)], indirect=True)  # 每个请求都 429
+def test_failed_delivery_stays_in_outbox_and_is_resent(stub, db):
+    base, _ = stub
+    failing = TelegramNotifier(token="T", chat_id="1", api_base=base, max_retries=1)
+    dispatcher = OutboxDispatcher(db, failing.submit)
+
+    async def run(notifier):
+        notifier.start()
+        sent = dispatcher.flush()
+        await notifier.drain()
+        await notifier.close()
+        return sent
+
+    assert asyncio.run(run(failing)) == 1       # 3 行合成一条摘要
+    assert failing.failed == 1
+    assert dispatcher.purge() == 0
+    assert dispatcher.backlog() == 3            # 没送达：行还在
+    assert len(dispatcher.pending()) == 3       # 也不再算 in-flight，下次 flush 会重发
+
+    # 下一轮换成正常的服务端：同样的行重发，送达后删除
+    srv, state = telegram_stub_server.start_server(every_429=0, latency_ms=0)
+    try:
+        healthy = TelegramNotifier(token="T", chat_id="1", api_base=f"http://127.0.0.1:{srv.server_address[1]}")
+        dispatcher.submit = healthy.submit
+        assert asyncio.run(run(healthy)) == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    assert len(state["messages"]) == 1 and "Job 0" in state["messages"][0] and "Job 2" in state["messages"][0]
+    assert dispatcher.purge() == 3
+    assert dispatcher.backlog() == 0
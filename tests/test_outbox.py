@@ -0,0 +1,40 @@
+# tests/test_outbox.py
+"""发件箱摘要拆分：按 Telegram 的 UTF-16 计长，不超过上限。"""
+from outbox import MAX_MESSAGE_CHARS, _u16, build_digests
+
+
+def test_everything_fits_in_one_digest():
+    digests = build_digests([(1, "a"), (2, "b"), (3, "c")])
+    assert len(digests) == 1
+    message, ids = digests[0]
+    assert ids == [1, 2, 3]
+    assert message.startswith("🆕 3 new jobs")
+
+
+def test_single_row_has_no_header():
+    assert build_digests([(7, "only one")]) == [("only one", [7])]
+
+
+def test_splits_at_the_limit():
+    rows = [(i, "x" * 900) for i in range(10)]
+    digests = build_digests(rows)
+    assert len(digests) > 1
+    assert [i for _, ids in digests for i in ids] == list(range(10))
+    assert all(_u16(m) <= MAX_MESSAGE_CHARS for m, _ in digests)
+
+
+def test_emoji_count_as_two_utf16_units():
+    # 每条 1500 个 emoji = 3000 码元：按码点算两条能塞进一条消息，按 UTF-16 就超了
+    rows = [(i, "🚀" * 1500) for i in range(3)]
+    digests = build_digests(rows)
+    assert [ids for _, ids in digests] == [[0], [1], [2]]
+    assert all(_u16(m) <= MAX_MESSAGE_CHARS for m, _ in digests)
+
+
+def test_oversized_row_is_truncated_without_splitting_surrogates():
+    digests = build_digests([(1, "🚀" * 5000)])
+    message, ids = digests[0]
+    assert ids == [1]
+    assert message.endswith("…")
+    assert _u16(message) <= MAX_MESSAGE_CHARS
+    message.encode("utf-8")  # 切开代理对的话这里会报错
@@ -0,0 +1,127 @@
+# tests/test_outputs.py
+"""分块报表：按 rowid 水位只追加新行；输出过又被 UPDATE 的行追加补丁行，没变的行不重写。"""
+import json
+
+import pytest
+
+import outputs
+from db import get_db, init_schema, mark_report_dirty
+
+
+@pytest.fixture
+def report(tmp_path, monkeypatch):
+    out = tmp_path / "outputs"
+    data = out / "data"
+    monkeypatch.setattr(outputs, "OUTPUT_DIR", out)
+    monkeypatch.setattr(outputs, "HTML_PATH", out / "latest.html")
+    monkeypatch.setattr(outputs, "DATA_DIR", data)
+    monkeypatch.setattr(outputs, "MANIFEST_JSON", data / "manifest.json")
+    monkeypatch.setattr(outputs, "MANIFEST_JS", data / "manifest.js")
+    db_path = str(tmp_path / "jobs.sqlite3")
+    with get_db(db_path).write() as conn:
+        init_schema(conn)
+    yield db_path, data
+    get_db(db_path).close()
+
+
+def _insert(db_path, *jobs):
+    with get_db(db_path).write() as conn:
+        conn.executemany(
+            "INSERT INTO jobs(job_id, title, company, location, source, link) VALUES(?,?,?,?,?,?)",
+            [(j, f"Title {j}", "Unknown", "Auckland", "seek", f"https://x/{j}") for j in jobs],
+        )
+        conn.commit()
+
+
+def _pushed_rows(data) -> list[list]:
+    """按清单顺序读出所有 __jobsPush(...) 的数据行"""
+    manifest = json.loads((data / "manifest.json").read_text(encoding="utf-8"))
+    rows = []
+    for c in manifest["chunks"]:
+        for line in (data / c["file"]).read_text(encoding="utf-8").splitlines():
+            assert line.startswith("__jobsPush(") and line.endswith(");")
+            rows += json.loads(line[len("__jobsPush("):-2])
+    return rows
+
+
+def _build(db_path) -> None:
+    outputs.build_html_from_db(db_path)
+
+
+def test_new_rows_appended_once(report):
+    db_path, data = report
+    _insert(db_path, "a", "b")
+    _build(db_path)
+    _insert(db_path, "c")
+    _build(db_path)
+    rows = _pushed_rows(data)
+    assert [r[0] for r in rows] == [1, 2, 3]
+    assert rows[0][:3] == [1, "a", "Title a"]
+    manifest = json.loads((data / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["last_rowid"] == 3 and manifest["total"] == 3
+
+
+def test_nothing_changed_writes_nothing(report):
+    db_path, data = report
+    _insert(db_path, "a", "b")
+    _build(db_path)
+    before = {p.name: p.stat().st_mtime_ns for p in data.iterdir()}
+    size = {p.name: p.stat().st_size for p in data.iterdir()}
+    _build(db_path)
+    assert {p.name: p.stat().st_mtime_ns for p in data.iterdir()} == before
+    assert {p.name: p.stat().st_size for p in data.iterdir()} == size
+
+
+def test_update_to_reported_row_appends_patch_only(report):
+    db_path, data = report
+    _insert(db_path, "a", "b", "c")
+    _build(db_path)
+    with get_db(db_path).write() as conn:
+        conn.execute("UPDATE jobs SET company='Acme' WHERE rowid=2")
+        mark_report_dirty(conn.cursor(), [2])
+        conn.commit()
+    _build(db_path)
+    rows = _pushed_rows(data)
+    assert [r[0] for r in rows] == [1, 2, 3, 2]       # 只多了一条 rowid 2 的补丁，1、3 没重写
+    assert rows[-1][3] == "Acme"
+    with get_db(db_path).read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM report_dirty").fetchone() == (0,)
+    _build(db_path)
+    assert len(_pushed_rows(data)) == 4                # 脏标记清了，不会再补
+
+
+def test_duplicate_linked_later_becomes_removal_marker(report):
+    db_path, data = report
+    _insert(db_path, "a", "b")
+    _build(db_path)
+    with get_db(db_path).write() as conn:
+        conn.execute("UPDATE jobs SET canonical_rowid=1 WHERE rowid=2")
+        mark_report_dirty(conn.cursor(), [2])
+        conn.commit()
+    _build(db_path)
+    assert _pushed_rows(data)[-1] == [2]
+
+
+def test_dirty_row_not_yet_reported_is_not_patched(report):
+    db_path, data = report
+    _insert(db_path, "a")
+    _build(db_path)
+    _insert(db_path, "b")
+    with get_db(db_path).write() as conn:
+        conn.execute("UPDATE jobs SET company='Acme' WHERE rowid=2")
+        mark_report_dirty(conn.cursor(), [2])
+        conn.commit()
+    _build(db_path)
+    rows = _pushed_rows(data)
+    assert [r[0] for r in rows] == [1, 2]              # 水位之后的行按新值正常追加，不另发补丁
+    assert rows[1][3] == "Acme"
+
+
+def test_missing_chunk_rebuilds_from_scratch(report):
+    db_path, data = report
+    _insert(db_path, "a", "b")
+    _build(db_path)
+    for p in data.glob("jobs_*.js"):
+        p.unlink()
+    _build(db_path)
+    assert [r[0] for r in _pushed_rows(data)] == [1, 2]
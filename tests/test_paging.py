@@ -0,0 +1,35 @@
+# tests/test_paging.py
+"""翻页水位：已入库 + 被标题过滤的卡片都不算新，整页都是这两种就停。"""
+import pytest
+
+import main
+
+
+@pytest.fixture
+def known_in_db(monkeypatch):
+    known: set[str] = set()
+    monkeypatch.setattr(main, "known_job_ids", lambda source, ids: {i for i in ids if i in known})
+    return known
+
+
+def test_all_known_stops(known_in_db):
+    assert main._page_has_new("seek", [], {"raw": 20, "known": 20, "filtered": 0}) is False
+
+
+def test_all_known_plus_filtered_stops(known_in_db):
+    assert main._page_has_new("seek", [], {"raw": 20, "known": 15, "filtered": 5}) is False
+
+
+def test_one_unknown_card_continues(known_in_db):
+    batch = [{"job_id": "81234567"}]
+    assert main._page_has_new("seek", batch, {"raw": 20, "known": 14, "filtered": 5}) is True
+
+
+def test_returned_cards_already_in_db_count_as_known(known_in_db):
+    known_in_db.add("81234567")
+    batch = [{"job_id": "81234567"}]
+    assert main._page_has_new("linkedin", batch, {"raw": 20, "known": 14, "filtered": 5}) is False
+
+
+def test_empty_page_stops(known_in_db):
+    assert main._page_has_new("seek", [], {"raw": 0, "known": 0, "filtered": 0}) is False
@@ -0,0 +1,92 @@
+# tests/test_recent_jobs.py
+"""db.recent_jobs：seen_ts 倒序 + keyset 分页，按来源/地点过滤都走索引。"""
+import sqlite3
+
+import pytest
+
+import recent
+from db import get_db, init_schema, recent_jobs
+
+SOURCES = ("seek", "linkedin")
+LOCATIONS = ("Auckland", "Wellington", "Christchurch")
+
+
+def _fill(conn, n: int = 50):
+    # 每两行同一个 seen_ts：分页游标必须靠 rowid 拆并列
+    conn.executemany(
+        "INSERT INTO jobs(job_id, title, company, location, source, link, seen_ts) VALUES(?,?,?,?,?,?,?)",
+        [(f"j{i}", f"Job {i}", "Acme", LOCATIONS[i % 3], SOURCES[i % 2], f"https://x/{i}", 1_700_000_000 + i // 2)
+         for i in range(n)],
+    )
+    conn.commit()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    init_schema(conn)
+    _fill(conn)
+    yield conn
+    conn.close()
+
+
+def _all_pages(conn, **kw):
+    out, before = [], None
+    while True:
+        rows, before = recent_jobs(conn, limit=7, before=before, **kw)
+        out += rows
+        if before is None:
+            return out
+
+
+def test_newest_first(conn):
+    rows, cursor = recent_jobs(conn, limit=3)
+    assert [r["job_id"] for r in rows] == ["j49", "j48", "j47"]
+    assert cursor is not None
+
+
+def test_pages_cover_everything_once(conn):
+    rows = _all_pages(conn)
+    assert [r["job_id"] for r in rows] == [f"j{i}" for i in range(49, -1, -1)]
+
+
+def test_filters(conn):
+    by_source = _all_pages(conn, source="linkedin")
+    assert len(by_source) == 25 and {r["source"] for r in by_source} == {"linkedin"}
+    by_both = _all_pages(conn, source="seek", location="Wellington")
+    assert by_both and all(r["source"] == "seek" and r["location"] == "Wellington" for r in by_both)
+    assert len(by_both) == sum(1 for i in range(50) if i % 2 == 0 and i % 3 == 1)
+
+
+def test_last_page_has_no_cursor(conn):
+    rows, cursor = recent_jobs(conn, limit=100)
+    assert len(rows) == 50 and cursor is None
+
+
+@pytest.mark.parametrize("kw, index", [
+    ({}, "idx_jobs_seen_ts"),
+    ({"source": "seek"}, "idx_jobs_source_seen_ts"),
+    ({"location": "Auckland"}, "idx_jobs_location_seen_ts"),
+])
+def test_uses_index_without_sort(conn, kw, index):
+    conn.execute("ANALYZE")
+    trace = []
+    conn.set_trace_callback(trace.append)
+    recent_jobs(conn, limit=5, before=(1_700_000_010, 30), **kw)
+    conn.set_trace_callback(None)
+    sql = trace[-1]
+    plan = " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql))
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_cli_pages(tmp_path, capsys):
+    path = str(tmp_path / "jobs.sqlite3")
+    with get_db(path).write() as c:
+        init_schema(c)
+        _fill(c, 10)
+    recent.main(["--db", path, "--source", "seek", "--limit", "2", "--pages", "2"])
+    out = capsys.readouterr().out
+    assert "Job 8" in out and "Job 6" in out and "Job 4" in out and "Job 2" in out
+    assert "Job 9" not in out
+    assert "-- next: --before" in out
@@ -0,0 +1,122 @@
+# tests/test_seek_parsing.py
+"""SEEK 解析（离线）：搜索 API payload、服务端渲染页（内嵌 JSON / HTML 兜底）、翻页统计，以及本地 stub。"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+from sites.seek_adapter import SEEK_BASE, _fill_stats, parse_search_payload, parse_seek_search_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "bench" / "fixtures"
+sys.path.insert(0, str(FIXTURES.parent))
+
+import seek_stub_server  # noqa: E402
+
+EXPECTED_PAYLOAD_JOBS = [
+    {"job_id": "81234567", "title": "Graduate Software Developer", "company": "Halter",
+     "location": "Auckland CBD, Auckland", "link": f"{SEEK_BASE}/job/81234567",
+     "listed_at": "2026-10-17T21:04:11Z"},
+    {"job_id": "81234568", "title": "Junior QA Tester", "company": "One New Zealand",
+     "location": "Wellington Central, Wellington", "link": f"{SEEK_BASE}/job/81234568",
+     "listed_at": "2026-10-17T19:30:00Z"},
+    # companyName 优先于 advertiser；v4 的 suburb/area/location 拼起来（去重）
+    {"job_id": "81234569", "title": "Automation Test Analyst", "company": "RWA People",
+     "location": "Ellerslie, Auckland", "link": f"{SEEK_BASE}/job/81234569",
+     "listed_at": "2026-10-16T02:15:45Z"},
+]
+
+
+@pytest.fixture(scope="module")
+def payload() -> dict:
+    return json.loads((FIXTURES / "seek_search.json").read_text(encoding="utf-8"))
+
+
+def test_parse_search_payload(payload):
+    assert parse_search_payload(payload) == EXPECTED_PAYLOAD_JOBS
+
+
+def test_parse_search_payload_ignores_junk():
+    assert parse_search_payload({"data": [{"title": "no id"}, "x", None]}) == []
+    assert parse_search_payload({"unexpected": True}) == []
+    assert parse_search_payload([]) == []
+
+
+@pytest.mark.parametrize("marker", ["window.SEEK_REDUX_DATA = ", "window.SEEK_APOLLO_DATA = "])
+def test_ssr_embedded_json(payload, marker):
+    state = {"results": {"results": {"jobs": payload["data"]}, "totalCount": 3}}
+    html = f"<html><body><div id=app></div><script>{marker}{json.dumps(state)};</script></body></html>"
+    assert parse_seek_search_html(html) == EXPECTED_PAYLOAD_JOBS
+
+
+def test_html_fallback_reads_cards():
+    jobs = parse_seek_search_html((FIXTURES / "seek_search.html").read_text(encoding="utf-8"))
+    assert len(jobs) == 40
+    assert jobs[0] == {
+        "job_id": "81234500", "title": "Graduate Software Developer", "company": "Halter",
+        "location": "Auckland CBD, Auckland",
+        "link": f"{SEEK_BASE}/job/81234500?type=standard&ref=search-standalone",
+    }
+    assert len({j["job_id"] for j in jobs}) == 40
+    # 合成页里故意缺字段的卡片：i % 9 == 4 没有公司，i % 13 == 7 没有地点
+    assert [i for i, j in enumerate(jobs) if j["company"] == "Unknown"] == [i for i in range(40) if i % 9 == 4]
+    assert [i for i, j in enumerate(jobs) if j["location"] == "Unknown"] == [i for i in range(40) if i % 13 == 7]
+
+
+def test_no_results_vs_unrecognised_page():
+    assert parse_seek_search_html('<div data-automation="searchResults-noResults">No matching search results</div>') == []
+    assert parse_seek_search_html("<html><body>Something else entirely</body></html>") is None
+
+
+def test_fill_stats_counts_filtered_cards_in_raw():
+    stats: dict = {}
+    _fill_stats(stats, 12, 5, {"senior": 2, "lead": 1})
+    assert stats == {"raw": 15, "known": 5, "filtered": 3}
+    _fill_stats(stats, 4, 0, None)
+    assert stats == {"raw": 4, "known": 0, "filtered": 0}
+    _fill_stats(None, 4, 0, {"senior": 1})  # 调用方不要统计时是空操作
+
+
+def test_stub_server_serves_recorded_pages(payload):
+    second = {"data": [{"id": "99", "title": "Support Engineer", "companyName": "Acme"}]}
+    srv = seek_stub_server.start_server([json.dumps(payload).encode(), json.dumps(second).encode()])
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        pages = [requests.get(f"{base}/api/jobsearch/v5/search?keywords=x&page={n}", timeout=5).json()
+                 for n in (1, 2, 3)]
+    finally:
+        srv.shutdown()
+    assert parse_search_payload(pages[0]) == EXPECTED_PAYLOAD_JOBS
+    assert [j["job_id"] for j in parse_search_payload(pages[1])] == ["99"]
+    assert parse_search_payload(pages[2]) == []  # 翻过头：空结果
+
+
+def test_stub_server_network_path_in_browser(payload):
+    """有 Chromium 时端到端跑一遍网络拦截（collector 收到 payload，不走 DOM）"""
+    pw_api = pytest.importorskip("playwright.async_api")
+    import asyncio
+
+    async def run(base):
+        async with pw_api.async_playwright() as pw:
+            try:
+                browser = await pw.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f"Chromium unavailable: {e}")
+            from sites.seek_adapter import SeekSearchCollector, extract_seek_jobs
+            page = await browser.new_page()
+            collector = SeekSearchCollector(page)
+            await page.goto(f"{base}/jobs?keywords=graduate", wait_until="domcontentloaded")
+            got = await collector.wait(timeout_ms=5000, dom_ready=False)
+            jobs = await extract_seek_jobs(page, collector=collector)
+            collector.detach()
+            await browser.close()
+            return got, jobs
+
+    srv = seek_stub_server.start_server([json.dumps(payload).encode()])
+    try:
+        got, jobs = asyncio.run(run(f"http://127.0.0.1:{srv.server_address[1]}"))
+    finally:
+        srv.shutdown()
+    assert got
+    assert [j["job_id"] for j in jobs] == [j["job_id"] for j in EXPECTED_PAYLOAD_JOBS]
@@ -0,0 +1,100 @@
+# tests/test_title_filter.py
+"""标题过滤：Python 侧判定与页面端 PAGE_FILTER_JS 一致；规则文件改了自动重载。"""
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+import main
+from title_filter import PAGE_FILTER_JS, TitleFilter
+
+TITLES = [
+    "Graduate Software Developer",
+    "Senior Software Engineer",
+    "Sr. Test Analyst",
+    "Snr QA Engineer",
+    "Junior Developer – Team Leader track",   # en dash
+    "Head - of Engineering",
+    "Head, of Data",
+    "Leadership Development Programme",
+    "Misleading Title Tester",                 # 'lead' 只按整词
+    "Staff Engineer",
+    "Ｓｅｎｉｏｒ Developer",                   # 全角：NFKD 后是 senior
+    "Project Manager (IT)",
+    "Data Analyst",
+    "Café Support Engineer",
+    "Civil Engineer",
+    "Intermediate .NET Developer",
+    "QA Automation Engineer",
+    "",
+]
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "filters.json"
+    path.write_text(json.dumps({"exclude": ["senior", "sr", "snr", "lead", "leader", "staff", "civil",
+                                            "intermediate", "manager", "head of", "team leader"]}),
+                    encoding="utf-8")
+    return path
+
+
+def _page_verdicts(rules: dict, titles: list[str]) -> list[bool]:
+    node = shutil.which("node")
+    if not node:
+        pytest.skip("node not installed")
+    script = PAGE_FILTER_JS + """
+const [rules, titles] = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const f = titleDropper(rules);
+process.stdout.write(JSON.stringify(titles.map(t => !f.drop(t))));
+"""
+    out = subprocess.run([node, "-e", script], input=json.dumps([rules, titles]),
+                         capture_output=True, text=True, check=True, timeout=30)
+    return json.loads(out.stdout)
+
+
+def test_should_keep_matches_page_filter(rules_file, monkeypatch):
+    engine = TitleFilter(rules_file)
+    monkeypatch.setattr(main, "TITLE_FILTER", engine)
+    py = [main.should_keep({"title": t}) for t in TITLES]
+    assert py == _page_verdicts(engine.page_rules(), TITLES)
+    # 顺带钉住几条语义：整词匹配、短语穿过标点、全角归一化
+    verdict = dict(zip(TITLES, py))
+    assert verdict["Misleading Title Tester"] is True
+    assert verdict["Head - of Engineering"] is False
+    assert verdict["Ｓｅｎｉｏｒ Developer"] is False
+    assert verdict["Graduate Software Developer"] is True
+
+
+def test_include_rules_match_page_filter(tmp_path):
+    path = tmp_path / "filters.json"
+    path.write_text(json.dumps({"exclude": ["senior"], "include": ["developer", "qa", "test analyst"]}),
+                    encoding="utf-8")
+    engine = TitleFilter(path)
+    py = [engine.drop_reason(t) is None for t in TITLES]
+    assert py == _page_verdicts(engine.page_rules(), TITLES)
+    assert engine.drop_reason("Data Analyst") == "(no include match)"
+
+
+def test_hot_reload_picks_up_edited_rules(rules_file):
+    engine = TitleFilter(rules_file, reload_interval=0)
+    jobs = [{"title": "Graduate Software Developer"}, {"title": "Senior Software Engineer"}]
+    assert [j["title"] for j in engine.filter(jobs)] == ["Graduate Software Developer"]
+
+    rules_file.write_text(json.dumps({"exclude": ["graduate"]}), encoding="utf-8")
+    later = time.time() + 10
+    os.utime(rules_file, (later, later))  # mtime 粒度粗的文件系统上也保证变了
+    assert [j["title"] for j in engine.filter(jobs)] == ["Senior Software Engineer"]
+    assert engine.take_hits() == {"senior": 1, "graduate": 1}
+
+
+def test_broken_rules_file_keeps_old_rules(rules_file):
+    engine = TitleFilter(rules_file, reload_interval=0)
+    rules_file.write_text("{not json", encoding="utf-8")
+    later = time.time() + 10
+    os.utime(rules_file, (later, later))
+    assert engine.reload() is False
+    assert engine.drop_reason("Senior Developer") == "senior"
@@ -0,0 +1,77 @@
+# tests/test_upsert.py
+"""upsert_and_get_new：临时表 + 集合运算的批量写入，发件箱与 jobs 同一个事务。"""
+import sqlite3
+import time
+
+import pytest
+
+import main
+import outbox
+from db import init_schema
+
+
+def _job(i: int, **kw) -> dict:
+    return {"job_id": f"j{i}", "title": f"Junior Developer {i}", "company": f"Company {i}",
+            "location": "Auckland", "link": f"https://x/{i}", **kw}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "jobs.sqlite3"))
+    init_schema(conn)
+    yield conn
+    conn.close()
+
+
+def test_returns_new_rows_in_input_order_and_skips_known(conn):
+    new = main.upsert_and_get_new(conn, [_job(1), _job(2), _job(1, title="dup in batch")], "seek")
+    assert [j["job_id"] for j in new] == ["j1", "j2"]
+    assert new[0]["title"] == "Junior Developer 1"  # 批内重复：先到先得
+
+    new = main.upsert_and_get_new(conn, [_job(3), _job(2), _job(4)], "seek")
+    assert [j["job_id"] for j in new] == ["j3", "j4"]
+    assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone() == (4,)
+
+    # 同一个 job_id 在另一个站点算新职位
+    assert [j["job_id"] for j in main.upsert_and_get_new(conn, [_job(2)], "linkedin")] == ["j2"]
+
+
+def test_seen_ts_is_set(conn):
+    before = int(time.time())
+    main.upsert_and_get_new(conn, [_job(1), _job(2)], "seek")
+    after = int(time.time())
+    for (ts,) in conn.execute("SELECT seen_ts FROM jobs"):
+        assert before <= ts <= after
+
+
+def test_outbox_rows_written_with_the_jobs(conn):
+    main.upsert_and_get_new(conn, [_job(1), _job(2)], "seek")
+    main.upsert_and_get_new(conn, [_job(2), _job(3)], "seek")
+    rows = conn.execute("SELECT source, job_id FROM notify_outbox ORDER BY id").fetchall()
+    assert rows == [("seek", "j1"), ("seek", "j2"), ("seek", "j3")]
+    assert main.upsert_and_get_new(conn, [_job(4)], "seek", notify=False)
+    assert conn.execute("SELECT COUNT(*) FROM notify_outbox").fetchone() == (3,)
+
+
+def test_outbox_and_jobs_roll_back_together(conn, monkeypatch):
+    def enqueue_then_fail(cur, source, jobs):
+        outbox_enqueue(cur, source, jobs)
+        raise RuntimeError("boom")
+
+    outbox_enqueue = outbox.enqueue
+    monkeypatch.setattr(main.outbox, "enqueue", enqueue_then_fail)
+    with pytest.raises(RuntimeError):
+        main.upsert_and_get_new(conn, [_job(1), _job(2)], "seek")
+    assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone() == (0,)
+    assert conn.execute("SELECT COUNT(*) FROM notify_outbox").fetchone() == (0,)
+
+    monkeypatch.setattr(main.outbox, "enqueue", outbox_enqueue)
+    assert len(main.upsert_and_get_new(conn, [_job(1), _job(2)], "seek")) == 2  # 回滚后重来照常
+
+
+def test_cross_posted_duplicate_is_returned_but_not_notified(conn):
+    main.upsert_and_get_new(conn, [_job(1, title="Junior Software Developer", company="Acme Ltd")], "seek")
+    new = main.upsert_and_get_new(conn, [_job(9, title="Junior Software Developer", company="Acme Limited")],
+                                  "linkedin")
+    assert [j["job_id"] for j in new] == ["j9"] and new[0]["canonical_rowid"] == 1
+    assert conn.execute("SELECT job_id FROM notify_outbox").fetchall() == [("j1",)]
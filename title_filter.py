@@ -0,0 +1,266 @@
+# title_filter.py
+"""
+职位标题过滤引擎：
+  - 规则（单词 / 短语，exclude + include）编译成前缀树正则，一次扫描判定，不再 职位数 × 短语数 次子串查找
+  - 单词按整词匹配，短语按子串匹配（与旧的 should_keep 语义一致）
+  - 标题归一化和判定结果都做缓存；规则重载时清空判定缓存
+  - 规则文件改了自动重载（按 mtime，最多每 reload_interval 秒检查一次），不用重启
+  - 按规则统计丢弃数，take_hits() 取出并清零
+  - 编译好的正则也交给页面端（PAGE_FILTER_JS），适配器读到标题就丢，不再为被排除的卡片回溯/探测选择器
+规则文件（JSON）：{"exclude": ["senior", "head of", ...], "include": [...]}
+含空格的条目是短语，否则是单词；include 为空表示不限制。文件不存在时用内置默认规则。
+EXCLUDE_TERMS_EXTRA（逗号分隔）始终追加到 exclude。
+"""
+import os
+import re
+import json
+import time
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# ========= 默认规则：剔除资深/管理岗 =========
+DEFAULT_EXCLUDE_WORDS = {
+    "senior", "sr", "snr",
+    "intermediate",
+    "principal",
+    "manager", "managers", "management", "managerial",
+    "lead", "leader", "leaders", "leadership",
+    "architect", "architects",
+    "director", "directors",
+    "vp", "vice", "president",
+    "chief", "headcount", "staff",  # 'staff engineer' level roles
+    "civil",  # domain you want to exclude
+}
+DEFAULT_EXCLUDE_PHRASES = {
+    "project manager", "program manager", "product manager",
+    "team lead", "team leader", "tech lead",
+    "head of",  # handled via phrase to capture "head - of", "head, of" after normalization
+}
+
+RELOAD_INTERVAL = float(os.getenv("FILTER_RELOAD_SECONDS", "5"))
+DECISION_CACHE_MAX = 50_000
+
+# Characters we’ll collapse to spaces for normalization
+_PUNCT_RE = re.compile(r"[^a-z0-9]+", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def normalize_title(s: str) -> str:
+    if not s:
+        return ""
+    # NFKD handles fancy dashes etc.
+    s = unicodedata.normalize("NFKD", s).lower()
+    # collapse punctuation/dashes/commas into spaces
+    s = _PUNCT_RE.sub(" ", s)
+    # single spaces
+    return " ".join(s.split())
+
+
+def split_terms(terms) -> tuple[set[str], set[str]]:
+    """规则条目 -> (单词集合, 短语集合)；条目先归一化，与标题同一口径"""
+    words, phrases = set(), set()
+    for t in terms:
+        t = normalize_title(str(t))
+        if not t:
+            continue
+        (phrases if " " in t else words).add(t)
+    return words, phrases
+
+
+def _trie_pattern(strings) -> str:
+    """把一组字面量编译成前缀树形状的正则（共享前缀只比较一次）"""
+    trie: dict = {}
+    for s in strings:
+        node = trie
+        for ch in s:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        end = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if end:
+            return ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+def compile_rules(words: set[str], phrases: set[str]) -> Optional[re.Pattern]:
+    """单词整词匹配（两侧不是字母数字），短语子串匹配；合成一个正则"""
+    parts = []
+    if words:
+        parts.append(r"(?<![a-z0-9])" + _trie_pattern(words) + r"(?![a-z0-9])")
+    if phrases:
+        parts.append(_trie_pattern(phrases))
+    return re.compile("|".join(parts)) if parts else None
+
+
+# 页面端判定：与 normalize_title 同口径的归一化 + Python 侧编译出的正则
+# （规则只含 [a-z0-9 ]，生成的正则在 JS 里语义一致）。dropped 按命中规则计数。
+PAGE_FILTER_JS = """
+function titleDropper(rules) {
+  const ex = rules && rules.exclude ? new RegExp(rules.exclude) : null;
+  const inc = rules && rules.include ? new RegExp(rules.include) : null;
+  const dropped = {};
+  const norm = (s) => (s || '').normalize('NFKD').toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+  const drop = (title) => {
+    if (!ex && !inc) return false;
+    const t = norm(title);
+    if (!t) return false;
+    let reason = null;
+    const m = ex ? t.match(ex) : null;
+    if (m) reason = m[0];
+    else if (inc && !inc.test(t)) reason = '(no include match)';
+    if (reason === null) return false;
+    dropped[reason] = (dropped[reason] || 0) + 1;
+    return true;
+  };
+  return { drop, dropped };
+}
+"""
+
+
+class TitleFilter:
+    def __init__(self, rules_file: Optional[Path] = None, reload_interval: float = RELOAD_INTERVAL):
+        self.rules_file = Path(rules_file) if rules_file else None
+        self.reload_interval = reload_interval
+        self.hits: Counter = Counter()
+        self.page_skipped: dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._decisions: dict[str, Optional[str]] = {}
+        self.exclude_words: set[str] = set()
+        self.exclude_phrases: set[str] = set()
+        self.include_words: set[str] = set()
+        self.include_phrases: set[str] = set()
+        self._exclude_re: Optional[re.Pattern] = None
+        self._include_re: Optional[re.Pattern] = None
+        self.reload(force=True)
+
+    # ---------- 规则 ----------
+    def _read_rules(self) -> tuple[list, list]:
+        if self.rules_file and self.rules_file.exists():
+            cfg = json.loads(self.rules_file.read_text(encoding="utf-8")) or {}
+            exclude, include = list(cfg.get("exclude") or []), list(cfg.get("include") or [])
+        else:
+            exclude = sorted(DEFAULT_EXCLUDE_WORDS | DEFAULT_EXCLUDE_PHRASES)
+            include = []
+        # Allow the list to be extended from env if needed (comma separated)
+        extra = os.getenv("EXCLUDE_TERMS_EXTRA", "").strip()
+        if extra:
+            exclude += [t for t in extra.split(",") if t.strip()]
+        return exclude, include
+
+    def reload(self, force: bool = False) -> bool:
+        """规则文件 mtime 变了就重新编译；返回是否重载。解析失败保留旧规则"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return False
+        self._checked = now
+        try:
+            mtime = self.rules_file.stat().st_mtime if self.rules_file else None
+        except OSError:
+            mtime = None
+        if not force and mtime == self._mtime:
+            return False
+        try:
+            exclude, include = self._read_rules()
+        except Exception as e:
+            print(f"❗ {self.rules_file} 解析失败，沿用旧规则:", e)
+            self._mtime = mtime
+            return False
+        ew, ep = split_terms(exclude)
+        iw, ip = split_terms(include)
+        ex_re, in_re = compile_rules(ew, ep), compile_rules(iw, ip)
+        with self._lock:
+            self.exclude_words, self.exclude_phrases = ew, ep
+            self.include_words, self.include_phrases = iw, ip
+            self._exclude_re, self._include_re = ex_re, in_re
+            self._decisions = {}
+            self._mtime = mtime
+        if not force:
+            print(f"🔁 过滤规则已重载：exclude {len(ew) + len(ep)} 条，include {len(iw) + len(ip)} 条")
+        return True
+
+    # ---------- 判定 ----------
+    def _decide(self, title: str) -> Optional[str]:
+        """返回丢弃原因（命中的规则），保留返回 None"""
+        t = normalize_title(title)
+        if not t:
+            return None
+        if self._exclude_re is not None:
+            m = self._exclude_re.search(t)
+            if m:
+                return m.group(0)
+        if self._include_re is not None and not self._include_re.search(t):
+            return "(no include match)"
+        return None
+
+    def drop_reason(self, title: str) -> Optional[str]:
+        decisions = self._decisions
+        try:
+            return decisions[title]
+        except KeyError:
+            pass
+        reason = self._decide(title)
+        if len(decisions) >= DECISION_CACHE_MAX:
+            decisions.clear()
+        decisions[title] = reason
+        return reason
+
+    def keep(self, job: dict) -> bool:
+        reason = self.drop_reason(job.get("title") or "")
+        if reason is None:
+            return True
+        self.hits[reason] += 1
+        return False
+
+    def filter(self, jobs: list[dict]) -> list[dict]:
+        """整批过滤；顺带检查规则文件是否更新"""
+        self.reload()
+        return [j for j in jobs if self.keep(j)]
+
+    # ---------- 页面端 ----------
+    def page_rules(self) -> dict:
+        """给页面端 titleDropper 的规则（正则源码）；顺带检查规则文件是否更新"""
+        self.reload()
+        ex, inc = self._exclude_re, self._include_re
+        return {"exclude": ex.pattern if ex else None, "include": inc.pattern if inc else None}
+
+    def record_page(self, source: str, dropped: dict):
+        """适配器在抽取前丢掉的卡片（按规则计数）"""
+        if dropped:
+            self.page_skipped.setdefault(source, Counter()).update(dropped)
+
+    # ---------- 统计 ----------
+    def take_hits(self) -> Counter:
+        hits, self.hits = self.hits, Counter()
+        return hits
+
+    def take_page_skipped(self) -> dict[str, Counter]:
+        skipped, self.page_skipped = self.page_skipped, {}
+        return skipped
+
+    @staticmethod
+    def format_page_skipped(skipped: dict[str, Counter]) -> str:
+        if not skipped:
+            return "no cards skipped"
+        return "; ".join(f"{src}: {TitleFilter.format_hits(c, top=5)}" for src, c in sorted(skipped.items()))
+
+    @staticmethod
+    def format_hits(hits: Counter, top: int = 8) -> str:
+        if not hits:
+            return "nothing dropped"
+        parts = [f"{rule}×{n}" for rule, n in hits.most_common(top)]
+        if len(hits) > top:
+            parts.append(f"+{len(hits) - top} rules")
+        return f"dropped {sum(hits.values())}: " + ", ".join(parts)